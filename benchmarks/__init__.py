@@ -0,0 +1 @@
+"""Offline benchmarks. Run with `python -m benchmarks --help`."""
@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+from .suite import BENCHMARKS, FULL_SIZES, SIZES, compare, run
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline minimono benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="Transactions per benchmark.")
+    parser.add_argument("--full", action="store_true", help="Include 1M transactions.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="JSON report to compare against; exits with 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else SIZES)
+    progress = lambda item: print(
+        f"{item['benchmark']:<24} {item['size']:>9} {item['seconds']:10.4f}s", file=sys.stderr
+    )
+    report = run(sizes, args.repeat, args.only, report=progress)
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded)
+    else:
+        print(encoded)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for item in regressions:
+            print(
+                f"REGRESSION {item['benchmark']} @ {item['size']}: "
+                f"{item['baseline']:.4f}s -> {item['seconds']:.4f}s ({item['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from minimono import abstract, models
+from minimono.API.api_call import MonoCaller
+# The synthetic profile, rates and rows are the ones the tests use
+from tests.fakes import RATES, USER_INFO, fake_transaction
+
+ACCOUNT = USER_INFO["accounts"][0]["id"]
+END = datetime(2023, 1, 1, tzinfo=timezone.utc)
+STEP = 60
+
+
+def rows(account: str, fr: int, to: int, step: int = STEP, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Rows every :step: seconds within [fr, to], newest first like the API.
+    :limit: keeps only the newest ones, as the API does with 500.
+    """
+
+    first = -(-fr // step) * step
+    last = to // step * step
+    stamps = range(last, first - 1, -step)
+    if limit is not None:
+        stamps = stamps[:limit]
+    return [fake_transaction(account, datetime.fromtimestamp(stamp, tz=timezone.utc)) for stamp in stamps]
+
+
+def size_range(size: int, step: int = STEP):
+    """The (from, to) datetimes holding :size: rows, ending at END."""
+
+    to = int(END.timestamp())
+    return datetime.fromtimestamp(to - (size - 1) * step, tz=timezone.utc), END
+
+
+class SyntheticEngine(abstract.MonoCallerABC):
+    """Deterministic in-process engine: no network, no rate limit.
+    Responses go through the same parsers as MonoCaller.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        self_ratelimit: bool = True,
+        step: int = STEP,
+        trusted: bool = False,
+        limit: Optional[int] = None,
+        **options: Any,
+        ):
+        self.token = token
+        self.step = step
+        self.limit = limit
+        self.trusted = trusted
+        self.requests = 0
+
+    def respond(self, request_obj) -> Any:
+        if isinstance(request_obj, models.UserInfoReq):
+            return USER_INFO
+        if isinstance(request_obj, models.CurrRateReq):
+            return RATES
+        if isinstance(request_obj, models.StatementReq):
+            return rows(
+                request_obj.account,
+                int(request_obj.from_.timestamp()),
+                int(request_obj.to_.timestamp()),
+                self.step,
+                self.limit,
+            )
+        raise abstract.BadRequest(request_obj)
+
+    def make_request(self, request_obj):
+        self.requests += 1
+        methods = MonoCaller.trusted_methods if self.trusted else MonoCaller.corresponding_methods
+        return methods[request_obj.__class__.__name__](self.respond(request_obj))
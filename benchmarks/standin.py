@@ -0,0 +1,96 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from typing import Any, Optional, Tuple
+from minimono.API.api_call import MonoCaller
+from minimono.models import MAX_ROWS
+from .engine import RATES, STEP, USER_INFO, rows
+
+STATEMENT = re.compile(r"^/personal/statement/([^/]+)/(\d+)/(\d+)$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    standin: 'StandIn'
+
+    def _send(self, status: int, payload: Any, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        standin = self.standin
+        if standin.latency:
+            sleep(standin.latency)
+        if standin.rate_limited():
+            self._send(429, {"errorDescription": "Too many requests"}, {"Retry-After": "0"})
+            return
+        match = STATEMENT.match(self.path)
+        if self.path == "/personal/client-info":
+            self._send(200, USER_INFO)
+        elif self.path == "/bank/currency":
+            self._send(200, RATES)
+        elif match:
+            account, fr, to = match.group(1), int(match.group(2)), int(match.group(3))
+            self._send(200, rows(account, fr, to, standin.step, limit=MAX_ROWS))
+        else:
+            self._send(404, {"errorDescription": "Unknown method"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandIn:
+    """Local imitation of the API for benchmarks.
+    Every response is delayed by :latency: seconds, every :throttle_every:-th
+    request is answered with 429, and statements are capped at MAX_ROWS rows.
+    """
+
+    def __init__(self, latency: float = 0.0, throttle_every: int = 0, step: int = STEP):
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.step = step
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"standin": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    @property
+    def url(self) -> str:
+        return "http://%s:%d" % self.address
+
+    def rate_limited(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            throttled = bool(self.throttle_every) and self.requests % self.throttle_every == 0
+            self.throttled += throttled
+        return throttled
+
+    def caller_class(self) -> type:
+        """MonoCaller pointed at this stand-in."""
+
+        return type("StandInCaller", (MonoCaller,), {"base_url": self.url})
+
+    def __enter__(self) -> 'StandIn':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,168 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+from itertools import count
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from minimono import Client, models
+from minimono.API.api_call import MonoCaller
+from .engine import ACCOUNT, SyntheticEngine, rows, size_range
+from .standin import StandIn
+
+SIZES = (1_000, 100_000)
+FULL_SIZES = (1_000, 100_000, 1_000_000)
+# Statements over HTTP come in pages of 500, so bigger sizes only measure the latency
+HTTP_MAX_SIZE = 20_000
+
+
+def measure(run: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of :repeat: runs, in seconds."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _span(size: int):
+    fr, to = size_range(size)
+    return fr, to, int(fr.timestamp()), int(to.timestamp())
+
+
+def bench_parse(size: int, repeat: int) -> Dict[str, float]:
+    _, _, fr, to = _span(size)
+    body = json.dumps(rows(ACCOUNT, fr, to)).encode()
+    validated = MonoCaller.corresponding_methods["StatementReq"]
+    trusted = MonoCaller.trusted_methods["StatementReq"]
+    return {
+        "parse.validated": measure(lambda: validated(models.fast.loads(body)), repeat),
+        "parse.trusted": measure(lambda: trusted(models.fast.loads(body)), repeat),
+    }
+
+
+def bench_statement(size: int, repeat: int) -> Dict[str, float]:
+    fr, to, _, _ = _span(size)
+
+    def cold():
+        client = Client("bench", engine_class=SyntheticEngine)
+        return client, client.getStatement(client[ACCOUNT], from_time=fr, to_time=to)
+
+    client, statement = cold()
+    assert len(statement) == size, (len(statement), size)
+    warm = lambda: client.getStatement(client[ACCOUNT], from_time=fr, to_time=to)
+    evens = models.Statement.construct(transactions=statement.transactions[::2], timeframe=[])
+    odds = models.Statement.construct(transactions=statement.transactions[1::2], timeframe=[])
+    return {
+        "getStatement.cold": measure(cold, repeat),
+        "getStatement.warm": measure(warm, repeat),
+        "Statement.__add__": measure(lambda: evens + odds, repeat),
+    }
+
+
+def bench_files(size: int, repeat: int) -> Dict[str, float]:
+    fr, to, _, _ = _span(size)
+    client = Client("bench", engine_class=SyntheticEngine, trusted=True)
+    client.getStatement(client[ACCOUNT], from_time=fr, to_time=to)
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.json")
+        saves = count()
+        for fast in (False, True):
+            suffix = ".fast" if fast else ""
+
+            def save():
+                # A new file every time, an unchanged profile isn't written again
+                client.saveFile(os.path.join(directory, f"save-{next(saves)}.json"), fast=fast)
+
+            results[f"saveFile{suffix}"] = measure(save, repeat)
+            client.saveFile(path, fast=fast)
+            loader = Client("bench", engine_class=SyntheticEngine)
+            results[f"loadFile{suffix}"] = measure(lambda: loader.loadFile(path, trusted=fast), repeat)
+    return results
+
+
+def bench_http(size: int, repeat: int, latency: float = 0.002, throttle_every: int = 7) -> Dict[str, float]:
+    fr, to, _, _ = _span(min(size, HTTP_MAX_SIZE))
+    with StandIn(latency=latency, throttle_every=throttle_every) as standin:
+
+        def cold():
+            client = Client(
+                "bench",
+                avoid_ratelimiting=False,
+                engine_class=standin.caller_class(),
+                backoff_factor=0,
+                max_retries=5,
+                trusted=True,
+            )
+            client.getStatement(client[ACCOUNT], from_time=fr, to_time=to)
+
+        return {"http.getStatement.cold": measure(cold, repeat)}
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], Dict[str, float]]] = {
+    "parse": bench_parse,
+    "statement": bench_statement,
+    "files": bench_files,
+    "http": bench_http,
+}
+
+
+def _version() -> Optional[str]:
+    try:
+        from importlib.metadata import version
+        return version("minimono")
+    except Exception:
+        return None
+
+
+def run(
+    sizes: Sequence[int] = SIZES,
+    repeat: int = 3,
+    only: Optional[Iterable[str]] = None,
+    report: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Dict[str, Any]:
+    """Runs the benchmarks (all, or the groups in :only:) at every size.
+    Returns a JSON-serializable report; :report: gets every result as it comes.
+    """
+
+    groups = list(only) if only else list(BENCHMARKS)
+    results: List[Dict[str, Any]] = list()
+    for size in sizes:
+        for group in groups:
+            for name, seconds in BENCHMARKS[group](size, repeat).items():
+                rows_measured = min(size, HTTP_MAX_SIZE) if group == "http" else size
+                result = {
+                    "benchmark": name,
+                    "size": rows_measured,
+                    "seconds": seconds,
+                    "rows_per_second": rows_measured / seconds if seconds else None,
+                }
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return {
+        "minimono": _version(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "orjson": models.fast.orjson is not None,
+        "created": datetime.now(tz=timezone.utc).isoformat(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Results of :current: slower than in :baseline: by more than :tolerance:."""
+
+    before = {(item["benchmark"], item["size"]): item["seconds"] for item in baseline["results"]}
+    regressions = list()
+    for item in current["results"]:
+        old = before.get((item["benchmark"], item["size"]))
+        if old and item["seconds"] > old * (1 + tolerance):
+            regressions.append({**item, "baseline": old, "ratio": item["seconds"] / old})
+    return regressions
@@ -1 +1,11 @@
 from .client import Client as Client
+from .client import AsyncClient as AsyncClient
+from .api_call import MonoCaller as MonoCaller
+from .api_call import AsyncMonoCaller as AsyncMonoCaller
+from .ratelimit import RateLimiter as RateLimiter
+from .ratelimit import Budget as Budget
+from .ratelimit import MemoryBackend as MemoryBackend
+from .ratelimit import FileBackend as FileBackend
+from .sync import SyncProgress as SyncProgress
+from .webhook import WebhookReceiver as WebhookReceiver
+from .pool import ClientPool as ClientPool
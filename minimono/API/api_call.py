@@ -1,9 +1,46 @@
+import asyncio
 import requests
-from datetime import datetime
-from time import sleep
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from time import perf_counter, sleep
+from typing import Any, Optional, Tuple, Union
 from pydantic import BaseModel
-from random import uniform as random_uniform
+from requests.adapters import HTTPAdapter
 from .. import abstract, models
+from .ratelimit import Budget, RateLimiter, endpoint_of
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """Returns a keep-alive session with a connection pool of :pool_size:."""
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(tz=timezone.utc)).total_seconds(), 0.0)
 
 
 class MonoCaller(abstract.MonoCallerABC):
@@ -16,46 +53,261 @@ class MonoCaller(abstract.MonoCallerABC):
             transactions=[models.Transaction.parse_obj(n) for n in x],
             ),
     }
+    trusted_methods = {
+        "CurrRateReq": models.fast.currencies,
+        "UserInfoReq": models.fast.user,
+        "StatementReq": models.fast.statement,
+    }
+
+    def __init__(
+        self,
+        token: str,
+        self_ratelimit: bool = True,
+        session: Optional[requests.Session] = None,
+        pool_size: int = 10,
+        timeout: Union[float, Tuple[float, float]] = (3.05, 30),
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        max_backoff: float = 60.0,
+        limiter: Optional[RateLimiter] = None,
+        ratelimit_mode: str = "sleep",
+        trusted: bool = False,
+        instrument: Optional[abstract.InstrumentABC] = None,
+        ):
+        """:session: may be shared between callers, otherwise a pooled one is created.
+        Transient failures are retried up to :max_retries: times,
+        waiting for Retry-After or an exponential backoff capped at :max_backoff:.
+        :limiter: may be shared between callers (and processes, via its backend),
+        otherwise every caller limits itself. With :ratelimit_mode: "eta"
+        requests without a free slot raise TooEarly instead of waiting.
+        :trusted: responses skip per-field validation (see models.fast).
+        :instrument: receives timings, sizes and rate limit waits (see minimono.metrics).
+        """
 
-    def __init__(self, token: str, self_ratelimit: bool = True):
+        if ratelimit_mode not in ("sleep", "eta"):
+            raise ValueError('ratelimit_mode must be "sleep" or "eta".')
+        self.token = token
         self.headers = models.HeadersPrivate.parse_obj({"X-Token": token})
-        self.last_request = datetime(1970, 1, 1)
         self.self_ratelimit = self_ratelimit
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.ratelimit_mode = ratelimit_mode
+        self.session = session if session is not None else make_session(pool_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.trusted = trusted
+        if instrument is not None:
+            self.instrument = instrument
+
+    def close(self) -> None:
+        """Releases pooled connections."""
+
+        self.session.close()
+
+    def eta(self, request_obj) -> float:
+        """Seconds until :request_obj: can be sent without hitting the rate limit."""
+
+        endpoint = endpoint_of(request_obj.get_path_tail())
+        return self.limiter.eta(self.token, endpoint)
 
-    def _ratecheck(self) -> None:
+    def _reserve_slot(self, request_obj) -> float:
+        """Reserves the next request slot for the endpoint of :request_obj:.
+        Returns the amount of seconds to wait before using it.
+        """
+
+        endpoint = endpoint_of(request_obj.get_path_tail())
+        if self.ratelimit_mode == "eta":
+            seconds = self.limiter.try_acquire(self.token, endpoint)
+            self.instrument.ratelimit_wait(endpoint, seconds)
+            if seconds:
+                raise abstract.TooEarly(seconds)
+            return seconds
+        seconds = self.limiter.reserve(self.token, endpoint)
+        self.instrument.ratelimit_wait(endpoint, seconds)
+        return seconds
+
+    def _ratecheck(self, request_obj) -> None:
         """Checks if the rate limit is exceeded.
-        If it is, sleeps for a random amount of time.
-        """
-
-        last_request = self.last_request
-        # Using a random delay to avoid being rate limited
-        about_minute = random_uniform(60, 65)
-        seconds_since_last_request = (datetime.now() - last_request).total_seconds()
-        request_is_too_early = seconds_since_last_request < about_minute
-        if  request_is_too_early:
-            seconds = about_minute - seconds_since_last_request
-            message = f"Rate limit exceeded. Waiting for {seconds} seconds."
-            print(message)
+        If it is, sleeps until the reserved slot.
+        The wait is reported to the instrument.
+        """
+
+        seconds = self._reserve_slot(request_obj)
+        if seconds:
             sleep(seconds)
 
-        self.last_request = datetime.now()
-            
+    def _prepare(self, request_obj):
+        """Resolves the url, headers and response parser for :request_obj:."""
+
+        url = self.__class__.base_url + request_obj.get_path_tail()
+        request_obj_name = request_obj.__class__.__name__
+        if self.trusted:
+            response_method = self.__class__.trusted_methods[request_obj_name]
+        else:
+            response_method = self.__class__.corresponding_methods[request_obj_name]
+        headers = self.headers.dict(by_alias=True)
+        return url, headers, response_method
+
+    def _send(self, url: str, headers: dict) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def _timed_send(self, endpoint: str, url: str, headers: dict) -> requests.Response:
+        """:_send: reporting the attempt to the instrument."""
+
+        start = perf_counter()
+        try:
+            response = self._send(url, headers)
+        except TRANSIENT_ERRORS:
+            self.instrument.request(endpoint, None, perf_counter() - start, 0)
+            raise
+        self.instrument.request(
+            endpoint, response.status_code, perf_counter() - start, len(response.content)
+        )
+        return response
+
+    def _parse(self, endpoint: str, response: requests.Response, response_method) -> BaseModel:
+        """:_encapsulate: reporting the parsing time of successful responses."""
+
+        start = perf_counter()
+        result = self._encapsulate(response, response_method)
+        self.instrument.parse(endpoint, perf_counter() - start)
+        return result
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        response: Optional[requests.Response] = None,
+        endpoint: str = "",
+        ) -> Optional[float]:
+        """Returns seconds to wait before retrying, or None if giving up.
+        A 429 without Retry-After means the window of :endpoint: is spent,
+        so it waits for the next slot of the limiter, at least one budget period;
+        exponential backoff is for server and transport errors.
+        """
+
+        if attempt >= self.max_retries:
+            return None
+        if response is not None:
+            if response.status_code not in RETRY_STATUSES:
+                return None
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+            if response.status_code == 429:
+                budget = self.limiter.budgets.get(endpoint, Budget())
+                return max(self.limiter.reserve(self.token, endpoint), budget.per / budget.capacity)
+        return min(self.backoff_factor * 2 ** attempt, self.max_backoff)
+
+    @staticmethod
+    def _encapsulate(response: requests.Response, response_method) -> BaseModel:
+        if response.status_code != 200:
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = response.text
+            error = abstract.error_for(response.status_code)
+            raise error(payload, status_code=response.status_code)
+
+        return response_method(models.fast.loads(response.content))
+
     def make_request(self, request_obj) -> BaseModel:
         """Performs a request, specified via :request_obj:.
         Returns a model-encapsulated response object.
         """
 
-        url = self.__class__.base_url + request_obj.get_path_tail()
-        request_obj_name = request_obj.__class__.__name__
-        response_method = self.__class__.corresponding_methods[request_obj_name]
-
-        headers = self.headers.dict(by_alias=True)
+        url, headers, response_method = self._prepare(request_obj)
+        endpoint = endpoint_of(request_obj.get_path_tail())
 
         if self.self_ratelimit:
-            self._ratecheck()
-        response = requests.request("GET", url, headers=headers)
-        if response.status_code != 200: # pragma: no cover
-            raise abstract.ERRORS[response.status_code](response.json())
+            self._ratecheck(request_obj)
+        attempt = 0
+        while True:
+            try:
+                response = self._timed_send(endpoint, url, headers)
+            except TRANSIENT_ERRORS:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response, endpoint)
+                if delay is None:
+                    return self._parse(endpoint, response, response_method)
+            sleep(delay)
+            attempt += 1
+
+
+class AsyncMonoCaller(MonoCaller):
+    """Same contract as :MonoCaller:, but :make_request: is awaitable.
+    Rate limit waits are done with asyncio.sleep, and the blocking
+    HTTP call runs in a thread of :executor:,
+    so one event loop can drive many tokens at once.
+    At most as many requests as the executor has threads are in flight,
+    the rest wait for a free thread.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+        ):
+        """:executor: may be shared between callers, otherwise one with
+        :max_workers: threads (:pool_size: by default) is created and shut down on :close:.
+        The loop's default executor is not used, it has at most min(32, cpus + 4) threads.
+        Other keyword arguments are those of :MonoCaller:.
+        """
 
-        encapsulated = response_method(response.json())
-        return encapsulated
+        super().__init__(token, **kwargs)
+        self.own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers or kwargs.get("pool_size", 10),
+                thread_name_prefix="minimono",
+            )
+        self.executor = executor
+
+    def close(self) -> None:
+        """Releases pooled connections and the executor, if created by the caller."""
+
+        super().close()
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _ratecheck(self, request_obj) -> None: # type: ignore[override]
+        """Checks if the rate limit is exceeded.
+        If it is, suspends the calling task until the reserved slot.
+        """
+
+        seconds = self._reserve_slot(request_obj)
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    async def make_request(self, request_obj) -> BaseModel: # type: ignore[override]
+        """Performs a request, specified via :request_obj:.
+        Returns a model-encapsulated response object.
+        """
+
+        url, headers, response_method = self._prepare(request_obj)
+        endpoint = endpoint_of(request_obj.get_path_tail())
+
+        if self.self_ratelimit:
+            await self._ratecheck(request_obj)
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            try:
+                response = await loop.run_in_executor(
+                    self.executor, partial(self._timed_send, endpoint, url, headers)
+                )
+            except TRANSIENT_ERRORS:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response, endpoint)
+                if delay is None:
+                    return self._parse(endpoint, response, response_method)
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,84 +1,531 @@
+import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional, cast
-from .. import models
-from .api_call import MonoCaller
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union, cast
+from .. import abstract, export, models
+from ..models.enumerators import CurrencyCode
+from ..storage.files import atomic_open, atomic_write, compression, read_file
+from ..storage.search import IndexedStore
+from .api_call import MonoCaller, AsyncMonoCaller
+from .sync import SyncProgress, SyncTracker, request_interval, sync_plan
 
 
 class Client:
 
-    def saveFile(self, filename: Optional[str] = None):
-        """Save user info (including cached accounts) to file."""
+    def saveFile(self, filename: Optional[str] = None, fast: bool = False, indent: Optional[int] = 2):
+        """Save user info (including cached accounts) to file.
+        With a store, cached accounts are kept there instead:
+        only the buckets changed since the last save get written,
+        and the profile file is only rewritten if it changed.
+        The file is replaced atomically, and compressed
+        if :filename: ends with .gz, .bz2 or .xz.
+        :fast: (or no :indent:) writes compact JSON with the trusted encoder,
+        streamed to the file bucket by bucket.
+        """
         if not filename:
             filename = f"{self.user.clientId}.json"
-        jsonified = self.user.json(indent=2, ensure_ascii=False)
-        with open(filename, "w+") as f:
-            f.write(jsonified)
+        exclude = None
+        if self.store is not None:
+            self.store.flush()
+            exclude = {
+                'accounts': {'__all__': {'cached_statement'}},
+                'jars': {'__all__': {'cached_statement'}},
+            }
+        if fast or indent is None:
+            chunks: Iterable[str] = models.fast.iter_dump_user(self.user, exclude_cache=self.store is not None)
+        else:
+            chunks = [self.user.json(indent=indent, ensure_ascii=False, exclude=exclude)]
+        if self.store is None:
+            # The whole cache is in the file, so it's never held as one string
+            with atomic_open(filename) as f:
+                f.writelines(chunks)
+            self._saved = None
+            return
+        jsonified = "".join(chunks)
+        if self._saved == (filename, jsonified) and os.path.exists(filename):
+            return
+        atomic_write(filename, jsonified)
+        self._saved = (filename, jsonified)
 
-    def loadFile(self, file_name: str):
+    def loadFile(self, file_name: str, trusted: bool = False):
+        """Load user info from file, plain or compressed.
+        :trusted: files (written by this library) skip validation.
+        """
         try:
-            valid_extension = file_name.endswith(".json")
+            valid_extension = file_name.endswith(".json") or (
+                compression(file_name) is not None
+                and os.path.splitext(file_name)[0].endswith(".json")
+            )
             if not valid_extension:
                 raise FileNotFoundError
-            with open(file_name, "r") as f:
-                self.user = models.User.parse_raw(f.read())
+            raw = read_file(file_name)
+            if trusted:
+                self.user = models.fast.load_user(raw)
+            else:
+                self.user = models.User.parse_raw(raw)
         except FileNotFoundError as e:
             raise e
+        # Only profiles without the cache are compared on save
+        self._saved = (file_name, raw.decode("utf-8")) if self.store is not None else None
+        if self.store is not None:
+            self.store.absorb(self.providers)
 
     def refreshUser(self):
         """Refresh user info from API. Loses cached accounts."""
         
         self.user = cast(models.User, self.engine.make_request(models.UserInfoReq()))
     
+    def _setup(
+        self,
+        token: str,
+        avoid_ratelimiting: bool,
+        load_file: Optional[str],
+        engine_class: Any,
+        store: Optional[abstract.BucketStoreABC],
+        rates_ttl: float,
+        rates_max_age: Optional[float],
+        engine_options: Dict[str, Any],
+        ) -> None:
+        """Initialization shared with :AsyncClient:, everything but fetching the user."""
+
+        self.store = store
+        self.rates_ttl = rates_ttl
+        self.rates_max_age = rates_max_age
+        self._rates: Optional[models.RateTable] = None
+        self._saved: Optional[Tuple[str, str]] = None
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self.engine = engine_class(token, self_ratelimit=avoid_ratelimiting, **engine_options)
+        if load_file:
+            self.loadFile(load_file)
+
     def __init__(
         self,
         token: str,
         avoid_ratelimiting: bool = True,
         load_file: Optional[str] = None,
-        engine_class: Any = MonoCaller
+        engine_class: Any = MonoCaller,
+        store: Optional[abstract.BucketStoreABC] = None,
+        rates_ttl: float = 300.0,
+        rates_max_age: Optional[float] = None,
+        **engine_options: Any
         ) -> None:
-        """Initialize clients request engine."""
+        """Initialize clients request engine.
+        :store: keeps the cached buckets outside of the user model.
+        :rates_ttl: is how long fetched currency rates are reused, in seconds.
+        :rates_max_age: is how long quotes are used after the bank set them, see :RateTable:.
+        :engine_options: are passed to :engine_class: (pool size, timeouts, retries).
+        """
 
-        self.engine = engine_class(token, self_ratelimit=avoid_ratelimiting)
-        if load_file:
-            self.loadFile(load_file)
-        else:
+        self._setup(token, avoid_ratelimiting, load_file, engine_class, store, rates_ttl, rates_max_age, engine_options)
+        if not load_file:
             self.refreshUser()
         
 
-    def getRates(self) -> models.CurrencyExchange:
-        """Get currency rates."""
+    def getRates(self) -> models.Currencies:
+        """Get currency rates. Always asks the API, see :rates: for the cached table."""
+
+        currencies = cast(models.Currencies, self.engine.make_request(models.CurrRateReq()))
+        self._rates = models.RateTable.from_currencies(currencies, ttl=self.rates_ttl, max_age=self.rates_max_age)
+        return currencies
+
+    def rates(self) -> models.RateTable:
+        """Rate table, fetched again once it's older than :rates_ttl: seconds,
+        or once one of its quotes gets older than :rates_max_age:.
+        """
 
-        return cast(models.CurrencyExchange, self.engine.make_request(models.CurrRateReq()))
+        if self._rates is None or self._rates.expired():
+            self.getRates()
+        return cast(models.RateTable, self._rates)
+
+    def convert(
+        self,
+        statement: models.Statement,
+        target: CurrencyCode = CurrencyCode.usd,
+        ) -> List[int]:
+        """Operation amounts of :statement: in minor units of :target:, at cached rates."""
+
+        return self.rates().convert(statement, target)
 
     def getStatement(
         self,
         account: models.Account,
         from_time=(datetime.now(tz=timezone.utc) - timedelta(days=7)),
-        to_time=datetime.now(tz=timezone.utc)
+        to_time=datetime.now(tz=timezone.utc),
+        refresh: bool = True,
         ) -> models.Statement:
-        return account.getStatement(self.engine, fr=from_time, to=to_time)
+        return account.getStatement(self.engine, fr=from_time, to=to_time, store=self.store, refresh=refresh)
+
+    def _export_rows(
+        self,
+        providers: Sequence[models.CacheableTransactionProvider],
+        fr: datetime,
+        to: datetime,
+        refresh: bool,
+        ) -> Iterator[Tuple[str, models.Transaction]]:
+        for provider in providers:
+            for tx in provider.iterStatement(self.engine, fr, to, self.store, refresh):
+                yield provider.id, tx
+
+    def export(
+        self,
+        out: TextIO,
+        from_time: datetime = models.EARLIEST_DATE,
+        to_time: Optional[datetime] = None,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]] = None,
+        format: str = "ndjson",
+        columns: Optional[Sequence[str]] = None,
+        refresh: bool = True,
+        ) -> int:
+        """Writes the transactions of all accounts and jars (or :providers:) to :out:
+        as NDJSON or CSV, provider after provider, in time order.
+        Missing buckets of a provider are fetched right before it's written,
+        and rows are written one at a time, so the history is never held in memory
+        (given a :store:). Returns the amount of rows written.
+        """
+
+        rows = self._export_rows(
+            self.providers if providers is None else providers,
+            from_time,
+            to_time or datetime.now(tz=timezone.utc),
+            refresh,
+        )
+        return export.write(rows, out, format, columns)
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]] = None,
+        **exact: str,
+        ) -> List[Tuple[str, models.Transaction]]:
+        """Cached transactions with every word of :text: starting a word
+        of their description or comment, and the :exact: counterIban,
+        counterEdrpou or receiptId, as (provider id, transaction) pairs, oldest first.
+        Needs an IndexedStore; nothing is fetched.
+        """
+
+        if not isinstance(self.store, IndexedStore):
+            raise ValueError("Search needs the store to be an IndexedStore.")
+        self.store.index_missing(provider.id for provider in self.providers)
+        ids = None if providers is None else [provider.id for provider in providers]
+        return self.store.search(text, from_time, to_time, ids, **exact)
+
+    def summarize(
+        self,
+        account: models.CacheableTransactionProvider,
+        from_time: datetime,
+        to_time: Optional[datetime] = None,
+        group_by: Optional[str] = None,
+        refresh: bool = True,
+        ) -> Union[models.Summary, Dict[int, models.Summary]]:
+        """Fetches what the cache lacks, then summarizes it, see :CacheableTransactionProvider.summarize:."""
+
+        to_time = to_time or datetime.now(tz=timezone.utc)
+        account.fillCache(self.engine, from_time, to_time, self.store, refresh)
+        return account.summarize(from_time, to_time, self.store, group_by)
+
+    def provider(self, provider_id: str) -> models.CacheableTransactionProvider:
+        """Get account or jar by id."""
+
+        found = self.index['account'].get(provider_id) or self.index['jar'].get(provider_id)
+        if found is None:
+            raise KeyError(f"No account or jar with id {provider_id}.")
+        return found
+
+    def ingest(
+        self,
+        provider_id: str,
+        transaction: models.Transaction,
+        covered_since: Optional[datetime] = None,
+        ) -> models.TxBucket:
+        """Caches a pushed transaction of the account (or jar) :provider_id:.
+        See :TxBucket.insert: for :covered_since:.
+        """
+
+        provider = self.provider(provider_id)
+        return provider.ingest(transaction, self.store, covered_since)
+
+    def persist(self, filename: Optional[str] = None) -> None:
+        """Saves the cache to :filename:, or to the store only.
+        Cheap with a store: only changed buckets, and the profile if it changed, are written.
+        """
+
+        if filename:
+            self.saveFile(filename)
+        elif self.store is not None:
+            self.store.flush()
+
+    def _sync_tracker(
+        self,
+        until: datetime,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]],
+        filename: Optional[str],
+        ) -> SyncTracker:
+        # Without a store every save would rewrite the whole history
+        if filename and self.store is None:
+            raise ValueError("Saving the sync progress to a file needs a store.")
+        jobs = sync_plan(self.providers if providers is None else providers, until, self.store)
+        return SyncTracker(jobs, request_interval(self.engine))
+
+    def _finish_sync_job(
+        self,
+        tracker: SyncTracker,
+        job: Tuple[models.CacheableTransactionProvider, datetime, datetime],
+        filename: Optional[str],
+        on_progress: Optional[Callable[[SyncProgress], Any]],
+        ) -> None:
+        provider, fr, to = job
+        # Still uncovered after a fetch means the API refused the timeframe
+        exhausted = bool(provider.pendingWindows(fr, to, self.store, refresh=False))
+        self.persist(filename)
+        progress = tracker.finish(provider.id, fr, exhausted)
+        if on_progress is not None:
+            on_progress(progress)
+
+    def sync(
+        self,
+        until: datetime = models.EARLIEST_DATE,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]] = None,
+        filename: Optional[str] = None,
+        on_progress: Optional[Callable[[SyncProgress], Any]] = None,
+        ) -> SyncProgress:
+        """Backfills the history of all accounts and jars (or :providers:) back to :until:.
+        Buckets are fetched newest first, round-robin across providers,
+        at the pace of the engine's rate limit.
+        Progress is saved to the store (and the profile to :filename:, which needs one)
+        after every bucket, and cached buckets are skipped, so an interrupted sync
+        resumes where it stopped. :on_progress: gets a SyncProgress after every bucket.
+        """
+
+        tracker = self._sync_tracker(until, providers, filename)
+        for job in tracker:
+            provider, fr, to = job
+            provider.fillCache(self.engine, fr, to, self.store, refresh=False)
+            self._finish_sync_job(tracker, job, filename, on_progress)
+        return tracker.progress
+
+    @property
+    def providers(self) -> List[models.CacheableTransactionProvider]:
+        """All accounts and jars."""
+
+        return [*self.user.accounts, *self.user.jars]
+
+    @property
+    def user(self) -> models.User:
+        return self._user
+
+    @user.setter
+    def user(self, value: models.User) -> None:
+        self._user = value
+        self._index = None
+
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Lookup tables for accounts and jars, rebuilt after the user changes."""
+
+        if self._index is None:
+            accounts: Dict[str, models.Account] = dict()
+            by_type: Dict[str, models.Account] = dict()
+            jars: Dict[str, models.Jar] = dict()
+            for account in self.user.accounts:
+                by_type[account.type.name] = account
+                accounts[account.id] = account
+                if account.iban:
+                    accounts[account.iban] = account
+                for pan in account.maskedPan:
+                    accounts[pan] = account
+            for jar in self.user.jars:
+                jars[jar.title] = jar
+                if jar.sendId:
+                    jars[jar.sendId] = jar
+                jars[jar.id] = jar
+            self._index = {'type': by_type, 'account': accounts, 'jar': jars}
+        return self._index
 
     @property
     def accounts(self) -> Dict[str, models.Account]:
-        """Get accounts."""
-        mapping = {
-            x.type.name: x for x in self.user.accounts
-        }
+        """Get accounts by type."""
 
-        return mapping
+        return self.index['type']
 
-    def __getitem__(self, key: str) -> models.Account:
-        """Get account by type."""
-        acc = self.accounts.get(key)
+    def account(self, key: str) -> models.Account:
+        """Get account by type, id, IBAN or masked PAN."""
+
+        acc = self.index['type'].get(key) or self.index['account'].get(key)
         if acc is None:
             acc_str = ' ,'.join(list(self.accounts.keys()))
             message = f"Account {key} not found. Try one of these: {acc_str}"
             raise KeyError(message)
-        return self.accounts[key]
+        return acc
+
+    def jar(self, key: str) -> models.Jar:
+        """Get jar by id, send id or title."""
+
+        found = self.index['jar'].get(key)
+        if found is None:
+            titles = ' ,'.join(jar.title for jar in self.user.jars)
+            message = f"Jar {key} not found. Try one of these: {titles}"
+            raise KeyError(message)
+        return found
+
+    def __getitem__(self, key: str) -> models.Account:
+        """Get account by type (or any other key of :account:)."""
+
+        return self.account(key)
 
     def __eq__(self, other: Any) -> bool:
         """Compare clients."""
         if not isinstance(other, Client):
             return False
         else:
-            return self.user == other.user
\ No newline at end of file
+            return self.user == other.user
+
+
+class AsyncClient(Client):
+    """Client whose network-bound methods are coroutines.
+    Construct it with :create: when the user has to be fetched from the API.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        avoid_ratelimiting: bool = True,
+        load_file: Optional[str] = None,
+        engine_class: Any = AsyncMonoCaller,
+        store: Optional[abstract.BucketStoreABC] = None,
+        rates_ttl: float = 300.0,
+        rates_max_age: Optional[float] = None,
+        **engine_options: Any
+        ) -> None:
+        """Initialize clients request engine. Doesn't touch the API."""
+
+        self._setup(token, avoid_ratelimiting, load_file, engine_class, store, rates_ttl, rates_max_age, engine_options)
+
+    @classmethod
+    async def create(
+        cls,
+        token: str,
+        avoid_ratelimiting: bool = True,
+        load_file: Optional[str] = None,
+        engine_class: Any = AsyncMonoCaller,
+        store: Optional[abstract.BucketStoreABC] = None,
+        rates_ttl: float = 300.0,
+        rates_max_age: Optional[float] = None,
+        **engine_options: Any
+        ) -> 'AsyncClient':
+        """Initialize the client and fetch the user, unless loaded from file."""
+
+        client = cls(
+            token,
+            avoid_ratelimiting=avoid_ratelimiting,
+            load_file=load_file,
+            engine_class=engine_class,
+            store=store,
+            rates_ttl=rates_ttl,
+            rates_max_age=rates_max_age,
+            **engine_options,
+        )
+        if not load_file:
+            await client.refreshUser()
+        return client
+
+    async def refreshUser(self): # type: ignore[override]
+        """Refresh user info from API. Loses cached accounts."""
+
+        self.user = cast(models.User, await self.engine.make_request(models.UserInfoReq()))
+
+    async def getRates(self) -> models.Currencies: # type: ignore[override]
+        """Get currency rates. Always asks the API, see :rates: for the cached table."""
+
+        currencies = cast(models.Currencies, await self.engine.make_request(models.CurrRateReq()))
+        self._rates = models.RateTable.from_currencies(currencies, ttl=self.rates_ttl, max_age=self.rates_max_age)
+        return currencies
+
+    async def rates(self) -> models.RateTable: # type: ignore[override]
+        """Rate table, fetched again once it's older than :rates_ttl: seconds,
+        or once one of its quotes gets older than :rates_max_age:.
+        """
+
+        if self._rates is None or self._rates.expired():
+            await self.getRates()
+        return cast(models.RateTable, self._rates)
+
+    async def convert( # type: ignore[override]
+        self,
+        statement: models.Statement,
+        target: CurrencyCode = CurrencyCode.usd,
+        ) -> List[int]:
+        """Operation amounts of :statement: in minor units of :target:, at cached rates."""
+
+        return (await self.rates()).convert(statement, target)
+
+    async def sync( # type: ignore[override]
+        self,
+        until: datetime = models.EARLIEST_DATE,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]] = None,
+        filename: Optional[str] = None,
+        on_progress: Optional[Callable[[SyncProgress], Any]] = None,
+        ) -> SyncProgress:
+        """Awaitable :Client.sync:."""
+
+        tracker = self._sync_tracker(until, providers, filename)
+        for job in tracker:
+            provider, fr, to = job
+            await provider.fillCacheAsync(self.engine, fr, to, self.store, refresh=False)
+            self._finish_sync_job(tracker, job, filename, on_progress)
+        return tracker.progress
+
+    async def export( # type: ignore[override]
+        self,
+        out: TextIO,
+        from_time: datetime = models.EARLIEST_DATE,
+        to_time: Optional[datetime] = None,
+        providers: Optional[Sequence[models.CacheableTransactionProvider]] = None,
+        format: str = "ndjson",
+        columns: Optional[Sequence[str]] = None,
+        refresh: bool = True,
+        ) -> int:
+        """Awaitable :Client.export:.
+        Missing buckets of every provider are fetched before the first row is written.
+        """
+
+        to_time = to_time or datetime.now(tz=timezone.utc)
+        providers = self.providers if providers is None else providers
+        for provider in providers:
+            await provider.fillCacheAsync(self.engine, from_time, to_time, self.store, refresh)
+        rows = (
+            (provider.id, tx)
+            for provider in providers
+            for tx in provider._iter_covered(from_time, to_time, self.store)
+        )
+        return export.write(rows, out, format, columns)
+
+    async def summarize( # type: ignore[override]
+        self,
+        account: models.CacheableTransactionProvider,
+        from_time: datetime,
+        to_time: Optional[datetime] = None,
+        group_by: Optional[str] = None,
+        refresh: bool = True,
+        ) -> Union[models.Summary, Dict[int, models.Summary]]:
+        """Awaitable :Client.summarize:."""
+
+        to_time = to_time or datetime.now(tz=timezone.utc)
+        await account.fillCacheAsync(self.engine, from_time, to_time, self.store, refresh)
+        return account.summarize(from_time, to_time, self.store, group_by)
+
+    async def getStatement( # type: ignore[override]
+        self,
+        account: models.Account,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        refresh: bool = True,
+        ) -> models.Statement:
+        now = datetime.now(tz=timezone.utc)
+        if to_time is None:
+            to_time = now
+        if from_time is None:
+            from_time = now - timedelta(days=7)
+        return await account.getStatementAsync(
+            self.engine, fr=from_time, to=to_time, store=self.store, refresh=refresh
+        )
@@ -0,0 +1,216 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .. import abstract
+from .api_call import MonoCaller, make_session
+from .client import Client
+from .ratelimit import RateLimiter, token_key
+
+
+class ClientPool:
+    """Clients for many tokens sharing one HTTP connection pool, one rate limiter
+    (budgets stay per token) and optionally one bucket :store:.
+    Clients are built on first use and evicted when idle or when more
+    than :max_active: are loaded; with :state_dir: their users are saved
+    on eviction and loaded from there instead of the API.
+    Batch operations (:run:) use at most :max_workers: threads,
+    and a token waiting for its rate limit slot doesn't hold a worker.
+    """
+
+    def __init__(
+        self,
+        engine_class: Any = MonoCaller,
+        store: Optional[abstract.BucketStoreABC] = None,
+        state_dir: Optional[str] = None,
+        max_active: int = 100,
+        idle_timeout: float = 300.0,
+        max_workers: int = 8,
+        pool_size: int = 10,
+        limiter: Optional[RateLimiter] = None,
+        **engine_options: Any,
+        ):
+        self.engine_class = engine_class
+        self.store = store
+        self.state_dir = state_dir
+        self.max_active = max_active
+        self.idle_timeout = idle_timeout
+        self.max_workers = max_workers
+        self.session = engine_options.pop("session", None) or make_session(pool_size)
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.engine_options = engine_options
+        self.tokens: Dict[str, str] = dict()
+        self.active: 'OrderedDict[str, Tuple[Client, float]]' = OrderedDict()
+        self.in_use: Set[str] = set()
+        # When the user of a key was last fetched from the API by :_build:
+        self.fetched: Dict[str, float] = dict()
+        self.lock = threading.RLock()
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def add(self, token: str, key: Optional[str] = None) -> str:
+        """Registers :token: without touching the API. Returns its key."""
+
+        key = key or token_key(token)
+        self.tokens[key] = token
+        return key
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            self._evict(key)
+            self.tokens.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _state_file(self, key: str) -> Optional[str]:
+        return os.path.join(self.state_dir, f"{key}.json") if self.state_dir else None
+
+    def _build(self, key: str) -> Client:
+        state_file = self._state_file(key)
+        options = dict(
+            engine_class=self.engine_class,
+            store=self.store,
+            session=self.session,
+            limiter=self.limiter,
+            ratelimit_mode="eta",
+            **self.engine_options,
+        )
+        if state_file and os.path.exists(state_file):
+            return Client(self.tokens[key], load_file=state_file, **options)
+        client = Client(self.tokens[key], **options)
+        self.fetched[key] = monotonic()
+        return client
+
+    def client(self, key: str) -> Client:
+        """The client of :key:, loaded if needed. Marks it as recently used."""
+
+        with self.lock:
+            found = self.active.pop(key, None)
+        # Built without the lock, so slow loads don't hold the other tokens up
+        client = found[0] if found is not None else self._build(key)
+        with self.lock:
+            if key in self.active:
+                client, _ = self.active.pop(key)
+            self.active[key] = (client, monotonic())
+            self._shrink()
+        return client
+
+    def _evict(self, key: str) -> None:
+        client, _ = self.active.pop(key, (None, 0.0))
+        if client is None:
+            return
+        state_file = self._state_file(key)
+        if state_file:
+            client.saveFile(state_file, fast=True)
+
+    def _shrink(self) -> None:
+        for key in list(self.active):
+            if len(self.active) <= self.max_active:
+                break
+            if key not in self.in_use:
+                self._evict(key)
+
+    def evict_idle(self) -> int:
+        """Unloads clients unused for :idle_timeout: seconds. Returns how many."""
+
+        deadline = monotonic() - self.idle_timeout
+        with self.lock:
+            idle = [
+                key for key, (_, used) in self.active.items()
+                if used <= deadline and key not in self.in_use
+            ]
+            for key in idle:
+                self._evict(key)
+        return len(idle)
+
+    def _call(self, key: str, operation: Callable[[str, Client], Any]) -> Any:
+        with self.lock:
+            self.in_use.add(key)
+        try:
+            return operation(key, self.client(key))
+        finally:
+            with self.lock:
+                self.in_use.discard(key)
+                self._shrink()
+
+    def run(
+        self,
+        operation: Callable[[Client], Any],
+        keys: Optional[Iterable[str]] = None,
+        ) -> Dict[str, Any]:
+        """Calls :operation: with the client of every key (all by default).
+        Tokens are served in order; one that's rate limited (TooEarly)
+        is put back until its slot is free, so the others go on meanwhile.
+        Returns results by key; failures are returned as their exceptions.
+        """
+
+        return self._run(lambda key, client: operation(client), keys)
+
+    def _run(
+        self,
+        operation: Callable[[str, Client], Any],
+        keys: Optional[Iterable[str]] = None,
+        ) -> Dict[str, Any]:
+        keys = list(self.tokens if keys is None else keys)
+        queue: List[Tuple[float, int, str]] = [(0.0, index, key) for index, key in enumerate(keys)]
+        results: Dict[str, Any] = dict()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running: Dict[Any, Tuple[int, str]] = dict()
+            while queue or running:
+                now = monotonic()
+                while queue and len(running) < self.max_workers and queue[0][0] <= now:
+                    _, index, key = heappop(queue)
+                    running[executor.submit(self._call, key, operation)] = (index, key)
+                if not running:
+                    sleep(max(queue[0][0] - now, 0.0))
+                    continue
+                timeout = max(queue[0][0] - now, 0.0) if queue and len(running) < self.max_workers else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, key = running.pop(future)
+                    try:
+                        results[key] = future.result()
+                    except abstract.TooEarly as error:
+                        heappush(queue, (monotonic() + error.eta, index, key))
+                    except Exception as error:
+                        results[key] = error
+        return results
+
+    def refreshUsers(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Fetches the user of every token again."""
+
+        started = monotonic()
+
+        def refresh(key: str, client: Client) -> None:
+            # Clients built during this batch were just fetched
+            if self.fetched.get(key, 0.0) < started:
+                client.refreshUser()
+
+        return self._run(refresh, keys)
+
+    def syncRecent(self, days: float = 1, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Brings the last :days: of every account and jar of every token into the cache.
+        Results are SyncProgress objects.
+        """
+
+        until = datetime.now(tz=timezone.utc) - timedelta(days=days)
+        return self.run(lambda client: client.sync(until=until), keys)
+
+    def close(self) -> None:
+        """Evicts (and saves) every client and closes the shared connections."""
+
+        with self.lock:
+            for key in list(self.active):
+                self._evict(key)
+        self.session.close()
+
+    def __enter__(self) -> 'ClientPool':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
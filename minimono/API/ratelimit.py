@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from time import time
+from typing import Callable, Dict, Optional, Tuple
+from pydantic import BaseModel
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None # type: ignore
+
+# (tokens left, unix time of the last update)
+BucketState = Tuple[float, float]
+
+
+class Budget(BaseModel):
+    """:capacity: requests per :per: seconds.
+    :shared: budgets are spent by every token on the host (public endpoints).
+    """
+
+    capacity: float = 1
+    per: float = 62.0
+    shared: bool = False
+
+
+# The API allows one personal call per endpoint per minute, with a small margin.
+DEFAULT_BUDGETS = {
+    "statement": Budget(capacity=1, per=62),
+    "client-info": Budget(capacity=1, per=62),
+    "currency": Budget(capacity=1, per=62, shared=True),
+}
+
+
+def endpoint_of(path_tail: str) -> str:
+    """Maps a request path to its budget name."""
+
+    if path_tail.startswith('/personal/statement'):
+        return "statement"
+    if path_tail.startswith('/personal/client-info'):
+        return "client-info"
+    if path_tail.startswith('/bank/currency'):
+        return "currency"
+    return path_tail
+
+
+def token_key(token: str) -> str:
+    """Stable, non-reversible identifier of a token, safe to write to disk."""
+
+    return sha256(token.encode()).hexdigest()[:16]
+
+
+class LimiterBackendABC(ABC): #pragma: no cover
+    """Holds token bucket states. :update: must be atomic for its scope."""
+
+    @abstractmethod
+    def update(
+        self,
+        key: str,
+        change: Callable[[Optional[BucketState]], Tuple[BucketState, float]],
+        ) -> float: #type: ignore
+        """Replaces the state under :key: with the one :change: returns
+        and passes its result through.
+        """
+        pass
+
+
+class MemoryBackend(LimiterBackendABC):
+    """Process-local state. Thread-safe."""
+
+    def __init__(self):
+        self.states: Dict[str, BucketState] = dict()
+        self.lock = threading.Lock()
+
+    def update(self, key, change):
+        with self.lock:
+            state, result = change(self.states.get(key))
+            self.states[key] = state
+            return result
+
+
+class FileBackend(LimiterBackendABC):
+    """State kept in a small JSON file guarded by flock,
+    so every process on the host shares one budget.
+    Point :path: into /dev/shm to keep it in shared memory.
+    """
+
+    def __init__(self, path: str):
+        if fcntl is None: # pragma: no cover
+            raise RuntimeError("FileBackend needs fcntl (POSIX only).")
+        self.path = path
+        self.lock = threading.Lock()
+
+    def update(self, key, change):
+        with self.lock, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                states = json.loads(raw) if raw else dict()
+                current = states.get(key)
+                state, result = change(tuple(current) if current else None)
+                states[key] = list(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(states))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            return result
+
+
+class RateLimiter:
+    """Token buckets per endpoint and per token.
+    :reserve: books a slot and tells how long to wait for it,
+    :eta: and :try_acquire: never book a slot the caller won't wait for.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[LimiterBackendABC] = None,
+        budgets: Optional[Dict[str, Budget]] = None,
+        clock: Callable[[], float] = time,
+        ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.clock = clock
+
+    def _key(self, token: str, endpoint: str) -> Tuple[str, Budget]:
+        budget = self.budgets.get(endpoint, Budget())
+        scope = "shared" if budget.shared else token_key(token)
+        return f"{scope}:{endpoint}", budget
+
+    def _refill(self, state: Optional[BucketState], budget: Budget, now: float) -> float:
+        if state is None:
+            return budget.capacity
+        tokens, updated = state
+        refilled = tokens + (now - updated) * budget.capacity / budget.per
+        return min(refilled, budget.capacity)
+
+    @staticmethod
+    def _wait(tokens: float, budget: Budget) -> float:
+        """Seconds until the bucket holds a whole token."""
+
+        missing = 1 - tokens
+        return max(missing * budget.per / budget.capacity, 0.0)
+
+    def _run(self, token: str, endpoint: str, consume: Callable[[float], bool]) -> float:
+        key, budget = self._key(token, endpoint)
+        now = self.clock()
+
+        def change(state):
+            tokens = self._refill(state, budget, now)
+            wait = self._wait(tokens, budget)
+            if consume(wait):
+                tokens -= 1
+            return (tokens, now), wait
+
+        return self.backend.update(key, change)
+
+    def reserve(self, token: str, endpoint: str) -> float:
+        """Books the next slot. Returns seconds the caller has to wait for it."""
+
+        return self._run(token, endpoint, lambda wait: True)
+
+    def try_acquire(self, token: str, endpoint: str) -> float:
+        """Takes a slot if one is free right now and returns 0.
+        Otherwise returns the ETA of the next free slot, booking nothing.
+        """
+
+        return self._run(token, endpoint, lambda wait: wait == 0)
+
+    def eta(self, token: str, endpoint: str) -> float:
+        """Seconds until a slot is free, booking nothing."""
+
+        return self._run(token, endpoint, lambda wait: False)
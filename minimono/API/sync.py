@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from itertools import zip_longest
+from typing import Any, Iterator, List, Optional, Sequence, Set, Tuple
+from pydantic import BaseModel
+from .. import abstract, models
+from .ratelimit import Budget
+
+# (provider, from, to) of one bucket to backfill
+SyncJob = Tuple[models.CacheableTransactionProvider, datetime, datetime]
+
+
+class SyncProgress(BaseModel):
+    """State of a backfill after its latest bucket.
+    :eta: is in seconds, estimated from the statement rate limit.
+    """
+
+    provider: Optional[str] = None
+    date: Optional[datetime] = None
+    done: int = 0
+    total: int = 0
+    eta: float = 0.0
+
+
+def sync_plan(
+    providers: Sequence[models.CacheableTransactionProvider],
+    until: datetime = models.EARLIEST_DATE,
+    store: Optional[abstract.BucketStoreABC] = None,
+    ) -> List[SyncJob]:
+    """Buckets back to :until: that aren't cached yet.
+    Newest first, round-robin across :providers:.
+    """
+
+    now = datetime.now(tz=timezone.utc)
+    queues = list()
+    for provider in providers:
+        queue = list()
+        for date in models.construct_bucket_list(fr=until, to=now):
+            fr, to = max(date, until), min(date + models.TIMEBLOCK, now)
+            if fr < to and provider.pendingWindows(fr, to, store, refresh=False):
+                queue.append((provider, fr, to))
+        queues.append(queue)
+    return [job for jobs in zip_longest(*queues) for job in jobs if job is not None]
+
+
+def request_interval(engine: Any) -> float:
+    """Seconds between the statement requests :engine: is allowed to make."""
+
+    limiter = getattr(engine, "limiter", None)
+    if limiter is None or not getattr(engine, "self_ratelimit", False):
+        return 0.0
+    budget = limiter.budgets.get("statement", Budget())
+    return budget.per / budget.capacity
+
+
+class SyncTracker:
+    """Walks the jobs of a backfill and keeps its progress.
+    Providers whose older history the API refuses are dropped.
+    """
+
+    def __init__(self, jobs: List[SyncJob], interval: float = 0.0):
+        self.jobs = jobs
+        self.interval = interval
+        self.exhausted: Set[str] = set()
+        self.position = 0
+        self.progress = SyncProgress(total=len(jobs), eta=len(jobs) * interval)
+
+    def __iter__(self) -> Iterator[SyncJob]:
+        for self.position, job in enumerate(self.jobs):
+            if job[0].id not in self.exhausted:
+                yield job
+
+    def finish(self, provider_id: str, date: datetime, exhausted: bool = False) -> SyncProgress:
+        """Records the job at the current position as done."""
+
+        if exhausted:
+            self.exhausted.add(provider_id)
+        remaining = sum(
+            1 for job in self.jobs[self.position + 1:] if job[0].id not in self.exhausted
+        )
+        done = self.progress.done + 1
+        self.progress = SyncProgress(
+            provider=provider_id,
+            date=date,
+            done=done,
+            total=done + remaining,
+            eta=remaining * self.interval,
+        )
+        return self.progress
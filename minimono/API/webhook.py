@@ -0,0 +1,107 @@
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Optional, Tuple
+from pydantic import ValidationError
+from .. import models
+
+
+class _Handler(BaseHTTPRequestHandler):
+    receiver: 'WebhookReceiver'
+
+    def _reply(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        # The API checks the url with a GET before pushing to it
+        self._reply(200 if self.path == self.receiver.path else 404)
+
+    def do_POST(self) -> None:
+        if self.path != self.receiver.path:
+            self._reply(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        self._reply(self.receiver.handle(self.rfile.read(length)))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class WebhookReceiver:
+    """Small HTTP server that caches the transactions the API pushes,
+    in the client's store or :cached_statement:, deduplicated by id.
+    After every push the cache is saved to :filename: (or the store is flushed).
+    With :complete:, every transaction since the start is trusted to arrive here,
+    so open buckets covered until then are extended without polling.
+    Use :start: to run it in a background thread, or :serve_forever:.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        path: str = "/",
+        filename: Optional[str] = None,
+        complete: bool = False,
+        ):
+        self.client = client
+        self.path = path
+        self.filename = filename
+        self.started = datetime.now(tz=timezone.utc)
+        self.complete = complete
+        self.received = 0
+        self.lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"receiver": self})
+        self.server = HTTPServer((host, port), handler)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def handle(self, body: bytes) -> int:
+        """Caches the transaction pushed in :body:. Returns the HTTP status."""
+
+        try:
+            event = models.WebhookEvent.parse_raw(body)
+        except ValidationError:
+            return 400
+        if event.type != "StatementItem":
+            return 200
+        covered_since = self.started if self.complete else None
+        with self.lock:
+            try:
+                self.client.ingest(event.data.account, event.data.statementItem, covered_since)
+            except KeyError:
+                # Not an account of this client, nothing to retry
+                return 200
+            self.client.persist(self.filename)
+            self.received += 1
+        return 200
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def start(self) -> 'WebhookReceiver':
+        """Serves in a daemon thread."""
+
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.server.server_close()
+
+    def __enter__(self) -> 'WebhookReceiver':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -1,3 +1,32 @@
-from .API import Client as Client
-from . import models as models
-from . import abstract as abstract
\ No newline at end of file
+"""Submodules are imported on first access, so the CLI starts
+without loading pydantic, requests or numpy until a command needs them.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING: # pragma: no cover
+    from .API import Client as Client
+    from .API import AsyncClient as AsyncClient
+    from . import models as models
+    from . import abstract as abstract
+
+_LAZY = {
+    "Client": (".API", "Client"),
+    "AsyncClient": (".API", "AsyncClient"),
+    "models": (".models", None),
+    "abstract": (".abstract", None),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY[name]
+    module = import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
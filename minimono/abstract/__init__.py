@@ -1,7 +1,14 @@
 from .caller_elements import MonoCallerABC as MonoCallerABC
 from .caller_elements import RequestObjectABC as RequestObjectABC
 from .caller_elements import BadRequest as BadRequest
+from .caller_elements import APIError as APIError
 from .caller_elements import RateLimited as RateLimited
+from .caller_elements import TooEarly as TooEarly
 from .caller_elements import NotFound as NotFound
 from .caller_elements import TimeConstraintError as TimeConstraintError
-from .caller_elements import ERRORS as ERRORS
\ No newline at end of file
+from .caller_elements import ServerError as ServerError
+from .caller_elements import ERRORS as ERRORS
+from .caller_elements import error_for as error_for
+from .storage_elements import BucketStoreABC as BucketStoreABC
+from .instrument_elements import InstrumentABC as InstrumentABC
+from .instrument_elements import NullInstrument as NullInstrument
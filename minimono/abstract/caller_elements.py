@@ -1,13 +1,36 @@
 from abc import ABC, abstractclassmethod, abstractmethod
 from pydantic import BaseModel
+from .instrument_elements import InstrumentABC, NullInstrument
 
-class RateLimited(Exception):
+class APIError(Exception):
+    """Any non-200 response from the API.
+    Raised as is for status codes without a dedicated subclass.
+    """
+
+    def __init__(self, payload=None, status_code=None):
+        super().__init__(payload)
+        self.payload = payload
+        self.status_code = status_code
+
+class RateLimited(APIError):
+    pass
+
+class TooEarly(RateLimited):
+    """Raised instead of waiting when the local rate limiter has no free slot.
+    :eta: is the amount of seconds until the next one.
+    """
+
+    def __init__(self, eta: float):
+        super().__init__(f"Next request slot in {eta:.1f} seconds.")
+        self.eta = eta
+
+class NotFound(APIError):
     pass
 
-class NotFound(Exception):
+class BadRequest(APIError):
     pass
 
-class BadRequest(Exception):
+class ServerError(APIError):
     pass
 
 class TimeConstraintError(Exception):
@@ -20,6 +43,16 @@ ERRORS = {
 }
 
 
+def error_for(status_code: int) -> type:
+    """Returns the exception class for an unsuccessful :status_code:."""
+
+    if status_code in ERRORS:
+        return ERRORS[status_code]
+    if status_code >= 500:
+        return ServerError
+    return APIError
+
+
 class RequestObjectABC(ABC): #pragma: no cover
     
     @abstractmethod
@@ -28,6 +61,8 @@ class RequestObjectABC(ABC): #pragma: no cover
 
 class MonoCallerABC(ABC): #pragma: no cover
 
+    instrument: InstrumentABC = NullInstrument()
+
     @abstractclassmethod
     def make_request(self, request_obj: RequestObjectABC) -> BaseModel: #type: ignore
         pass
\ No newline at end of file
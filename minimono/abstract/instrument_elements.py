@@ -0,0 +1,34 @@
+from abc import ABC
+from typing import Optional
+
+
+class InstrumentABC(ABC): #pragma: no cover
+    """Receives measurements from engines and transaction providers.
+    Every hook is a no-op here, so sinks override only what they need.
+    Hooks may be called from several threads at once.
+    """
+
+    def request(self, endpoint: str, status: Optional[int], seconds: float, received: int) -> None:
+        """An HTTP attempt finished. :status: is None if the connection failed.
+        :received: is the size of the response body in bytes.
+        """
+        pass
+
+    def ratelimit_wait(self, endpoint: str, seconds: float) -> None:
+        """A request had to wait :seconds: for its rate limit slot.
+        In the "eta" rate limit mode it was refused with TooEarly instead.
+        """
+        pass
+
+    def parse(self, endpoint: str, seconds: float) -> None:
+        """A response body was decoded and validated in :seconds:."""
+        pass
+
+    def cache(self, provider_id: str, hits: int, misses: int) -> None:
+        """A statement needed :misses: buckets fetched, :hits: came from the cache."""
+        pass
+
+
+class NullInstrument(InstrumentABC):
+    """The default: measures nothing."""
+    pass
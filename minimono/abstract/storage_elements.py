@@ -0,0 +1,89 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class BucketStoreABC(ABC): #pragma: no cover
+    """Keeps TxBuckets of many transaction providers (accounts and jars),
+    keyed by provider id and bucket date.
+    """
+
+    @abstractmethod
+    def has_bucket(self, provider_id: str, date: datetime) -> bool: #type: ignore
+        pass
+
+    @abstractmethod
+    def get_bucket(self, provider_id: str, date: datetime): #type: ignore
+        """Returns the TxBucket or None."""
+        pass
+
+    @abstractmethod
+    def put_bucket(self, provider_id: str, bucket) -> None: #type: ignore
+        """Stores a TxBucket, replacing the one with the same date."""
+        pass
+
+    @abstractmethod
+    def bucket_dates(self, provider_id: str) -> Sequence[datetime]: #type: ignore
+        """Dates of the stored buckets, oldest first."""
+        pass
+
+    def coverage(self, provider_id: str, date: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """The fetched part of the stored bucket, None if there's no bucket.
+        Stores that keep it apart from the rows should override this.
+        """
+
+        bucket = self.get_bucket(provider_id, date)
+        return bucket.coverage if bucket is not None else None
+
+    def aggregates(self, provider_id: str, date: datetime):
+        """Aggregates of the whole stored bucket, None if there's no bucket.
+        Stores that keep them apart from the rows should override this.
+        """
+
+        bucket = self.get_bucket(provider_id, date)
+        return bucket.aggregate() if bucket is not None else None
+
+    def oldest_hold(self, provider_id: str, date: datetime, fr: datetime, to: datetime) -> Optional[datetime]:
+        """Time of the oldest unsettled hold between :fr: and :to: in the stored bucket,
+        None if there's none. Stores that can find it without loading the rows should override this.
+        """
+
+        bucket = self.get_bucket(provider_id, date)
+        return bucket.oldest_hold(fr, to) if bucket is not None else None
+
+    def iter_query(self, provider_id: str, fr: datetime, to: datetime) -> Iterator:
+        """Yields transactions between :fr: and :to:, oldest first.
+        Only buckets overlapping the range are read.
+        """
+
+        dates = self.bucket_dates(provider_id)
+        # Buckets don't overlap, so the last one starting before :fr: is the first relevant
+        first = max(bisect_right(dates, fr) - 1, 0)
+        for date in dates[first:]:
+            if date > to:
+                break
+            bucket = self.get_bucket(provider_id, date)
+            if bucket is not None:
+                yield from bucket.slice(fr, to)
+
+    def query(self, provider_id: str, fr: datetime, to: datetime) -> List:
+        """Transactions between :fr: and :to:, oldest first."""
+
+        return list(self.iter_query(provider_id, fr, to))
+
+    def absorb(self, providers: Iterable) -> None:
+        """Moves the in-memory cached buckets of :providers: into the store."""
+
+        for provider in providers:
+            for bucket in provider.cached_statement.values():
+                self.put_bucket(provider.id, bucket)
+            provider.cached_statement.clear()
+
+    def flush(self) -> int:
+        """Persists pending changes. Returns the amount of buckets written."""
+
+        return 0
+
+    def close(self) -> None:
+        pass
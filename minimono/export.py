@@ -0,0 +1,66 @@
+"""Streaming export of transactions as NDJSON or CSV, one row at a time."""
+import csv
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO, Tuple
+
+# Columns of Transaction.getReduced
+REDUCED = ("id", "time", "description", "mcc", "amount")
+ALL = (
+    "id", "time", "description", "mcc", "hold", "amount", "operationAmount",
+    "currencyCode", "commissionRate", "cashbackAmount", "balance",
+    "receiptId", "comment", "counterEdrpou", "counterIban",
+)
+FORMATS = ("ndjson", "csv")
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def records(
+    rows: Iterable[Tuple[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    ) -> Iterable[Dict[str, Any]]:
+    """Plain dicts of (account id, transaction) :rows:, with the account first.
+    Without :columns: a row is `Transaction.getReduced`.
+    """
+
+    for account, tx in rows:
+        fields = tx.getReduced() if columns is None else {name: getattr(tx, name) for name in columns}
+        yield {"account": account, **{name: _plain(value) for name, value in fields.items()}}
+
+
+def write(
+    rows: Iterable[Tuple[str, Any]],
+    out: TextIO,
+    format: str = "ndjson",
+    columns: Optional[Sequence[str]] = None,
+    ) -> int:
+    """Writes (account id, transaction) :rows: to :out: as they come.
+    Returns the amount of rows written.
+    """
+
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format}, expected one of {', '.join(FORMATS)}.")
+    unknown = set(columns or ()) - set(ALL)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}.")
+    written = 0
+    if format == "csv":
+        writer = csv.DictWriter(out, fieldnames=["account", *(columns or REDUCED)])
+        writer.writeheader()
+        for record in records(rows, columns):
+            writer.writerow(record)
+            written += 1
+    else:
+        for record in records(rows, columns):
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+            written += 1
+    return written
@@ -0,0 +1,168 @@
+"""Instruments for engines: pass one as `instrument=` to MonoCaller or Client."""
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+from .abstract import InstrumentABC, NullInstrument
+
+# Seconds; the last bucket of every histogram is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+WAIT_BUCKETS = (0.1, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Cumulative-on-export histogram, as Prometheus defines it."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, observations up to it) pairs, ending with +Inf."""
+
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        running, pairs = 0, list()
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: object) -> str:
+    inner = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + inner + "}" if inner else ""
+
+
+class PrometheusInstrument(InstrumentABC):
+    """Aggregates measurements in memory.
+    :prometheus: renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "minimono"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.parsing: Dict[str, Histogram] = defaultdict(Histogram)
+        self.waits: Dict[str, Histogram] = defaultdict(lambda: Histogram(WAIT_BUCKETS))
+        self.received: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def request(self, endpoint, status, seconds, received):
+        with self.lock:
+            self.latency[endpoint].observe(seconds)
+            self.received[endpoint] += received
+            self.statuses[(endpoint, "error" if status is None else str(status))] += 1
+
+    def ratelimit_wait(self, endpoint, seconds):
+        with self.lock:
+            self.waits[endpoint].observe(seconds)
+
+    def parse(self, endpoint, seconds):
+        with self.lock:
+            self.parsing[endpoint].observe(seconds)
+
+    def cache(self, provider_id, hits, misses):
+        with self.lock:
+            self.hits[provider_id] += hits
+            self.misses[provider_id] += misses
+
+    def _histograms(self, lines: List[str], name: str, help: str, histograms: Dict[str, Histogram]) -> None:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+        for endpoint, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(f"{name}_bucket{_labels(endpoint=endpoint, le=bound)} {count}")
+            lines.append(f"{name}_sum{_labels(endpoint=endpoint)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(endpoint=endpoint)} {histogram.count}")
+
+    def _counters(self, lines: List[str], name: str, help: str, values: Dict[Tuple[Tuple[str, str], ...], int]) -> None:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{_labels(**dict(labels))} {value}")
+
+    def prometheus(self) -> str:
+        p = self.prefix
+        lines: List[str] = list()
+        with self.lock:
+            self._histograms(lines, f"{p}_request_seconds", "HTTP attempt latency.", self.latency)
+            self._histograms(lines, f"{p}_parse_seconds", "Response decoding and validation time.", self.parsing)
+            self._histograms(lines, f"{p}_ratelimit_wait_seconds", "Time spent waiting for a rate limit slot.", self.waits)
+            self._counters(lines, f"{p}_received_bytes_total", "Response bytes received.", {
+                (("endpoint", endpoint),): value for endpoint, value in self.received.items()
+            })
+            self._counters(lines, f"{p}_responses_total", "Responses by status code.", {
+                (("endpoint", endpoint), ("status", status)): value
+                for (endpoint, status), value in self.statuses.items()
+            })
+            self._counters(lines, f"{p}_bucket_hits_total", "Buckets served from the cache.", {
+                (("provider", provider),): value for provider, value in self.hits.items()
+            })
+            self._counters(lines, f"{p}_bucket_misses_total", "Buckets that had to be fetched.", {
+                (("provider", provider),): value for provider, value in self.misses.items()
+            })
+        return "\n".join(lines) + "\n"
+
+
+class LoggingInstrument(InstrumentABC):
+    """Logs every measurement as a structured record.
+    The fields are in the record's `minimono` attribute (and in the message as key=value),
+    so JSON formatters can pick them up.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger("minimono")
+        self.level = level
+
+    def _log(self, event: str, **fields: object) -> None:
+        if self.logger.isEnabledFor(self.level):
+            message = " ".join([event, *(f"{name}={value}" for name, value in fields.items())])
+            self.logger.log(self.level, message, extra={"minimono": {"event": event, **fields}})
+
+    def request(self, endpoint, status, seconds, received):
+        self._log("request", endpoint=endpoint, status=status, seconds=round(seconds, 6), received=received)
+
+    def ratelimit_wait(self, endpoint, seconds):
+        if seconds:
+            self._log("ratelimit_wait", endpoint=endpoint, seconds=round(seconds, 3))
+
+    def parse(self, endpoint, seconds):
+        self._log("parse", endpoint=endpoint, seconds=round(seconds, 6))
+
+    def cache(self, provider_id, hits, misses):
+        self._log("cache", provider=provider_id, hits=hits, misses=misses)
+
+
+class MultiInstrument(InstrumentABC):
+    """Passes every measurement to all of :instruments:."""
+
+    def __init__(self, *instruments: InstrumentABC):
+        self.instruments = instruments
+
+    def request(self, endpoint, status, seconds, received):
+        for instrument in self.instruments:
+            instrument.request(endpoint, status, seconds, received)
+
+    def ratelimit_wait(self, endpoint, seconds):
+        for instrument in self.instruments:
+            instrument.ratelimit_wait(endpoint, seconds)
+
+    def parse(self, endpoint, seconds):
+        for instrument in self.instruments:
+            instrument.parse(endpoint, seconds)
+
+    def cache(self, provider_id, hits, misses):
+        for instrument in self.instruments:
+            instrument.cache(provider_id, hits, misses)
@@ -1,4 +1,6 @@
 from .models import Account as Account
+from .models import Jar as Jar
+from .models import CacheableTransactionProvider as CacheableTransactionProvider
 from .models import Transaction as Transaction
 from .models import User as User
 from .models import Statement as Statement
@@ -9,5 +11,19 @@ from .models import StatementReq as StatementReq
 from .models import UserInfoReq as UserInfoReq
 from .models import CurrRateReq as CurrRateReq
 from .models import TxBucket as TxBucket
-from .models import construct_bucket_list as construct_bucket_list
-from .utility import align_datetime, default_timeframe, construct_bucket_list, TIMEBLOCK
\ No newline at end of file
+from .models import Summary as Summary
+from .models import Aggregates as Aggregates
+from .models import WebhookEvent as WebhookEvent
+from . import fast as fast
+from .table import TransactionTable as TransactionTable
+from .rates import RateTable as RateTable
+from .utility import (
+    align_datetime as align_datetime,
+    default_timeframe as default_timeframe,
+    construct_bucket_list as construct_bucket_list,
+    plan_windows as plan_windows,
+    TIMEBLOCK as TIMEBLOCK,
+    MAX_ROWS as MAX_ROWS,
+    EARLIEST_DATE as EARLIEST_DATE,
+    SETTLE_HORIZON as SETTLE_HORIZON,
+)
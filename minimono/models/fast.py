@@ -0,0 +1,225 @@
+"""Trusted fast path: builds models without per-field validation.
+Only for data whose shape is known to be right,
+e.g. files written by :dump_user: or `User.json`, and API responses.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Union
+from .enumerators import CardType, CashbackType, CurrencyCode
+from .models import (
+    Account,
+    Aggregates,
+    CurrencyExchange,
+    Currencies,
+    Jar,
+    Statement,
+    Transaction,
+    TxBucket,
+    User,
+    _ascending,
+)
+
+try:
+    import orjson
+except ImportError: # pragma: no cover
+    orjson = None # type: ignore
+
+TRANSACTION_FIELDS = frozenset(Transaction.__fields__)
+ACCOUNT_FIELDS = frozenset(Account.__fields__)
+JAR_FIELDS = frozenset(Jar.__fields__)
+USER_FIELDS = frozenset(User.__fields__)
+CURRENCY_FIELDS = frozenset(CurrencyExchange.__fields__)
+
+
+def loads(raw: Union[str, bytes]) -> Any:
+    """Decodes JSON with orjson if it's installed."""
+
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(obj: Any) -> str:
+    """Encodes JSON with orjson if it's installed. Datetimes become ISO strings."""
+
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, default=_isoformat)
+
+
+def _isoformat(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _datetime(value: Union[int, float, str, datetime]) -> datetime:
+    """Unix time (as the API sends it) or ISO string (as caches store it)."""
+
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def transaction(raw: Dict[str, Any]) -> Transaction:
+    fields = {key: value for key, value in raw.items() if key in TRANSACTION_FIELDS}
+    fields["time"] = _datetime(fields["time"])
+    fields["currencyCode"] = CurrencyCode(fields["currencyCode"])
+    return Transaction.construct(**fields)
+
+
+def transactions(rows: Iterable[Dict[str, Any]]) -> List[Transaction]:
+    return [transaction(row) for row in rows]
+
+
+def statement(rows: Iterable[Dict[str, Any]]) -> Statement:
+    """Statement from raw API rows, without validation."""
+
+    parsed = transactions(rows)
+    timeframe = (parsed[0].time, parsed[-1].time) if parsed else []
+    return Statement.construct(transactions=parsed, timeframe=timeframe)
+
+
+def bucket(raw: Dict[str, Any]) -> TxBucket:
+    """TxBucket as stored by `TxBucket.json`. The date must be aligned already."""
+
+    covered_from = raw.get("covered_from")
+    covered_until = raw.get("covered_until")
+    aggregates = raw.get("aggregates")
+    return TxBucket.construct(
+        date=_datetime(raw["date"]),
+        transactions=list(_ascending(transactions(raw["transactions"]))),
+        covered_from=_datetime(covered_from) if covered_from is not None else None,
+        covered_until=_datetime(covered_until) if covered_until is not None else None,
+        # A handful of summaries per bucket, cheap to validate
+        aggregates=Aggregates.parse_obj(aggregates) if aggregates is not None else None,
+    )
+
+
+def _provider_fields(raw: Dict[str, Any], known: frozenset) -> Dict[str, Any]:
+    fields = {key: value for key, value in raw.items() if key in known}
+    fields["currencyCode"] = CurrencyCode(fields["currencyCode"])
+    fields["cached_statement"] = {
+        key: bucket(value) for key, value in fields.get("cached_statement", {}).items()
+    }
+    return fields
+
+
+def account(raw: Dict[str, Any]) -> Account:
+    fields = _provider_fields(raw, ACCOUNT_FIELDS)
+    card_type = fields["type"]
+    # Raw API "black" cards are typed by their currency, as in Account.coerce_right_type
+    if card_type == CardType.black.value and fields["currencyCode"] != CurrencyCode.uah:
+        card_type = CardType.eur if fields["currencyCode"] == CurrencyCode.eur else CardType.usd
+    fields["type"] = CardType(card_type)
+    fields["cashbackType"] = CashbackType(fields["cashbackType"])
+    return Account.construct(**fields)
+
+
+def jar(raw: Dict[str, Any]) -> Jar:
+    return Jar.construct(**_provider_fields(raw, JAR_FIELDS))
+
+
+def user(raw: Dict[str, Any]) -> User:
+    fields = {key: value for key, value in raw.items() if key in USER_FIELDS}
+    fields["accounts"] = [account(item) for item in fields["accounts"]]
+    fields["jars"] = [jar(item) for item in fields["jars"]]
+    if not fields.get("webHookURL"):
+        fields["webHookURL"] = None
+    else:
+        # Urls are rare and cheap, so they still go through pydantic
+        fields["webHookURL"] = User.__fields__["webHookURL"].validate(
+            fields["webHookURL"], {}, loc="webHookURL", cls=User
+        )[0]
+    return User.construct(**fields)
+
+
+def currencies(rows: Iterable[Dict[str, Any]]) -> Currencies:
+    rates = list()
+    for row in rows:
+        fields = {key: value for key, value in row.items() if key in CURRENCY_FIELDS}
+        fields["date"] = _datetime(fields["date"])
+        rates.append(CurrencyExchange.construct(**fields))
+    return Currencies.construct(rates=rates)
+
+
+def load_user(raw: Union[str, bytes]) -> User:
+    """Trusted counterpart of `User.parse_raw`."""
+
+    return user(loads(raw))
+
+
+def _dump_transaction(tx: Transaction) -> Dict[str, Any]:
+    fields = dict(tx.__dict__)
+    fields["currencyCode"] = int(tx.currencyCode)
+    return fields
+
+
+def _provider_head(provider) -> Dict[str, Any]:
+    fields = dict(provider.__dict__)
+    fields["currencyCode"] = int(provider.currencyCode)
+    for name in ("type", "cashbackType"):
+        if name in fields:
+            fields[name] = fields[name].value
+    del fields["cached_statement"]
+    return fields
+
+
+def _iter_provider(provider, exclude_cache: bool) -> Iterator[str]:
+    head = dumps(_provider_head(provider))
+    if exclude_cache:
+        yield head
+        return
+    # The cache goes last, one bucket at a time
+    yield head[:-1] + ', "cached_statement": {'
+    for position, (key, value) in enumerate(provider.cached_statement.items()):
+        yield (", " if position else "") + dumps(key) + ": " + dump_bucket(value)
+    yield "}}"
+
+
+def iter_dump_user(value: User, exclude_cache: bool = False) -> Iterator[str]:
+    """:dump_user: in chunks of at most one bucket, for writing to a file as it's encoded."""
+
+    fields = {key: item for key, item in value.__dict__.items() if key not in ("accounts", "jars")}
+    if fields.get("webHookURL") is not None:
+        fields["webHookURL"] = str(fields["webHookURL"])
+    head = dumps(fields)
+    yield head[:-1]
+    for name in ("accounts", "jars"):
+        yield f', "{name}": ['
+        for index, provider in enumerate(getattr(value, name)):
+            if index:
+                yield ", "
+            yield from _iter_provider(provider, exclude_cache)
+        yield "]"
+    yield "}"
+
+
+def dump_user(value: User, exclude_cache: bool = False) -> str:
+    """Compact JSON of :value:, readable by both `User.parse_raw` and :load_user:."""
+
+    return "".join(iter_dump_user(value, exclude_cache))
+
+
+def _bucket_fields(value: TxBucket) -> Dict[str, Any]:
+    return {
+        "transactions": [_dump_transaction(tx) for tx in value.transactions],
+        "date": value.date,
+        "covered_from": value.covered_from,
+        "covered_until": value.covered_until,
+        "aggregates": _aggregate_fields(value.aggregates) if value.aggregates is not None else None,
+    }
+
+
+def _aggregate_fields(value: Aggregates) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {"total": value.total.dict()}
+    # JSON keys are strings
+    for group in Aggregates.GROUPS:
+        fields[group] = {str(key): summary.dict() for key, summary in getattr(value, group).items()}
+    return fields
+
+
+def dump_bucket(value: TxBucket) -> str:
+    return dumps(_bucket_fields(value))
@@ -1,8 +1,16 @@
+from bisect import bisect_left, bisect_right
+from heapq import merge as heap_merge
+from itertools import islice
 from typing import (
     Any,
+    ClassVar,
     Dict,
+    Generator,
+    Iterable,
     Iterator,
+    List,
     Sequence,
+    Tuple,
     Union,
     Optional,
     cast
@@ -12,16 +20,22 @@ from pydantic import(
     BaseModel,
     AnyHttpUrl,
     Field,
+    PrivateAttr,
     root_validator,
     validator
     )
 from datetime import datetime, timedelta, timezone
 from .enumerators import CardType, CashbackType, CurrencyCode, enum_encoders
 from ..abstract.caller_elements import BadRequest, RequestObjectABC, MonoCallerABC
+from ..abstract.storage_elements import BucketStoreABC
+from ..abstract.instrument_elements import InstrumentABC
 from .utility import (
     align_datetime,
     default_timeframe,
     construct_bucket_list,
+    plan_windows,
+    MAX_ROWS,
+    SETTLE_HORIZON,
     TIMEBLOCK
     )
 
@@ -115,9 +129,7 @@ class Transaction(BaseModel):
 
     def __add__(self, other: Union[Self, 'Statement']) -> 'Statement':
         if isinstance(other, type(self)):
-            both = [self, other]
-            both.sort(key=lambda x: x.time)
-            return Statement(transactions=both)
+            return Statement.merge([self], [other])
         else:
             try:
                 # In case adding a Statement
@@ -129,6 +141,36 @@ class Transaction(BaseModel):
         return hash(self.id)
 
 
+def _time(tx: Transaction) -> datetime:
+    return tx.time
+
+
+def _ascending(source: Iterable[Transaction]) -> Sequence[Transaction]:
+    """Returns :source: in time order. Sorted and strictly reverse-sorted
+    (as the API sends them) sequences cost a single linear pass.
+    """
+
+    if isinstance(source, TransactionArray):
+        source = source.transactions
+    elif not isinstance(source, Sequence):
+        source = list(source)
+    following = islice(source, 1, None)
+    if all(a.time <= b.time for a, b in zip(source, following)):
+        return source
+    following = islice(source, 1, None)
+    if all(a.time > b.time for a, b in zip(source, following)):
+        return source[::-1]
+    return sorted(source, key=_time)
+
+
+def _unique(transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+    seen = set()
+    for tx in transactions:
+        if tx.id not in seen:
+            seen.add(tx.id)
+            yield tx
+
+
 class TransactionArray(BaseModel):
 
     class Config:
@@ -173,31 +215,273 @@ class Statement(TransactionArray):
             values['timeframe'] = (start, end)
         return values
         
+    @classmethod
+    def iterMerge(
+        cls,
+        *sources: Iterable[Transaction],
+        dedupe: bool = False,
+        ) -> Iterator[Transaction]:
+        """Lazily merges time-sorted :sources: (statements, buckets or lists).
+        Linear in the total length; no intermediate statements are built.
+        :dedupe: drops transactions whose id was already yielded.
+        """
+
+        merged = heap_merge(*(_ascending(source) for source in sources), key=_time)
+        if not dedupe:
+            return merged
+        return _unique(merged)
+
+    @classmethod
+    def merge(
+        cls,
+        *sources: Iterable[Transaction],
+        dedupe: bool = False,
+        ) -> 'Statement':
+        """Merges time-sorted :sources: into one statement without revalidating them."""
+
+        transactions = list(cls.iterMerge(*sources, dedupe=dedupe))
+        timeframe = (transactions[0].time, transactions[-1].time) if transactions else []
+        return cls.construct(transactions=transactions, timeframe=timeframe)
+
     def __add__(self, other: Union[Self, 'Transaction']) -> Self:
         """Add two statements."""
         if isinstance(other, type(self)):
-            tx = list(self.transactions) + list(other.transactions)
+            return self.merge(self, other)
         elif isinstance(other, Transaction):
-            tx = list(self.transactions) + [other,]
+            return self.merge(self, [other,])
         else:
             raise TypeError("Can only add Transaction or Statement to Statement")
-        tx.sort(key=lambda x: x.time)
-        return Statement(transactions=tx)
 
     def to_dict(self) -> dict:
         """Returns a dictionary with Transaction ids as keys and Transaction objects as values."""
 
         return {item.id: item for item in self.transactions}
-    
+
+
+def _least(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _most(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return b if a is None else a if b is None else max(a, b)
+
+
+class Summary(BaseModel):
+    """Totals of a set of transactions. Amounts are in minor units of the account."""
+
+    count: int = 0
+    amount: int = 0
+    income: int = 0
+    expense: int = 0
+    cashbackAmount: int = 0
+    commissionRate: int = 0
+    minBalance: Optional[int] = None
+    maxBalance: Optional[int] = None
+
+    def add(self, tx: Transaction) -> None:
+        """Counts :tx: in, in place."""
+
+        self.count += 1
+        self.amount += tx.amount
+        if tx.amount > 0:
+            self.income += tx.amount
+        else:
+            self.expense += tx.amount
+        self.cashbackAmount += tx.cashbackAmount
+        self.commissionRate += tx.commissionRate
+        self.minBalance = _least(self.minBalance, tx.balance)
+        self.maxBalance = _most(self.maxBalance, tx.balance)
+
+    def __add__(self, other: 'Summary') -> 'Summary':
+        return Summary.construct(
+            count=self.count + other.count,
+            amount=self.amount + other.amount,
+            income=self.income + other.income,
+            expense=self.expense + other.expense,
+            cashbackAmount=self.cashbackAmount + other.cashbackAmount,
+            commissionRate=self.commissionRate + other.commissionRate,
+            minBalance=_least(self.minBalance, other.minBalance),
+            maxBalance=_most(self.maxBalance, other.maxBalance),
+        )
+
+
+class Aggregates(BaseModel):
+    """Summary of a set of transactions, in total and by each of :GROUPS:."""
+
+    GROUPS: ClassVar[Tuple[str, ...]] = ("mcc", "currencyCode")
+
+    total: Summary = Summary()
+    mcc: Dict[int, Summary] = dict()
+    currencyCode: Dict[int, Summary] = dict()
+
+    @classmethod
+    def of(cls, transactions: Iterable[Transaction]) -> 'Aggregates':
+        aggregates = cls()
+        for tx in transactions:
+            aggregates.total.add(tx)
+            for group in cls.GROUPS:
+                key = int(getattr(tx, group))
+                found = getattr(aggregates, group).get(key)
+                if found is None:
+                    found = getattr(aggregates, group)[key] = Summary()
+                found.add(tx)
+        return aggregates
+
+    def __add__(self, other: 'Aggregates') -> 'Aggregates':
+        groups = dict()
+        for group in self.GROUPS:
+            merged = {key: summary.copy() for key, summary in getattr(self, group).items()}
+            for key, summary in getattr(other, group).items():
+                merged[key] = merged[key] + summary if key in merged else summary.copy()
+            groups[group] = merged
+        return Aggregates.construct(total=self.total + other.total, **groups)
+
+
 class TxBucket(TransactionArray):
-    """Statements with defined timeframe length for caching purposes."""
+    """Statements with defined timeframe length for caching purposes.
+    Transactions are kept in time order.
+    """
     class Config:
         json_encoders=enum_encoders
 
 
     date: datetime
+    covered_from: Optional[datetime] = None
+    covered_until: Optional[datetime] = None
+    aggregates: Optional[Aggregates] = None
+    _times: Optional[List[datetime]] = PrivateAttr(default=None)
+
+    @validator("transactions")
+    def sort_transactions(cls, v) -> Sequence[Transaction]:
+        """Keeps the transactions in time order."""
+
+        return list(_ascending(v))
+
+    def aggregate(self) -> Aggregates:
+        """Aggregates of the whole bucket, computed once and kept with it."""
+
+        if self.aggregates is None:
+            self.aggregates = Aggregates.of(self.slice(self.date, self.next))
+        return self.aggregates
+
+    @property
+    def times(self) -> List[datetime]:
+        """Sorted transaction times, built once for bisecting."""
+
+        if self._times is None:
+            self._times = [tx.time for tx in self.transactions]
+        return self._times
+
+    def slice(self, fr: datetime, to: datetime) -> Sequence[Transaction]:
+        """Transactions between :fr: and :to: (inclusive).
+        The bucket owns only [date, next), boundary rows belong to the next one.
+        """
+
+        start = bisect_left(self.times, max(fr, self.date))
+        if to < self.next:
+            end = bisect_right(self.times, to)
+        else:
+            end = bisect_left(self.times, self.next)
+        return self.transactions[start:end]
+
+    @property
+    def coverage(self) -> Tuple[datetime, datetime]:
+        """The part of [date, next] that was fetched.
+        Buckets cached before coverage was tracked count as whole,
+        unless they're still open.
+        """
+
+        start = self.covered_from or self.date
+        end = self.covered_until
+        if end is None:
+            if self.next <= datetime.now(tz=timezone.utc):
+                end = self.next
+            else:
+                end = self.times[-1] if self.transactions else self.date
+        return start, end
+
+    def oldest_hold(self, fr: datetime, to: datetime) -> Optional[datetime]:
+        """Time of the oldest unsettled hold between :fr: and :to:, None if there's none."""
+
+        return next((tx.time for tx in self.slice(fr, to) if tx.hold), None)
+
+    def gaps(self, fr: datetime, to: datetime, refresh: bool = True) -> List[Tuple[datetime, datetime]]:
+        """Parts of :fr: - :to: within this bucket that have to be fetched.
+        With :refresh:, the tail is fetched again from the oldest unsettled hold,
+        to be reconciled, unless the bucket was covered past the settle horizon.
+        Without it, the bucket of the current moment isn't topped up.
+        """
+
+        lo, hi = max(fr, self.date), min(to, self.next)
+        if lo >= hi:
+            return []
+        start, end = self.coverage
+        now = datetime.now(tz=timezone.utc)
+        settled = end <= now - SETTLE_HORIZON
+        hold = self.oldest_hold(lo, hi) if refresh and not settled else None
+        if hold is not None:
+            end = min(end, hold)
+        gaps = list()
+        if lo < start:
+            gaps.append((lo, min(hi, start)))
+        # Without :refresh: the current bucket counts as covered up to now
+        is_current = self.next > now
+        if hi > end and (refresh or not is_current):
+            tail = (max(lo, end), hi)
+            if gaps and gaps[-1][1] >= tail[0]:
+                tail = (gaps.pop()[0], hi)
+            gaps.append(tail)
+        return gaps
+
+    @classmethod
+    def fetched(cls, date: datetime, fresh: Iterable[Transaction], fr: datetime, to: datetime) -> 'TxBucket':
+        """New bucket at :date: holding the rows fetched for :fr: - :to:."""
+
+        return cls(
+            date=date,
+            transactions=list(fresh),
+            covered_from=fr if fr > date else None,
+            covered_until=to,
+        )
+
+    def absorb(self, fresh: Iterable[Transaction], fr: datetime, to: datetime) -> 'TxBucket':
+        """New bucket with the rows fetched for :fr: - :to: replacing the cached ones there.
+        Cached rows of that range missing from :fresh: were dropped holds.
+        """
+
+        fresh = _ascending(fresh)
+        fresh_ids = {tx.id for tx in fresh}
+        kept = [
+            tx for tx in self.transactions
+            if tx.id not in fresh_ids and not fr <= tx.time <= to
+        ]
+        start, end = self.coverage
+        if fr <= end and to >= start:
+            start, end = min(start, fr), max(end, to)
+        return TxBucket.construct(
+            date=self.date,
+            transactions=list(Statement.iterMerge(kept, fresh)),
+            covered_from=start if start > self.date else None,
+            covered_until=end,
+        )
+
+    def insert(self, transaction: Transaction, covered_since: Optional[datetime] = None) -> 'TxBucket':
+        """New bucket with :transaction: added, replacing the cached one with the same id.
+        Coverage reaching :covered_since: (from when every new transaction
+        is known to arrive) is extended to the transaction.
+        """
+
+        kept = [tx for tx in self.transactions if tx.id != transaction.id]
+        start, end = self.coverage
+        if covered_since is not None and end >= covered_since:
+            end = max(end, min(transaction.time, self.next))
+        return TxBucket.construct(
+            date=self.date,
+            transactions=list(Statement.iterMerge(kept, [transaction])),
+            covered_from=self.covered_from,
+            covered_until=end,
+        )
 
-    
     @validator("date")
     def align_datetime(cls, v) -> datetime:
         """Aligns the date property to the nearest timeblock."""
@@ -220,52 +504,366 @@ class CacheableTransactionProvider(BaseModel):
     currencyCode: CurrencyCode
     cached_statement: Dict[str, TxBucket] = dict()
 
+    @staticmethod
+    def _check_timezone(fr: datetime, to: datetime) -> None:
+        wrong_timezone = to.tzinfo is not timezone.utc or fr.tzinfo is not timezone.utc
+        if wrong_timezone:
+            raise ValueError("Timezone must be UTC.")
+
+    def _cached_bucket(self, date: datetime, store: Optional[BucketStoreABC]) -> Optional[TxBucket]:
+        if store is not None:
+            return store.get_bucket(self.id, date)
+        return self.cached_statement.get(date.isoformat())
+
+    def _put_bucket(self, bucket: TxBucket, store: Optional[BucketStoreABC]) -> None:
+        # Materialized here, so they're stored along with the rows
+        bucket.aggregate()
+        if store is not None:
+            store.put_bucket(self.id, bucket)
+        else:
+            self.cached_statement[bucket.date.isoformat()] = bucket
+
+    def _gaps(
+        self,
+        date: datetime,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        refresh: bool,
+        ) -> List[Tuple[datetime, datetime]]:
+        """Uncovered parts of :fr: - :to: within the bucket at :date:."""
+
+        lo, hi = max(fr, date), min(to, date + TIMEBLOCK)
+        if lo >= hi:
+            return []
+        if store is not None:
+            coverage = store.coverage(self.id, date)
+            if coverage is None:
+                return [(lo, hi)]
+            # Covered buckets are only loaded when they have recent holds to reconcile
+            start, end = coverage
+            settled = end <= datetime.now(tz=timezone.utc) - SETTLE_HORIZON
+            if start <= lo and end >= hi and (
+                not refresh or settled or store.oldest_hold(self.id, date, lo, hi) is None
+            ):
+                return []
+        bucket = self._cached_bucket(date, store)
+        if bucket is None:
+            return [(lo, hi)]
+        return bucket.gaps(lo, hi, refresh)
+
+    def _plan(
+        self,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        refresh: bool,
+        instrument: Optional[InstrumentABC] = None,
+        ) -> List[Tuple[datetime, datetime]]:
+        """The fewest request windows that cover :fr: - :to:, newest first.
+        Nothing past the current moment is requested.
+        Bucket hits and misses are reported to :instrument:.
+        """
+
+        to = min(to, datetime.now(tz=timezone.utc))
+        gaps = list()
+        misses = 0
+        dates = construct_bucket_list(fr=fr, to=to)
+        for date in dates:
+            bucket_gaps = self._gaps(date, fr, to, store, refresh)
+            misses += bool(bucket_gaps)
+            gaps.extend(bucket_gaps)
+        if instrument is not None:
+            instrument.cache(self.id, len(dates) - misses, misses)
+        return plan_windows(gaps)
+
+    def _window_request(self, fr: datetime, to: datetime) -> StatementReq:
+        """The API takes whole seconds, so shorter windows are widened to one."""
+
+        return StatementReq(account=self.id, from_=min(fr, to - timedelta(seconds=1)), to_=to)
+
+    @staticmethod
+    def _next_page(page: Sequence[Transaction], fr: datetime, to: datetime) -> Optional[datetime]:
+        """Where the next request of the window :fr: - :to: has to end, None if it's complete.
+        A full page means the API cut the older rows off.
+        """
+
+        if len(page) < MAX_ROWS:
+            return None
+        oldest = page[0].time
+        if oldest <= fr or oldest >= to:
+            return None
+        return oldest
+
+    def _spread(self, rows: Iterable[Transaction], fr: datetime, to: datetime, store: Optional[BucketStoreABC]) -> None:
+        """Caches the rows fetched for the window :fr: - :to: into its buckets."""
+
+        rows = list(rows)
+        times = [tx.time for tx in rows]
+        for date in construct_bucket_list(fr=fr, to=to):
+            lo, hi = max(fr, date), min(to, date + TIMEBLOCK)
+            if lo >= hi:
+                continue
+            part = rows[bisect_left(times, date):bisect_left(times, date + TIMEBLOCK)]
+            cached = self._cached_bucket(date, store)
+            if cached is None:
+                bucket = TxBucket.fetched(date, part, lo, hi)
+            else:
+                bucket = cached.absorb(part, lo, hi)
+            self._put_bucket(bucket, store)
+
+    def _iter_covered(
+        self,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        ) -> Iterator[Transaction]:
+        """Yields the cached transactions between :fr: and :to:, oldest first.
+        Only the edge buckets get bisected.
+        """
+
+        if store is not None:
+            yield from store.iter_query(self.id, fr, to)
+            return
+        for date in reversed(construct_bucket_list(fr=fr, to=to)):
+            bucket = self.cached_statement.get(date.isoformat())
+            if bucket is not None:
+                yield from bucket.slice(fr, to)
+
+    @staticmethod
+    def _as_statement(transactions: List[Transaction], fr: datetime, to: datetime) -> Statement:
+        """Builds the statement without revalidating the cached rows."""
+
+        timeframe = (transactions[0].time, transactions[-1].time) if transactions else (fr, to)
+        return Statement.construct(transactions=transactions, timeframe=timeframe)
+
+    def _fill_requests(
+        self,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        refresh: bool,
+        instrument: Optional[InstrumentABC] = None,
+        ) -> Generator[StatementReq, Optional[Statement], None]:
+        """Yields the requests that fill the cache between :fr: and :to:,
+        coalesced into as few as possible; each response is sent back in.
+        Sending None (a refused request) stops it.
+        Shared by :_fill: and :_fill_async:, which only differ in how they call the engine.
+        """
+
+        for window_fr, window_to in self._plan(fr, to, store, refresh, instrument):
+            pages = list()
+            end: Optional[datetime] = window_to
+            while end is not None:
+                response = yield self._window_request(window_fr, end)
+                if response is None:
+                    return
+                page = list(_ascending(response.transactions))
+                pages.append(page)
+                end = self._next_page(page, window_fr, end)
+            self._spread(Statement.iterMerge(*pages, dedupe=True), window_fr, window_to, store)
+
+    def _fill(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        refresh: bool = True,
+        ) -> None:
+        """Fetches what the cache lacks between :fr: and :to:,
+        coalesced into as few requests as possible.
+        With :refresh:, unsettled holds are fetched again.
+        """
+
+        requests = self._fill_requests(fr, to, store, refresh, engine_instance.instrument)
+        response: Optional[Statement] = None
+        while True:
+            try:
+                req = requests.send(response)
+            except StopIteration:
+                return
+            try:
+                response = cast(Statement, engine_instance.make_request(req))
+            # BadRequest is returned by the API when requesting a timeframe that is too old.
+            except BadRequest: # pragma: no cover
+                response = None # pragma: no cover
+
+    async def _fill_async(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC],
+        refresh: bool = True,
+        ) -> None:
+        """Awaitable :_fill:."""
+
+        requests = self._fill_requests(fr, to, store, refresh, engine_instance.instrument)
+        response: Optional[Statement] = None
+        while True:
+            try:
+                req = requests.send(response)
+            except StopIteration:
+                return
+            try:
+                response = cast(Statement, await engine_instance.make_request(req))
+            # BadRequest is returned by the API when requesting a timeframe that is too old.
+            except BadRequest: # pragma: no cover
+                response = None # pragma: no cover
+
+    def ingest(
+        self,
+        transaction: Transaction,
+        store: Optional[BucketStoreABC] = None,
+        covered_since: Optional[datetime] = None,
+        ) -> TxBucket:
+        """Caches a single pushed transaction, deduplicated by id.
+        A new bucket covers nothing but the transaction itself.
+        See :TxBucket.insert: for :covered_since:.
+        """
+
+        date = align_datetime(transaction.time, TIMEBLOCK)
+        cached = self._cached_bucket(date, store)
+        if cached is None:
+            bucket = TxBucket(
+                date=date,
+                transactions=[transaction],
+                covered_from=transaction.time,
+                covered_until=transaction.time,
+            )
+        else:
+            bucket = cached.insert(transaction, covered_since)
+        self._put_bucket(bucket, store)
+        return bucket
+
+    def pendingWindows(
+        self,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
+        ) -> List[Tuple[datetime, datetime]]:
+        """The request windows a statement between dates would need, newest first.
+        Empty if the cache covers it.
+        """
+
+        self._check_timezone(fr, to)
+        return self._plan(fr, to, store, refresh)
+
+    def fillCache(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
+        ) -> None:
+        """Fetches what the cache lacks between dates, without reading it back.
+        Tz-info must be UTC.
+        """
+
+        self._check_timezone(fr, to)
+        self._fill(engine_instance, fr, to, store, refresh)
+
+    async def fillCacheAsync(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
+        ) -> None:
+        """Awaitable :fillCache:."""
+
+        self._check_timezone(fr, to)
+        await self._fill_async(engine_instance, fr, to, store, refresh)
+
+    def iterStatement(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
+        ) -> Iterator[Transaction]:
+        """Fetches the missing buckets, then lazily yields
+        the transactions between dates in time order.
+        Tz-info must be UTC.
+        """
+
+        self._check_timezone(fr, to)
+        self._fill(engine_instance, fr, to, store, refresh)
+        return self._iter_covered(fr, to, store)
+
+    def _bucket_aggregates(self, date: datetime, store: Optional[BucketStoreABC]) -> Optional[Aggregates]:
+        if store is not None:
+            return store.aggregates(self.id, date)
+        bucket = self.cached_statement.get(date.isoformat())
+        return bucket.aggregate() if bucket is not None else None
+
+    def summarize(
+        self,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        group_by: Optional[str] = None,
+        ) -> Union[Summary, Dict[int, Summary]]:
+        """Summary of the cached transactions between :fr: and :to:,
+        or summaries by :group_by: ("mcc" or "currencyCode").
+        Buckets inside the range answer with their stored aggregates,
+        only the edge buckets are scanned. Nothing is fetched, see :fillCache:.
+        Tz-info must be UTC.
+        """
+
+        self._check_timezone(fr, to)
+        if group_by is not None and group_by not in Aggregates.GROUPS:
+            raise ValueError(f"Can't group by {group_by}, only by {', '.join(Aggregates.GROUPS)}.")
+        result = Aggregates()
+        for date in construct_bucket_list(fr=fr, to=to):
+            if fr <= date and date + TIMEBLOCK <= to:
+                aggregates = self._bucket_aggregates(date, store)
+            else:
+                bucket = self._cached_bucket(date, store)
+                aggregates = Aggregates.of(bucket.slice(fr, to)) if bucket is not None else None
+            if aggregates is not None:
+                result = result + aggregates
+        return result.total if group_by is None else getattr(result, group_by)
+
     def getStatement(
         self,
         engine_instance: MonoCallerABC,
         fr: datetime,
         to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
         ) -> Statement:
         """Get the statement between dates using cached values where possible.
+        Buckets live in :store: if given, in :cached_statement: otherwise.
+        Only the uncovered parts of the range are requested.
+        With :refresh:, unsettled holds of open buckets are fetched again.
         Tz-info must be UTC.
         """
 
-        wrong_timezone = to.tzinfo is not timezone.utc or fr.tzinfo is not timezone.utc
-        if wrong_timezone:
-            raise ValueError("Timezone must be UTC.")
+        transactions = list(self.iterStatement(engine_instance, fr, to, store, refresh))
+        return self._as_statement(transactions, fr, to)
 
-        relevant_buckets = list()
-        dates = construct_bucket_list(fr=fr, to=to)
+    async def getStatementAsync(
+        self,
+        engine_instance: MonoCallerABC,
+        fr: datetime,
+        to: datetime,
+        store: Optional[BucketStoreABC] = None,
+        refresh: bool = True,
+        ) -> Statement:
+        """Awaitable :getStatement: for engines with a coroutine :make_request:.
+        Tz-info must be UTC.
+        """
 
-        for date in dates:
-            cached = date.isoformat() in self.cached_statement
-            if cached:
-                bucket = self.cached_statement[date.isoformat()]
-                relevant_buckets.insert(0, bucket)
-            else:
-                end_date = date + TIMEBLOCK
-                if to < end_date:
-                    end_date = to
-
-                try:
-                    req = StatementReq(
-                        account=self.id, from_=date, to_=date + TIMEBLOCK
-                    )
-                    statement = cast(Statement, engine_instance.make_request(req))
-                    bucket = TxBucket(date=date, transactions=statement.transactions)
-                    self.cached_statement[date.isoformat()] = bucket
-                    relevant_buckets.insert(0, bucket)
-                # BadRequest is returned by the API when requesting a timeframe that is too old.
-                except BadRequest: # pragma: no cover
-                    break # pragma: no cover
-
-        whole_statement = list()
-        for bucket in relevant_buckets:
-            whole_statement.extend(bucket.transactions)
-        whole_statement = [tx for tx in whole_statement if tx.time >= fr and tx.time <= to]
-        whole_statement.sort(key=lambda x: x.time)
-
-        return Statement(transactions=whole_statement, timeframe=(fr, to))
+        self._check_timezone(fr, to)
+        await self._fill_async(engine_instance, fr, to, store, refresh)
+        transactions = list(self._iter_covered(fr, to, store))
+        return self._as_statement(transactions, fr, to)
 
 
 class Jar(CacheableTransactionProvider):
@@ -285,6 +883,8 @@ class Account(CacheableTransactionProvider):
     creditLimit: int
     type: CardType
     cashbackType: CashbackType
+    iban: Optional[str] = None
+    maskedPan: Sequence[str] = list()
 
     @root_validator(pre=True)
     def coerce_right_type(cls, keywords: Dict) -> Dict:
@@ -341,3 +941,20 @@ class Currencies(BaseModel):
         json_encoders=enum_encoders
 
     rates: Sequence[CurrencyExchange]
+
+
+class WebhookData(BaseModel):
+    class Config:
+        json_encoders=enum_encoders
+
+    account: str
+    statementItem: Transaction
+
+
+class WebhookEvent(BaseModel):
+    """Payload the API pushes to :User.webHookURL:."""
+    class Config:
+        json_encoders=enum_encoders
+
+    type: str
+    data: WebhookData
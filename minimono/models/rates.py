@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from .enumerators import CurrencyCode
+from .models import Currencies, CurrencyExchange, Statement, Transaction
+
+Pair = Tuple[int, int]
+
+
+def _mid(exchange: CurrencyExchange) -> Optional[float]:
+    """Units of currencyCodeB per unit of currencyCodeA."""
+
+    if exchange.rateCross:
+        return exchange.rateCross
+    quotes = [rate for rate in (exchange.rateBuy, exchange.rateSell) if rate]
+    return sum(quotes) / len(quotes) if quotes else None
+
+
+class RateTable:
+    """Exchange rates indexed by (currencyCodeA, currencyCodeB).
+    Quoted pairs use their cross rate, or the middle of buy and sell.
+    Reversed pairs and pairs through UAH are derived on first lookup
+    and remembered. The table expires :ttl: seconds after :fetched:.
+    With :max_age:, quotes the bank set more than :max_age: seconds ago
+    are stale: they aren't used, and the table expires when one
+    that was fresh when fetched goes stale.
+    """
+
+    def __init__(
+        self,
+        rates: Iterable[CurrencyExchange],
+        fetched: Optional[datetime] = None,
+        ttl: float = 300.0,
+        max_age: Optional[float] = None,
+        ):
+        self.fetched = fetched or datetime.now(tz=timezone.utc)
+        self.ttl = ttl
+        self.max_age = max_age
+        self.pairs: Dict[Pair, float] = dict()
+        self.updated: Dict[Pair, datetime] = dict()
+        for exchange in rates:
+            pair = (exchange.currencyCodeA, exchange.currencyCodeB)
+            rate = _mid(exchange)
+            # The newest quote of a pair wins
+            if rate is None or self.updated.get(pair, exchange.date) > exchange.date:
+                continue
+            self.pairs[pair] = rate
+            self.updated[pair] = exchange.date
+        # pair -> (rate, when it goes stale)
+        self._derived: Dict[Pair, Tuple[float, datetime]] = dict()
+
+    @classmethod
+    def from_currencies(
+        cls,
+        currencies: Currencies,
+        ttl: float = 300.0,
+        max_age: Optional[float] = None,
+        ) -> 'RateTable':
+        return cls(currencies.rates, ttl=ttl, max_age=max_age)
+
+    @property
+    def expires(self) -> datetime:
+        """When the TTL runs out, or a quote that was fresh when fetched goes stale."""
+
+        moments = [self.fetched + timedelta(seconds=self.ttl)]
+        moments += [moment for moment in map(self._stale_after, self.pairs) if moment > self.fetched]
+        return min(moments)
+
+    def expired(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(tz=timezone.utc)
+        return now >= self.expires
+
+    @property
+    def last_update(self) -> Optional[datetime]:
+        """When the newest of the quotes was set by the bank."""
+
+        return max(self.updated.values(), default=None)
+
+    def _stale_after(self, pair: Pair) -> datetime:
+        if self.max_age is None:
+            return datetime.max.replace(tzinfo=timezone.utc)
+        return self.updated[pair] + timedelta(seconds=self.max_age)
+
+    def _direct(self, a: int, b: int, now: datetime) -> Optional[Tuple[float, datetime]]:
+        """The quoted rate of :a: to :b: (either way round), with when it goes stale."""
+
+        if a == b:
+            return 1.0, datetime.max.replace(tzinfo=timezone.utc)
+        for pair, invert in (((a, b), False), ((b, a), True)):
+            if pair in self.pairs and self._stale_after(pair) > now:
+                rate = self.pairs[pair]
+                return (1 / rate if invert else rate), self._stale_after(pair)
+        return None
+
+    def rate(self, a: int, b: int, now: Optional[datetime] = None) -> float:
+        """Units of :b: per unit of :a:. Raises KeyError for unknown or stale pairs."""
+
+        now = now or datetime.now(tz=timezone.utc)
+        pair = (int(a), int(b))
+        derived = self._derived.get(pair)
+        if derived is not None and derived[1] > now:
+            return derived[0]
+        found = self._direct(*pair, now)
+        if found is None:
+            to_uah = self._direct(pair[0], CurrencyCode.uah, now)
+            from_uah = self._direct(CurrencyCode.uah, pair[1], now)
+            if to_uah is None or from_uah is None:
+                raise KeyError(f"No rate from {pair[0]} to {pair[1]}.")
+            found = to_uah[0] * from_uah[0], min(to_uah[1], from_uah[1])
+        self._derived[pair] = found
+        return found[0]
+
+    def convert(
+        self,
+        source: Union[Statement, Iterable[Transaction], Any],
+        target: int = CurrencyCode.usd,
+        ) -> Union[List[int], Any]:
+        """Operation amounts of :source: in minor units of :target:.
+        Every distinct currency is looked up once.
+        A TransactionTable is converted with numpy and gives an int64 array.
+        """
+
+        columns = getattr(source, "columns", None)
+        if columns is not None:
+            import numpy as np
+            now = datetime.now(tz=timezone.utc)
+            codes, inverse = np.unique(columns["currencyCode"], return_inverse=True)
+            per_code = np.array([self.rate(code, target, now) for code in codes.tolist()], dtype="float64")
+            amounts = columns["operationAmount"] * per_code[inverse.reshape(-1)]
+            return np.rint(amounts).astype("int64")
+
+        now = datetime.now(tz=timezone.utc)
+        transactions = source.transactions if isinstance(source, Statement) else source
+        if not isinstance(transactions, Sequence):
+            transactions = list(transactions)
+        # One lookup per currency, then a single pass applying the factors
+        factors = {code: self.rate(code, target, now) for code in {tx.currencyCode for tx in transactions}}
+        return [round(tx.operationAmount * factors[tx.currencyCode]) for tx in transactions]
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from .enumerators import CurrencyCode
+from .models import Statement, Transaction, TxBucket
+
+# numpy is imported on first use, see :_require_numpy:
+np: Any = None
+
+INT_COLUMNS = {
+    "mcc": "int32",
+    "currencyCode": "int32",
+    "amount": "int64",
+    "operationAmount": "int64",
+    "commissionRate": "int64",
+    "cashbackAmount": "int64",
+    "balance": "int64",
+}
+# Repeating strings are stored as integer codes into a list of categories.
+ENCODED_COLUMNS = ("description", "comment", "receiptId", "counterEdrpou", "counterIban")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _require_numpy() -> None:
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError: # pragma: no cover
+        raise ImportError("TransactionTable needs numpy: pip install 'minimono[analytics]'")
+    np = numpy
+
+
+class TransactionTable:
+    """Columnar view of transactions for vectorized analytics.
+    Numbers are int64/int32 arrays, time is datetime64[us] (UTC),
+    hold is bool, id is an object array
+    and the other strings are dictionary-encoded.
+    """
+
+    def __init__(self, columns: Dict[str, Any], categories: Dict[str, List[Optional[str]]]):
+        _require_numpy()
+        self.columns = columns
+        self.categories = categories
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> 'TransactionTable':
+        _require_numpy()
+        rows = list(transactions)
+        columns: Dict[str, Any] = {
+            "id": np.array([tx.id for tx in rows], dtype=object),
+            "time": np.array(
+                [(tx.time - EPOCH) // MICROSECOND for tx in rows], dtype="int64"
+            ).astype("datetime64[us]"),
+            "hold": np.array([tx.hold for tx in rows], dtype=bool),
+        }
+        for name, dtype in INT_COLUMNS.items():
+            columns[name] = np.array([int(getattr(tx, name)) for tx in rows], dtype=dtype)
+
+        categories = dict()
+        for name in ENCODED_COLUMNS:
+            lookup: Dict[Optional[str], int] = dict()
+            codes = np.array(
+                [lookup.setdefault(getattr(tx, name), len(lookup)) for tx in rows],
+                dtype="int32",
+            )
+            columns[name] = codes
+            categories[name] = list(lookup)
+        return cls(columns, categories)
+
+    @classmethod
+    def from_statement(cls, statement: Statement) -> 'TransactionTable':
+        return cls.from_transactions(statement.transactions)
+
+    @classmethod
+    def from_buckets(cls, buckets: Iterable[TxBucket]) -> 'TransactionTable':
+        """Builds the table straight from cached buckets, sorted by time."""
+
+        return cls.from_transactions(
+            tx for bucket in buckets for tx in bucket.transactions
+        ).sort()
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __getitem__(self, name: str):
+        """Returns a column. Encoded string columns are decoded."""
+
+        if name in self.categories:
+            decoded = np.array(self.categories[name], dtype=object)
+            return decoded[self.columns[name]]
+        return self.columns[name]
+
+    def take(self, indices) -> 'TransactionTable':
+        """New table with the rows at :indices: (or a boolean mask)."""
+
+        columns = {name: column[indices] for name, column in self.columns.items()}
+        return type(self)(columns, self.categories)
+
+    def sort(self) -> 'TransactionTable':
+        return self.take(np.argsort(self.columns["time"], kind="stable"))
+
+    def filter(
+        self,
+        mask=None,
+        fr: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        **equals: Any,
+        ) -> 'TransactionTable':
+        """Rows matching the boolean :mask:, the inclusive :fr: - :to: range
+        and all :equals: conditions, e.g. filter(mcc=5411, description="Shop").
+        """
+
+        selected = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        if fr is not None:
+            selected &= self.columns["time"] >= _to_datetime64(fr)
+        if to is not None:
+            selected &= self.columns["time"] <= _to_datetime64(to)
+        for name, value in equals.items():
+            if name in self.categories:
+                try:
+                    code = self.categories[name].index(value)
+                except ValueError:
+                    code = -1
+                selected &= self.columns[name] == code
+            else:
+                selected &= self.columns[name] == int(value)
+        return self.take(selected)
+
+    def _group(self, keys) -> Tuple[Any, Any]:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        return unique, inverse.reshape(-1)
+
+    def groupby_sum(self, by: str, value: str = "amount") -> Dict[Any, int]:
+        """Sums :value: per distinct :by:."""
+
+        unique, inverse = self._group(self.columns[by])
+        sums = np.zeros(len(unique), dtype="int64")
+        np.add.at(sums, inverse, self.columns[value].astype("int64"))
+        if by in self.categories:
+            labels: Sequence = [self.categories[by][code] for code in unique]
+        elif by == "time":
+            labels = [_to_datetime(stamp) for stamp in unique]
+        else:
+            labels = unique.tolist()
+        return dict(zip(labels, sums.tolist()))
+
+    def resample(self, unit: str = "D", value: str = "amount") -> Tuple[Any, Any]:
+        """Sums :value: per calendar period.
+        :unit: is a numpy datetime unit: "Y", "M", "W", "D", "h".
+        Returns (period starts as datetime64, int64 sums), both sorted.
+        """
+
+        periods = self.columns["time"].astype(f"datetime64[{unit}]")
+        unique, inverse = self._group(periods)
+        sums = np.zeros(len(unique), dtype="int64")
+        np.add.at(sums, inverse, self.columns[value].astype("int64"))
+        return unique, sums
+
+    def row(self, index: int) -> Transaction:
+        fields: Dict[str, Any] = {
+            "id": self.columns["id"][index],
+            "time": _to_datetime(self.columns["time"][index]),
+            "hold": bool(self.columns["hold"][index]),
+        }
+        for name in INT_COLUMNS:
+            fields[name] = int(self.columns[name][index])
+        fields["currencyCode"] = CurrencyCode(fields["currencyCode"])
+        for name in ENCODED_COLUMNS:
+            fields[name] = self.categories[name][self.columns[name][index]]
+        return Transaction(**fields)
+
+    def to_transactions(self) -> List[Transaction]:
+        return [self.row(index) for index in range(len(self))]
+
+    def to_statement(self) -> Statement:
+        return Statement(transactions=self.sort().to_transactions())
+
+
+def _to_datetime64(moment: datetime):
+    return np.datetime64((moment - EPOCH) // MICROSECOND, "us")
+
+
+def _to_datetime(stamp) -> datetime:
+    return EPOCH + int(stamp.astype("datetime64[us]").astype("int64")) * MICROSECOND
@@ -1,13 +1,29 @@
 from datetime import datetime, timedelta, timezone
-from typing import Sequence, Optional
+from typing import List, Sequence, Optional, Tuple
 from ..abstract import TimeConstraintError
 
 TIMEBLOCK = timedelta(days=31)
+# The API returns at most this many rows per statement request, newest first.
+MAX_ROWS = 500
+# The oldest data the API can provide.
+EARLIEST_DATE = datetime(2017, 10, 1, tzinfo=timezone.utc)
+# Holds covered longer ago than this won't settle any more and aren't reconciled.
+SETTLE_HORIZON = timedelta(days=31)
+EARLIEST_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc).timestamp()
 
 def align_datetime(date: datetime, step: timedelta) -> datetime:
     """Aligns a datetime to a certain timedelta."""
 
-    aligned_timestamp = date.timestamp() // step.total_seconds() * step.total_seconds()
+    seconds = step.total_seconds()
+    # Dates within a step of year 1 have no aligned datetime before them,
+    # they get the first one on the grid instead
+    try:
+        timestamp = date.timestamp()
+    except (ValueError, OverflowError):
+        timestamp = EARLIEST_TIMESTAMP
+    aligned_timestamp = timestamp // seconds * seconds
+    if aligned_timestamp < EARLIEST_TIMESTAMP:
+        aligned_timestamp = -(-EARLIEST_TIMESTAMP // seconds) * seconds
     return datetime.fromtimestamp(aligned_timestamp, tz=timezone.utc)
 
 
@@ -17,7 +33,7 @@ def default_timeframe(end_date: Optional[datetime]=None):
     to = end_date
     fr = to - TIMEBLOCK
 
-    if datetime(2017, 10, 1, tzinfo=timezone.utc) > fr:
+    if EARLIEST_DATE > fr:
         raise TimeConstraintError('The oldest data API can provide is from 2017-10-01')
     
     return fr, to
@@ -42,3 +58,30 @@ def construct_bucket_list(
             iterating_bucket_date -= step
 
     return txbucket_keys
+
+
+def plan_windows(
+    gaps: Sequence[Tuple[datetime, datetime]],
+    max_span: timedelta = TIMEBLOCK,
+    ) -> List[Tuple[datetime, datetime]]:
+    """Coalesces uncovered :gaps: into as few request windows as possible.
+    No window spans more than :max_span:; gaps that don't fit
+    into the current window are cut at its end, if they touch it.
+    Returns the windows newest first.
+    """
+
+    windows: List[Tuple[datetime, datetime]] = list()
+    for start, end in sorted(gaps):
+        if windows:
+            window_start, window_end = windows[-1]
+            if end - window_start <= max_span:
+                windows[-1] = (window_start, max(end, window_end))
+                continue
+            if start <= window_end:
+                windows[-1] = (window_start, window_start + max_span)
+                start = window_start + max_span
+        while start < end:
+            windows.append((start, min(end, start + max_span)))
+            start = windows[-1][1]
+    windows.reverse()
+    return windows
@@ -0,0 +1,9 @@
+from .sqlite import SQLiteStore as SQLiteStore
+from .files import DirectoryStore as DirectoryStore
+from .files import atomic_write as atomic_write
+from .files import atomic_open as atomic_open
+from .files import read_file as read_file
+from .mapped import MappedStore as MappedStore
+from .bounded import BoundedStore as BoundedStore
+from .search import IndexedStore as IndexedStore
+from .search import SearchIndex as SearchIndex
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from ..abstract import BucketStoreABC
+from ..models import TxBucket
+from .files import atomic_write, bucket_file, bucket_file_dates
+from .mapped import MappedRows, MappedStore, dump_bucket, load_bucket
+
+# Rough size of one Transaction in memory, without its strings
+ROW_SIZE = 1000
+BUCKET_SIZE = 2000
+STRING_FIELDS = ("id", "description", "comment", "receiptId", "counterEdrpou", "counterIban")
+
+
+def bucket_size(bucket: TxBucket) -> int:
+    """Estimated memory taken by :bucket:, in bytes."""
+
+    if isinstance(bucket.transactions, MappedRows):
+        return BUCKET_SIZE + len(bucket.transactions.buffer)
+    size = BUCKET_SIZE
+    for tx in bucket.transactions:
+        size += ROW_SIZE + sum(len(getattr(tx, name) or "") for name in STRING_FIELDS)
+    return size
+
+
+class BoundedStore(BucketStoreABC):
+    """Buckets of all providers kept in memory within :budget: bytes.
+    Past it, the least recently used buckets (and those unused for :max_idle: seconds)
+    spill to :path: as binary bucket files, the MappedStore layout,
+    and are read back on their next access.
+    Without :path: spilled buckets go to a temporary directory removed on :close:;
+    with it, :flush: makes the directory a complete copy of the cache.
+    """
+
+    EXTENSION = MappedStore.EXTENSION
+
+    def __init__(self, budget: int = 256 * 2**20, path: Optional[str] = None, max_idle: Optional[float] = None):
+        self.budget = budget
+        self.max_idle = max_idle
+        self.temporary = path is None
+        self.path = path or tempfile.mkdtemp(prefix="minimono-")
+        os.makedirs(self.path, exist_ok=True)
+        # (provider id, date) -> (bucket, size, dirty, last use), least recently used first
+        self.buckets: 'OrderedDict[Tuple[str, datetime], Tuple[TxBucket, int, bool, float]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.spilled = 0
+        self.lock = threading.RLock()
+
+    def _filename(self, provider_id: str, date: datetime) -> str:
+        return bucket_file(os.path.join(self.path, provider_id), date, self.EXTENSION)
+
+    def _write(self, provider_id: str, bucket: TxBucket) -> None:
+        os.makedirs(os.path.join(self.path, provider_id), exist_ok=True)
+        atomic_write(self._filename(provider_id, bucket.date), dump_bucket(bucket))
+
+    def _admit(self, key: Tuple[str, datetime], bucket: TxBucket, dirty: bool) -> None:
+        previous = self.buckets.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+            dirty = dirty or previous[2]
+        size = bucket_size(bucket)
+        self.buckets[key] = (bucket, size, dirty, monotonic())
+        self.size += size
+        self._shrink()
+
+    def _evict(self, key: Tuple[str, datetime]) -> None:
+        bucket, size, dirty, _ = self.buckets.pop(key)
+        self.size -= size
+        if dirty:
+            self._write(key[0], bucket)
+            self.spilled += 1
+
+    def _shrink(self) -> None:
+        deadline = monotonic() - self.max_idle if self.max_idle is not None else None
+        # The most recent bucket stays, whatever its size
+        while len(self.buckets) > 1:
+            key, (_, _, _, used) = next(iter(self.buckets.items()))
+            if self.size <= self.budget and (deadline is None or used > deadline):
+                break
+            self._evict(key)
+
+    def has_bucket(self, provider_id: str, date: datetime) -> bool:
+        with self.lock:
+            if (provider_id, date) in self.buckets:
+                return True
+        return os.path.exists(self._filename(provider_id, date))
+
+    def get_bucket(self, provider_id: str, date: datetime) -> Optional[TxBucket]:
+        key = (provider_id, date)
+        with self.lock:
+            found = self.buckets.get(key)
+            if found is not None:
+                bucket, size, dirty, _ = found
+                self.buckets[key] = (bucket, size, dirty, monotonic())
+                self.buckets.move_to_end(key)
+                self.hits += 1
+                return bucket
+            try:
+                with open(self._filename(provider_id, date), "rb") as f:
+                    bucket = load_bucket(f.read())
+            except FileNotFoundError:
+                return None
+            self.misses += 1
+            self._admit(key, bucket, dirty=False)
+            return bucket
+
+    def put_bucket(self, provider_id: str, bucket: TxBucket) -> None:
+        with self.lock:
+            self._admit((provider_id, bucket.date), bucket, dirty=True)
+
+    def bucket_dates(self, provider_id: str) -> List[datetime]:
+        dates = set(bucket_file_dates(os.path.join(self.path, provider_id), self.EXTENSION))
+        with self.lock:
+            dates.update(date for provider, date in self.buckets if provider == provider_id)
+        return sorted(dates)
+
+    def stats(self) -> Dict[str, Any]:
+        """Buckets and estimated bytes in memory, against the budget,
+        with hits, misses (reads from disk) and spills so far.
+        """
+
+        with self.lock:
+            return {
+                "buckets": len(self.buckets),
+                "bytes": self.size,
+                "budget": self.budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "spilled": self.spilled,
+            }
+
+    def flush(self) -> int:
+        """Writes the buckets changed since they were loaded. Returns their count."""
+
+        with self.lock:
+            dirty = [(key, value) for key, value in self.buckets.items() if value[2]]
+            for (provider_id, date), (bucket, size, _, used) in dirty:
+                self._write(provider_id, bucket)
+                self.buckets[(provider_id, date)] = (bucket, size, False, used)
+        return len(dirty)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.temporary:
+                self.buckets.clear()
+                self.size = 0
+                shutil.rmtree(self.path, ignore_errors=True)
+            else:
+                self.flush()
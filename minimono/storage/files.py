@@ -0,0 +1,181 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple, Union, cast
+from ..abstract import BucketStoreABC
+from ..models import TxBucket, fast
+
+
+# Cache files are compressed by extension, and recognized by magic bytes when read
+COMPRESSORS: Dict[str, Callable[[IO[bytes], str], IO[bytes]]] = {
+    ".gz": lambda raw, mode: cast(IO[bytes], gzip.GzipFile(filename="", mode=mode, fileobj=raw, compresslevel=6)),
+    ".bz2": lambda raw, mode: cast(IO[bytes], bz2.BZ2File(raw, mode)),
+    ".xz": lambda raw, mode: cast(IO[bytes], lzma.LZMAFile(raw, mode)),
+}
+MAGIC = {b"\x1f\x8b": ".gz", b"BZh": ".bz2", b"\xfd7zXZ\x00": ".xz"}
+
+
+def compression(path: str) -> Optional[str]:
+    """The compression extension of :path:, None for plain files."""
+
+    extension = os.path.splitext(path)[1]
+    return extension if extension in COMPRESSORS else None
+
+
+@contextmanager
+def atomic_open(path: str, binary: bool = False) -> Iterator[IO]:
+    """File to write to :path: so that readers see either the old or the new file.
+    It's compressed if :path: has a compression extension (.gz, .bz2, .xz).
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            extension = compression(path)
+            compressed = COMPRESSORS[extension](raw, "wb") if extension else None
+            target = compressed or raw
+            stream = target if binary else io.TextIOWrapper(target, encoding="utf-8")
+            yield stream
+            if not binary:
+                stream.flush()
+                stream.detach()
+            if compressed is not None:
+                compressed.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path: str, data: Union[str, bytes]) -> None:
+    """Writes :data: to :path: so that readers see either the old or the new file."""
+
+    with atomic_open(path, binary=isinstance(data, bytes)) as f:
+        f.write(data)
+
+
+def read_file(path: str) -> bytes:
+    """Contents of :path:, decompressed if it starts with known magic bytes."""
+
+    with open(path, "rb") as f:
+        head = f.read(max(len(magic) for magic in MAGIC))
+        f.seek(0)
+        for magic, extension in MAGIC.items():
+            if head.startswith(magic):
+                with COMPRESSORS[extension](f, "rb") as stream:
+                    return stream.read()
+        return f.read()
+
+
+def bucket_file(directory: str, date: datetime, extension: str) -> str:
+    """File of the bucket at :date: in :directory:, the directory of its provider."""
+
+    return os.path.join(directory, f"{int(date.timestamp())}{extension}")
+
+
+def bucket_file_dates(directory: str, extension: str) -> List[datetime]:
+    """Dates of the bucket files with :extension: in :directory:, unordered."""
+
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return list()
+    dates = list()
+    for name in names:
+        stem, found = os.path.splitext(name)
+        if found == extension and stem.isdigit():
+            dates.append(datetime.fromtimestamp(int(stem), tz=timezone.utc))
+    return dates
+
+
+class DirectoryStore(BucketStoreABC):
+    """One JSON file per bucket: :path:/<provider id>/<bucket timestamp>.json.
+    New buckets are only marked dirty, :flush: writes just those, atomically.
+    Buckets are read from disk on first access.
+    :trusted: uses the fast, non-validating codec for bucket files.
+    """
+
+    EXTENSION = ".json"
+
+    def __init__(self, path: str, trusted: bool = False):
+        self.path = path
+        self.trusted = trusted
+        os.makedirs(path, exist_ok=True)
+        self.loaded: Dict[Tuple[str, datetime], TxBucket] = dict()
+        self.dirty: Dict[Tuple[str, datetime], TxBucket] = dict()
+        self.lock = threading.RLock()
+
+    def _directory(self, provider_id: str) -> str:
+        return os.path.join(self.path, provider_id)
+
+    def _filename(self, provider_id: str, date: datetime) -> str:
+        return bucket_file(self._directory(provider_id), date, self.EXTENSION)
+
+    def has_bucket(self, provider_id: str, date: datetime) -> bool:
+        key = (provider_id, date)
+        with self.lock:
+            if key in self.dirty or key in self.loaded:
+                return True
+        return os.path.exists(self._filename(provider_id, date))
+
+    def get_bucket(self, provider_id: str, date: datetime) -> Optional[TxBucket]:
+        key = (provider_id, date)
+        with self.lock:
+            bucket = self.dirty.get(key)
+            if bucket is None:
+                bucket = self.loaded.get(key)
+            if bucket is not None:
+                return bucket
+            try:
+                bucket = self._read(self._filename(provider_id, date))
+            except FileNotFoundError:
+                return None
+            self.loaded[key] = bucket
+            return bucket
+
+    def _read(self, filename: str) -> TxBucket:
+        with open(filename, "rb") as f:
+            raw = f.read()
+        if self.trusted:
+            return fast.bucket(fast.loads(raw))
+        return TxBucket.parse_raw(raw)
+
+    def _encode(self, bucket: TxBucket) -> Union[str, bytes]:
+        if self.trusted:
+            return fast.dump_bucket(bucket)
+        return bucket.json(ensure_ascii=False)
+
+    def put_bucket(self, provider_id: str, bucket: TxBucket) -> None:
+        with self.lock:
+            self.dirty[(provider_id, bucket.date)] = bucket
+
+    def bucket_dates(self, provider_id: str) -> List[datetime]:
+        dates = set(bucket_file_dates(self._directory(provider_id), self.EXTENSION))
+        with self.lock:
+            dates.update(date for provider, date in self.dirty if provider == provider_id)
+        return sorted(dates)
+
+    def flush(self) -> int:
+        """Writes the buckets changed since the last flush. Returns their count."""
+
+        with self.lock:
+            dirty = list(self.dirty.items())
+            for (provider_id, date), bucket in dirty:
+                os.makedirs(self._directory(provider_id), exist_ok=True)
+                atomic_write(self._filename(provider_id, date), self._encode(bucket))
+                self.loaded[(provider_id, date)] = bucket
+                del self.dirty[(provider_id, date)]
+        return len(dirty)
+
+    def close(self) -> None:
+        self.flush()
@@ -0,0 +1,220 @@
+"""Binary bucket files read through mmap.
+
+Layout (little-endian): a header, fixed-width records in time order,
+a heap with the UTF-8 strings the records point into,
+then the aggregates of the bucket as JSON.
+Times are microseconds since the epoch.
+"""
+import mmap
+import struct
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union, cast, overload
+from ..models import Aggregates, Transaction, TxBucket
+from ..models.enumerators import CurrencyCode
+from .files import DirectoryStore
+from .sqlite import from_micros, to_micros
+
+MAGIC = b"MMTB"
+VERSION = 2
+# magic, version, row count, date, covered_from, covered_until, heap size
+HEADER = struct.Struct("<4sHxxIqqqQ")
+NUMERIC = (
+    "time", "amount", "operationAmount", "commissionRate", "cashbackAmount",
+    "balance", "mcc", "currencyCode", "hold",
+)
+STRINGS = ("id", "description", "comment", "receiptId", "counterEdrpou", "counterIban")
+# Numeric fields, then (heap offset, length) of every string; length -1 is None
+RECORD = struct.Struct("<qqqqqqii?" + "Ii" * len(STRINGS))
+TIME = struct.Struct("<q")
+# Stands for None in the header
+MISSING = -(1 << 63)
+
+
+def _micros(moment: Optional[datetime]) -> int:
+    return MISSING if moment is None else to_micros(moment)
+
+
+def _moment(micros: int) -> Optional[datetime]:
+    return None if micros == MISSING else from_micros(micros)
+
+
+def dump_bucket(bucket: TxBucket) -> bytes:
+    """Encodes :bucket: in the binary layout."""
+
+    records, heap = list(), bytearray()
+    for tx in bucket.transactions:
+        strings: List[int] = list()
+        for name in STRINGS:
+            value = getattr(tx, name)
+            if value is None:
+                strings += [0, -1]
+                continue
+            encoded = value.encode("utf-8")
+            strings += [len(heap), len(encoded)]
+            heap += encoded
+        records.append(RECORD.pack(
+            to_micros(tx.time), tx.amount, tx.operationAmount, tx.commissionRate,
+            tx.cashbackAmount, tx.balance, tx.mcc, int(tx.currencyCode), tx.hold,
+            *strings,
+        ))
+    header = HEADER.pack(
+        MAGIC, VERSION, len(records), to_micros(bucket.date),
+        _micros(bucket.covered_from), _micros(bucket.covered_until), len(heap),
+    )
+    return b"".join([header, *records, bytes(heap), bucket.aggregate().json().encode("utf-8")])
+
+
+class MappedTimes(Sequence[datetime]):
+    """Transaction times of :rows:, decoded one at a time (for bisecting)."""
+
+    def __init__(self, rows: 'MappedRows'):
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @overload
+    def __getitem__(self, index: int) -> datetime: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[datetime]: ...
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return from_micros(TIME.unpack_from(self.rows.buffer, self.rows._offset(index))[0])
+
+
+class MappedRows(Sequence[Transaction]):
+    """Transactions of a binary bucket in :buffer:.
+    A Transaction is built only when its row is accessed, and not kept.
+    """
+
+    def __init__(self, buffer: Any, count: int):
+        self.buffer = buffer
+        self.count = count
+        self.heap = HEADER.size + count * RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("row index out of range")
+        return HEADER.size + index * RECORD.size
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if length < 0:
+            return None
+        start = self.heap + offset
+        return str(self.buffer[start:start + length], "utf-8")
+
+    def row(self, index: int) -> Transaction:
+        values = RECORD.unpack_from(self.buffer, self._offset(index))
+        fields = dict(zip(NUMERIC, values))
+        fields["time"] = from_micros(fields["time"])
+        fields["currencyCode"] = CurrencyCode(fields["currencyCode"])
+        pointers = values[len(NUMERIC):]
+        for position, name in enumerate(STRINGS):
+            fields[name] = self._string(pointers[2 * position], pointers[2 * position + 1])
+        return Transaction.construct(**fields)
+
+    @overload
+    def __getitem__(self, index: int) -> Transaction: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[Transaction]: ...
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(self.count))]
+        return self.row(index)
+
+    @property
+    def times(self) -> MappedTimes:
+        return MappedTimes(self)
+
+
+def load_bucket(buffer: Any) -> TxBucket:
+    """TxBucket over a binary bucket in :buffer: (bytes or mmap), without decoding its rows."""
+
+    magic, version, count, date, covered_from, covered_until, heap_size = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a binary bucket of a known version.")
+    rows = MappedRows(buffer, count)
+    aggregates = Aggregates.parse_raw(bytes(buffer[rows.heap + heap_size:]))
+    bucket = TxBucket.construct(
+        date=from_micros(date),
+        transactions=rows,
+        covered_from=_moment(covered_from),
+        covered_until=_moment(covered_until),
+        aggregates=aggregates,
+    )
+    bucket._times = rows.times # type: ignore[assignment]
+    return bucket
+
+
+class MappedStore(DirectoryStore):
+    """:DirectoryStore: with binary bucket files: :path:/<provider id>/<bucket timestamp>.bin.
+    Files are opened with mmap, so range reads touch only the pages they need
+    and transactions are built only for the rows that are read.
+    Every mapping holds a file descriptor, so at most :max_mapped: are kept open:
+    the least recently used one is closed, and its bucket read again on its next access.
+    Read the rows of a bucket before getting many others; :close: unmaps them all.
+    """
+
+    EXTENSION = ".bin"
+
+    def __init__(self, path: str, trusted: bool = False, max_mapped: int = 64):
+        super().__init__(path, trusted)
+        self.max_mapped = max_mapped
+        # Buckets over an open mapping, least recently used first
+        self.mapped: 'OrderedDict[Tuple[str, datetime], TxBucket]' = OrderedDict()
+
+    def _read(self, filename: str) -> TxBucket:
+        with open(filename, "rb") as f:
+            # The mapping outlives the file object
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return load_bucket(buffer)
+
+    def _encode(self, bucket: TxBucket) -> bytes:
+        return dump_bucket(bucket)
+
+    def _unmap(self, key: Tuple[str, datetime]) -> None:
+        bucket = self.mapped.pop(key)
+        if self.loaded.get(key) is bucket:
+            del self.loaded[key]
+        cast(MappedRows, bucket.transactions).buffer.close()
+
+    def get_bucket(self, provider_id: str, date: datetime) -> Optional[TxBucket]:
+        key = (provider_id, date)
+        with self.lock:
+            bucket = super().get_bucket(provider_id, date)
+            if bucket is None or not isinstance(bucket.transactions, MappedRows):
+                return bucket
+            if self.mapped.get(key) is bucket:
+                self.mapped.move_to_end(key)
+                return bucket
+            if key in self.mapped:
+                self._unmap(key)
+            self.mapped[key] = bucket
+            while len(self.mapped) > self.max_mapped:
+                self._unmap(next(iter(self.mapped)))
+            return bucket
+
+    def flush(self) -> int:
+        """Writes the buckets changed since the last flush. Returns their count.
+        They're mapped from their files on the next access, instead of staying in memory.
+        """
+
+        with self.lock:
+            written = list(self.dirty)
+            count = super().flush()
+            for key in written:
+                del self.loaded[key]
+        return count
+
+    def close(self) -> None:
+        with self.lock:
+            super().close()
+            while self.mapped:
+                self._unmap(next(iter(self.mapped)))
@@ -0,0 +1,263 @@
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from ..abstract import BucketStoreABC
+from ..models import Aggregates, Transaction, TxBucket, fast
+from .files import atomic_write, read_file
+from .sqlite import from_micros, to_micros
+
+VERSION = 1
+WORD = re.compile(r"\w+")
+TEXT_FIELDS = ("description", "comment")
+EXACT_FIELDS = ("counterIban", "counterEdrpou", "receiptId")
+# (provider id, transaction id)
+Doc = Tuple[str, str]
+# transaction id, time in microseconds, tokens, then the exact fields
+Entry = Tuple[str, int, List[str], Optional[str], Optional[str], Optional[str]]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase words of :text:."""
+
+    return WORD.findall(text.lower()) if text else []
+
+
+def _entry(tx: Transaction) -> Entry:
+    tokens = sorted({token for name in TEXT_FIELDS for token in tokenize(getattr(tx, name))})
+    return (tx.id, to_micros(tx.time), tokens, tx.counterIban, tx.counterEdrpou, tx.receiptId)
+
+
+class SearchIndex:
+    """Inverted index over cached buckets: words of description and comment
+    (matched by prefix) and exact values of the counterparty fields and receiptId.
+    Kept per bucket, so a changed bucket is re-indexed on its own.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, datetime], List[Entry]] = dict()
+        self.docs: Dict[Doc, Tuple[int, datetime]] = dict()
+        self.words: Dict[str, Set[Doc]] = defaultdict(set)
+        self.exact: Dict[str, Dict[str, Set[Doc]]] = {name: defaultdict(set) for name in EXACT_FIELDS}
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _forget(self, provider_id: str, date: datetime) -> None:
+        for tx_id, _, tokens, *values in self.buckets.pop((provider_id, date), []):
+            doc = (provider_id, tx_id)
+            self.docs.pop(doc, None)
+            for token in tokens:
+                self.words[token].discard(doc)
+                if not self.words[token]:
+                    del self.words[token]
+                    self._vocabulary = None
+            for name, value in zip(EXACT_FIELDS, values):
+                if value is not None:
+                    self.exact[name][value].discard(doc)
+                    if not self.exact[name][value]:
+                        del self.exact[name][value]
+
+    def _remember(self, provider_id: str, date: datetime, entries: List[Entry]) -> None:
+        self.buckets[(provider_id, date)] = entries
+        for tx_id, time, tokens, *values in entries:
+            doc = (provider_id, tx_id)
+            self.docs[doc] = (time, date)
+            for token in tokens:
+                if token not in self.words:
+                    self._vocabulary = None
+                self.words[token].add(doc)
+            for name, value in zip(EXACT_FIELDS, values):
+                if value is not None:
+                    self.exact[name][value].add(doc)
+
+    def add_bucket(self, provider_id: str, bucket: TxBucket) -> None:
+        """(Re-)indexes :bucket:, replacing what was indexed for its date."""
+
+        self._forget(provider_id, bucket.date)
+        self._remember(provider_id, bucket.date, [_entry(tx) for tx in bucket.transactions])
+
+    def has_bucket(self, provider_id: str, date: datetime) -> bool:
+        return (provider_id, date) in self.buckets
+
+    @property
+    def vocabulary(self) -> List[str]:
+        """Sorted indexed words, for prefix lookups."""
+
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.words)
+        return self._vocabulary
+
+    def _prefixed(self, prefix: str) -> Set[Doc]:
+        found: Set[Doc] = set()
+        vocabulary = self.vocabulary
+        for position in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            if not vocabulary[position].startswith(prefix):
+                break
+            found |= self.words[vocabulary[position]]
+        return found
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        fr: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        providers: Optional[Iterable[str]] = None,
+        **exact: str,
+        ) -> List[Tuple[str, datetime, str]]:
+        """(provider id, bucket date, transaction id) of transactions
+        having every word of :text: as a word prefix, and the :exact: values
+        (counterIban, counterEdrpou, receiptId), oldest first.
+        """
+
+        unknown = set(exact) - set(EXACT_FIELDS)
+        if unknown:
+            raise ValueError(f"Can't search by {', '.join(sorted(unknown))}.")
+        matches = [self.exact[name].get(value, set()) for name, value in exact.items()]
+        matches += [self._prefixed(word) for word in tokenize(text)]
+        found = set.intersection(*matches) if matches else set(self.docs)
+        lo = to_micros(fr) if fr is not None else None
+        hi = to_micros(to) if to is not None else None
+        wanted = set(providers) if providers is not None else None
+        hits = list()
+        for doc in found:
+            time, date = self.docs[doc]
+            if (lo is not None and time < lo) or (hi is not None and time > hi):
+                continue
+            if wanted is not None and doc[0] not in wanted:
+                continue
+            hits.append((time, doc[0], date, doc[1]))
+        hits.sort()
+        return [(provider_id, date, tx_id) for _, provider_id, date, tx_id in hits]
+
+    def dumps(self) -> str:
+        return fast.dumps({
+            "version": VERSION,
+            "buckets": [
+                [provider_id, to_micros(date), entries]
+                for (provider_id, date), entries in self.buckets.items()
+            ],
+        })
+
+    @classmethod
+    def loads(cls, raw: Any) -> 'SearchIndex':
+        data = fast.loads(raw)
+        if data.get("version") != VERSION:
+            raise ValueError("Search index of an unknown version.")
+        index = cls()
+        for provider_id, date, entries in data["buckets"]:
+            index._remember(provider_id, from_micros(date), [tuple(entry) for entry in entries]) # type: ignore[misc]
+        return index
+
+
+class IndexedStore(BucketStoreABC):
+    """Wraps :store: and keeps a SearchIndex of every bucket put into it.
+    With :path:, the index is saved there on :flush:, and loaded from there;
+    buckets it doesn't know are indexed before the first search (:index_missing:).
+    """
+
+    def __init__(self, store: BucketStoreABC, path: Optional[str] = None):
+        self.store = store
+        self.path = path
+        self.lock = threading.RLock()
+        self.changed = False
+        self.checked: Set[str] = set()
+        if path and os.path.exists(path):
+            self.index = SearchIndex.loads(read_file(path))
+        else:
+            self.index = SearchIndex()
+
+    def has_bucket(self, provider_id: str, date: datetime) -> bool:
+        return self.store.has_bucket(provider_id, date)
+
+    def get_bucket(self, provider_id: str, date: datetime) -> Optional[TxBucket]:
+        return self.store.get_bucket(provider_id, date)
+
+    def put_bucket(self, provider_id: str, bucket: TxBucket) -> None:
+        self.store.put_bucket(provider_id, bucket)
+        with self.lock:
+            self.index.add_bucket(provider_id, bucket)
+            self.changed = True
+
+    def bucket_dates(self, provider_id: str) -> Sequence[datetime]:
+        return self.store.bucket_dates(provider_id)
+
+    def coverage(self, provider_id: str, date: datetime) -> Optional[Tuple[datetime, datetime]]:
+        return self.store.coverage(provider_id, date)
+
+    def aggregates(self, provider_id: str, date: datetime) -> Optional[Aggregates]:
+        return self.store.aggregates(provider_id, date)
+
+    def oldest_hold(self, provider_id: str, date: datetime, fr: datetime, to: datetime) -> Optional[datetime]:
+        return self.store.oldest_hold(provider_id, date, fr, to)
+
+    def iter_query(self, provider_id: str, fr: datetime, to: datetime):
+        return self.store.iter_query(provider_id, fr, to)
+
+    def index_missing(self, provider_ids: Iterable[str]) -> int:
+        """Indexes the stored buckets of :provider_ids: the index doesn't know,
+        e.g. stored before it was saved. Each provider is checked once.
+        Returns how many buckets were indexed.
+        """
+
+        indexed = 0
+        with self.lock:
+            for provider_id in provider_ids:
+                if provider_id in self.checked:
+                    continue
+                for date in self.store.bucket_dates(provider_id):
+                    if self.index.has_bucket(provider_id, date):
+                        continue
+                    bucket = self.store.get_bucket(provider_id, date)
+                    if bucket is not None:
+                        self.index.add_bucket(provider_id, bucket)
+                        indexed += 1
+                self.checked.add(provider_id)
+            self.changed = self.changed or bool(indexed)
+        return indexed
+
+    def absorb(self, providers: Iterable) -> None:
+        providers = list(providers)
+        super().absorb(providers)
+        self.index_missing(provider.id for provider in providers)
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        fr: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        providers: Optional[Iterable[str]] = None,
+        **exact: str,
+        ) -> List[Tuple[str, Transaction]]:
+        """(provider id, transaction) pairs found by :SearchIndex.search:, oldest first."""
+
+        with self.lock:
+            hits = self.index.search(text, fr, to, providers, **exact)
+            times = {(provider_id, tx_id): self.index.docs[(provider_id, tx_id)][0] for provider_id, _, tx_id in hits}
+        found = list()
+        for provider_id, date, tx_id in hits:
+            bucket = self.store.get_bucket(provider_id, date)
+            if bucket is None:
+                continue
+            moment = from_micros(times[(provider_id, tx_id)])
+            for tx in bucket.slice(moment, moment):
+                if tx.id == tx_id:
+                    found.append((provider_id, tx))
+                    break
+        return found
+
+    def flush(self) -> int:
+        written = self.store.flush()
+        with self.lock:
+            if self.path and self.changed:
+                atomic_write(self.path, self.index.dumps())
+                self.changed = False
+        return written
+
+    def close(self) -> None:
+        self.flush()
+        self.store.close()
@@ -0,0 +1,261 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple, cast
+from ..abstract import BucketStoreABC
+from ..models import TIMEBLOCK, Aggregates, Transaction, TxBucket
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+BLOCK = TIMEBLOCK // MICROSECOND
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    provider TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at INTEGER NOT NULL,
+    covered_from INTEGER NOT NULL,
+    covered_until INTEGER NOT NULL,
+    aggregates TEXT,
+    PRIMARY KEY (provider, date)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    provider TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    mcc INTEGER NOT NULL,
+    hold INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    operationAmount INTEGER NOT NULL,
+    currencyCode INTEGER NOT NULL,
+    commissionRate INTEGER NOT NULL,
+    cashbackAmount INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    receiptId TEXT,
+    comment TEXT,
+    counterEdrpou TEXT,
+    counterIban TEXT,
+    PRIMARY KEY (provider, id)
+);
+CREATE INDEX IF NOT EXISTS tx_by_time ON transactions (provider, time);
+CREATE INDEX IF NOT EXISTS tx_by_id ON transactions (id);
+CREATE INDEX IF NOT EXISTS tx_by_mcc ON transactions (provider, mcc, time);
+CREATE INDEX IF NOT EXISTS tx_by_bucket ON transactions (provider, bucket);
+"""
+
+COLUMNS = (
+    "id", "time", "description", "mcc", "hold", "amount", "operationAmount",
+    "currencyCode", "commissionRate", "cashbackAmount", "balance",
+    "receiptId", "comment", "counterEdrpou", "counterIban",
+)
+BATCH = 1000
+SELECT = f"SELECT {', '.join(COLUMNS)} FROM transactions"
+
+
+def to_micros(moment: datetime) -> int:
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + micros * MICROSECOND
+
+
+class SQLiteStore(BucketStoreABC):
+    """Buckets kept in an SQLite database.
+    Transactions are indexed by (provider, time), id and mcc,
+    and bucket coverage lives in its own table,
+    so range queries never load whole buckets.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self) -> None:
+        """Upgrades the buckets table of databases created by older versions."""
+
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(buckets)")}
+        # Created before coverage was tracked: buckets count as fetched from their start,
+        # and up to their end once closed, as TxBucket.coverage has it
+        for name in ("covered_from", "covered_until"):
+            if name not in columns:
+                self.connection.execute(f"ALTER TABLE buckets ADD COLUMN {name} INTEGER")
+        self.connection.execute("UPDATE buckets SET covered_from = date WHERE covered_from IS NULL")
+        self.connection.execute(
+            "UPDATE buckets SET covered_until = CASE WHEN date + ? <= ? THEN date + ? ELSE COALESCE("
+            "(SELECT MAX(time) FROM transactions WHERE provider = buckets.provider AND bucket = buckets.date), "
+            "date) END WHERE covered_until IS NULL",
+            (BLOCK, to_micros(datetime.now(tz=timezone.utc)), BLOCK),
+        )
+        # Created before aggregates were materialized
+        if "aggregates" not in columns:
+            self.connection.execute("ALTER TABLE buckets ADD COLUMN aggregates TEXT")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _rows(self, sql: str, parameters: Sequence) -> List[Transaction]:
+        with self.lock:
+            rows = self.connection.execute(sql, parameters).fetchall()
+        return [self._to_transaction(row) for row in rows]
+
+    @staticmethod
+    def _to_transaction(row) -> Transaction:
+        fields = dict(zip(COLUMNS, row))
+        fields["time"] = from_micros(fields["time"])
+        fields["hold"] = bool(fields["hold"])
+        return Transaction(**fields)
+
+    @staticmethod
+    def _to_row(provider_id: str, bucket: int, tx: Transaction) -> tuple:
+        return (
+            provider_id, bucket, tx.id, to_micros(tx.time), tx.description, tx.mcc,
+            int(tx.hold), tx.amount, tx.operationAmount, int(tx.currencyCode),
+            tx.commissionRate, tx.cashbackAmount, tx.balance, tx.receiptId,
+            tx.comment, tx.counterEdrpou, tx.counterIban,
+        )
+
+    def has_bucket(self, provider_id: str, date: datetime) -> bool:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM buckets WHERE provider = ? AND date = ?",
+                (provider_id, to_micros(date)),
+            ).fetchone()
+        return row is not None
+
+    def get_bucket(self, provider_id: str, date: datetime) -> Optional[TxBucket]:
+        if not self.has_bucket(provider_id, date):
+            return None
+        transactions = self._rows(
+            f"{SELECT} WHERE provider = ? AND bucket = ? ORDER BY time",
+            (provider_id, to_micros(date)),
+        )
+        start, end = cast(Tuple[datetime, datetime], self.coverage(provider_id, date))
+        return TxBucket(
+            date=date,
+            transactions=transactions,
+            covered_from=start if start > date else None,
+            covered_until=end,
+            aggregates=self._stored_aggregates(provider_id, date),
+        )
+
+    def put_bucket(self, provider_id: str, bucket: TxBucket) -> None:
+        """Stores the rows :bucket: owns, [date, next).
+        Transactions are keyed by id, so a boundary row kept by both neighbours
+        (as in caches written before buckets were half-open) stays with the later one.
+        """
+
+        date = to_micros(bucket.date)
+        rows = [self._to_row(provider_id, date, tx) for tx in bucket.slice(bucket.date, bucket.next)]
+        stored_at = to_micros(datetime.now(tz=timezone.utc))
+        covered_from, covered_until = (to_micros(moment) for moment in bucket.coverage)
+        aggregates = bucket.aggregate().json()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM transactions WHERE provider = ? AND bucket = ?",
+                (provider_id, date),
+            )
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO transactions (provider, bucket, {', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))})",
+                rows,
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO buckets "
+                "(provider, date, size, stored_at, covered_from, covered_until, aggregates) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (provider_id, date, len(rows), stored_at, covered_from, covered_until, aggregates),
+            )
+
+    def coverage(self, provider_id: str, date: datetime) -> Optional[Tuple[datetime, datetime]]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT covered_from, covered_until FROM buckets WHERE provider = ? AND date = ?",
+                (provider_id, to_micros(date)),
+            ).fetchone()
+        if row is None:
+            return None
+        return from_micros(row[0]), from_micros(row[1])
+
+    def _stored_aggregates(self, provider_id: str, date: datetime) -> Optional[Aggregates]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT aggregates FROM buckets WHERE provider = ? AND date = ?",
+                (provider_id, to_micros(date)),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return Aggregates.parse_raw(row[0])
+
+    def aggregates(self, provider_id: str, date: datetime) -> Optional[Aggregates]:
+        """Read from the buckets table; the rows are only read for buckets stored without them."""
+
+        stored = self._stored_aggregates(provider_id, date)
+        return stored if stored is not None else super().aggregates(provider_id, date)
+
+    def oldest_hold(self, provider_id: str, date: datetime, fr: datetime, to: datetime) -> Optional[datetime]:
+        """Uses the bucket index, the rows aren't read."""
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT MIN(time) FROM transactions "
+                "WHERE provider = ? AND bucket = ? AND hold = 1 AND time BETWEEN ? AND ?",
+                (provider_id, to_micros(date), to_micros(fr), to_micros(to)),
+            ).fetchone()
+        return from_micros(row[0]) if row[0] is not None else None
+
+    def bucket_dates(self, provider_id: str) -> List[datetime]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT date FROM buckets WHERE provider = ? ORDER BY date",
+                (provider_id,),
+            ).fetchall()
+        return [from_micros(row[0]) for row in rows]
+
+    def iter_query(self, provider_id: str, fr: datetime, to: datetime) -> Iterator[Transaction]:
+        """Streams transactions between :fr: and :to:, oldest first."""
+
+        with self.lock:
+            cursor = self.connection.execute(
+                f"{SELECT} WHERE provider = ? AND time BETWEEN ? AND ? ORDER BY time",
+                (provider_id, to_micros(fr), to_micros(to)),
+            )
+            rows = cursor.fetchmany(BATCH)
+        while rows:
+            yield from (self._to_transaction(row) for row in rows)
+            with self.lock:
+                rows = cursor.fetchmany(BATCH)
+
+    def query(self, provider_id: str, fr: datetime, to: datetime) -> List[Transaction]:
+        """Transactions between :fr: and :to:, oldest first. Uses the time index."""
+
+        return self._rows(
+            f"{SELECT} WHERE provider = ? AND time BETWEEN ? AND ? ORDER BY time",
+            (provider_id, to_micros(fr), to_micros(to)),
+        )
+
+    def by_id(self, transaction_id: str) -> Optional[Transaction]:
+        found = self._rows(f"{SELECT} WHERE id = ?", (transaction_id,))
+        return found[0] if found else None
+
+    def by_mcc(
+        self,
+        provider_id: str,
+        mcc: int,
+        fr: datetime = EPOCH,
+        to: Optional[datetime] = None,
+        ) -> List[Transaction]:
+        """Transactions with the given :mcc:, oldest first."""
+
+        to = to if to is not None else datetime.now(tz=timezone.utc)
+        return self._rows(
+            f"{SELECT} WHERE provider = ? AND mcc = ? AND time BETWEEN ? AND ? ORDER BY time",
+            (provider_id, mcc, to_micros(fr), to_micros(to)),
+        )
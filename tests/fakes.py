@@ -0,0 +1,166 @@
+import json
+import requests
+from datetime import datetime, timedelta, timezone
+from minimono import abstract, models
+from minimono.storage import SQLiteStore
+
+
+USER_INFO = {
+    "clientId": "fake",
+    "name": "Fake User",
+    "webHookURL": "https://example.com/hook",
+    "permissions": "psfj",
+    "accounts": [
+        {
+            "id": "acc-black",
+            "sendId": "",
+            "balance": 100,
+            "creditLimit": 0,
+            "type": "black",
+            "currencyCode": 980,
+            "cashbackType": "UAH",
+            "maskedPan": ["537541******1234"],
+            "iban": "UA000000000000000000000000001",
+        },
+        {
+            "id": "acc-usd",
+            "sendId": "",
+            "balance": 10,
+            "creditLimit": 0,
+            "type": "usd",
+            "currencyCode": 840,
+            "cashbackType": "None",
+            "maskedPan": [],
+            "iban": "UA000000000000000000000000002",
+        },
+    ],
+    "jars": [
+        {
+            "id": "jar-1",
+            "sendId": "jar-send",
+            "title": "Savings",
+            "description": "",
+            "currencyCode": 980,
+            "balance": 5000,
+            "goal": 100000,
+        },
+    ],
+}
+
+RATES = [
+    {"currencyCodeA": 840, "currencyCodeB": 980, "date": 1660000000, "rateBuy": 36.65, "rateSell": 37.44},
+    {"currencyCodeA": 978, "currencyCodeB": 980, "date": 1660000000, "rateBuy": 37.1, "rateSell": 38.2},
+    {"currencyCodeA": 985, "currencyCodeB": 980, "date": 1660000000, "rateCross": 9.8},
+]
+
+
+def fake_transaction(account: str, moment: datetime) -> dict:
+    stamp = int(moment.timestamp())
+    return {
+        "id": f"{account}-{stamp}",
+        "time": stamp,
+        "description": f"Shop {stamp % 7}",
+        "mcc": 5411 + stamp % 3,
+        "hold": False,
+        "amount": -(stamp % 1000) - 1,
+        "operationAmount": -(stamp % 1000) - 1,
+        "currencyCode": 980,
+        "commissionRate": 0,
+        "cashbackAmount": stamp % 5,
+        "balance": stamp % 100000,
+    }
+
+
+def fake_statement(account: str, fr: datetime, to: datetime, step: timedelta = timedelta(hours=6)) -> list:
+    """Deterministic raw statement rows, newest first like the API."""
+
+    rows = list()
+    first = datetime.fromtimestamp(
+        -(-int(fr.timestamp()) // int(step.total_seconds())) * int(step.total_seconds()),
+        tz=timezone.utc,
+    )
+    moment = first
+    while moment <= to:
+        rows.append(fake_transaction(account, moment))
+        moment += step
+    rows.reverse()
+    return rows
+
+
+def respond(request_obj):
+    """Raw API payload for :request_obj:."""
+
+    if isinstance(request_obj, models.UserInfoReq):
+        return USER_INFO
+    if isinstance(request_obj, models.CurrRateReq):
+        return RATES
+    if isinstance(request_obj, models.StatementReq):
+        return fake_statement(request_obj.account, request_obj.from_, request_obj.to_)
+    raise abstract.BadRequest(request_obj)
+
+
+class FakeEngine(abstract.MonoCallerABC):
+    """Synchronous engine answering from deterministic synthetic data."""
+
+    corresponding_methods = {
+        "CurrRateReq": lambda x: models.Currencies(rates=[models.CurrencyExchange.parse_obj(n) for n in x]),
+        "UserInfoReq": lambda x: models.User.parse_obj(x),
+        "StatementReq": lambda x: models.Statement(
+            transactions=[models.Transaction.parse_obj(n) for n in x],
+        ),
+    }
+
+    def __init__(self, token: str, self_ratelimit: bool = True, **options):
+        self.token = token
+        self.requests = list()
+
+    def make_request(self, request_obj):
+        self.requests.append(request_obj)
+        method = self.corresponding_methods[request_obj.__class__.__name__]
+        return method(respond(request_obj))
+
+
+class AsyncFakeEngine(FakeEngine):
+    """Awaitable :FakeEngine: that yields to the loop on every call."""
+
+    async def make_request(self, request_obj): # type: ignore[override]
+        import asyncio
+
+        await asyncio.sleep(0.01)
+        return super().make_request(request_obj)
+
+
+class CountingStore(SQLiteStore):
+    """:SQLiteStore: counting the buckets it loads whole."""
+
+    loaded = 0
+
+    def get_bucket(self, provider_id, date):
+        self.loaded += 1
+        return super().get_bucket(provider_id, date)
+
+
+def make_response(status_code: int, payload, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+    response.headers.update(headers or {})
+    return response
+
+
+class ScriptedSession:
+    """Stands in for requests.Session, replaying canned responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        item = self.responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        pass
@@ -0,0 +1,87 @@
+import requests
+from pytest import raises
+from minimono import abstract, models
+from minimono.API import api_call
+from minimono.API.api_call import MonoCaller, parse_retry_after
+from .fakes import RATES, ScriptedSession, make_response
+
+
+def caller_with(monkeypatch, *responses, **options):
+    waits = list()
+    monkeypatch.setattr(api_call, "sleep", waits.append)
+    session = ScriptedSession(*responses)
+    caller = MonoCaller("token", self_ratelimit=False, session=session, **options)  # type: ignore[arg-type]
+    return caller, session, waits
+
+
+def test_retries_honor_retry_after(monkeypatch):
+    caller, session, waits = caller_with(
+        monkeypatch,
+        make_response(429, {"errorDescription": "Too many requests"}, {"Retry-After": "7"}),
+        make_response(503, b"<html>busy</html>"),
+        make_response(200, RATES),
+    )
+    result = caller.make_request(models.CurrRateReq())
+    assert isinstance(result, models.Currencies)
+    assert session.calls == 3
+    assert waits == [7.0, 2.0]
+
+
+def test_retries_are_bounded(monkeypatch):
+    caller, session, waits = caller_with(
+        monkeypatch,
+        *(make_response(429, {}, {"Retry-After": "600"}) for _ in range(3)),
+        max_retries=2,
+        max_backoff=30,
+    )
+    with raises(abstract.RateLimited):
+        caller.make_request(models.CurrRateReq())
+    assert waits == [30, 30]
+
+
+def test_rate_limited_without_retry_after_waits_for_the_budget(monkeypatch):
+    caller, session, waits = caller_with(
+        monkeypatch,
+        make_response(429, {"errorDescription": "Too many requests"}),
+        make_response(200, RATES),
+    )
+    assert caller.make_request(models.CurrRateReq())
+    assert session.calls == 2
+    assert len(waits) == 1 and waits[0] >= 62.0
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    caller, session, waits = caller_with(
+        monkeypatch,
+        requests.ConnectionError(),
+        make_response(200, RATES),
+    )
+    assert caller.make_request(models.CurrRateReq())
+    assert waits == [1.0]
+
+
+def test_unknown_status_has_clean_error(monkeypatch):
+    caller, _, waits = caller_with(monkeypatch, make_response(403, b"forbidden"))
+    with raises(abstract.APIError) as info:
+        caller.make_request(models.UserInfoReq())
+    assert info.value.status_code == 403
+    assert info.value.payload == "forbidden"
+    assert not waits
+
+    caller, _, _ = caller_with(monkeypatch, make_response(501, {}), max_retries=0)
+    with raises(abstract.ServerError):
+        caller.make_request(models.UserInfoReq())
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_trusted_responses_match_validated(monkeypatch):
+    validated, _, _ = caller_with(monkeypatch, make_response(200, RATES))
+    trusted, _, _ = caller_with(monkeypatch, make_response(200, RATES), trusted=True)
+    request = models.CurrRateReq()
+    assert trusted.make_request(request) == validated.make_request(request)
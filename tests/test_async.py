@@ -0,0 +1,98 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from minimono import AsyncClient, Client
+from minimono import models
+from minimono.API import AsyncMonoCaller
+from minimono.storage import IndexedStore, SQLiteStore
+from .fakes import AsyncFakeEngine, FakeEngine
+
+
+def test_async_client_matches_sync():
+    fr = datetime(2022, 3, 1, tzinfo=timezone.utc)
+    to = datetime(2022, 5, 1, tzinfo=timezone.utc)
+
+    sync_client = Client("token", engine_class=FakeEngine)
+    sync_statement = sync_client.getStatement(sync_client['black'], from_time=fr, to_time=to)
+
+    async def run():
+        client = await AsyncClient.create("token", engine_class=AsyncFakeEngine)
+        statement = await client.getStatement(client['black'], from_time=fr, to_time=to)
+        rates = await client.getRates()
+        return client, statement, rates
+
+    client, statement, rates = asyncio.run(run())
+    assert client.user == sync_client.user
+    assert statement == sync_statement
+    assert rates.rates
+
+
+def test_async_export_and_search_match_sync():
+    to = datetime.now(tz=timezone.utc)
+    fr = to - timedelta(days=40)
+
+    sync_client = Client("token", engine_class=FakeEngine, store=IndexedStore(SQLiteStore()))
+    sync_out = io.StringIO()
+    sync_written = sync_client.export(sync_out, fr, to, format="csv")
+
+    async def run():
+        client = await AsyncClient.create("token", engine_class=AsyncFakeEngine, store=IndexedStore(SQLiteStore()))
+        out = io.StringIO()
+        written = await client.export(out, fr, to, format="csv")
+        return client, out, written
+
+    client, out, written = asyncio.run(run())
+    assert written == sync_written > 0
+    assert out.getvalue() == sync_out.getvalue()
+    assert client.search("shop 3") == sync_client.search("shop 3") != []
+
+
+def test_many_tokens_share_one_loop():
+    to = datetime(2022, 5, 1, tzinfo=timezone.utc)
+    fr = to - timedelta(days=3)
+
+    async def run():
+        clients = await asyncio.gather(*(
+            AsyncClient.create(f"token-{n}", engine_class=AsyncFakeEngine)
+            for n in range(50)
+        ))
+        return await asyncio.gather(*(
+            c.getStatement(c['black'], from_time=fr, to_time=to)
+            for c in clients
+        ))
+
+    statements = asyncio.run(run())
+    assert len(statements) == 50
+    assert all(s == statements[0] for s in statements)
+
+
+def test_async_ratecheck_queues_without_blocking(monkeypatch):
+    waits = list()
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    caller = AsyncMonoCaller("token")
+
+    async def run():
+        await asyncio.gather(*(caller._ratecheck(models.UserInfoReq()) for _ in range(3)))
+
+    asyncio.run(run())
+    # The first call goes through at once, the rest queue up a minute apart.
+    assert len(waits) == 2
+    assert 60 <= waits[0] <= 62
+    assert 120 <= waits[1] <= 124
+
+
+def test_async_caller_uses_its_own_executor():
+    caller = AsyncMonoCaller("token", max_workers=64)
+    assert caller.executor._max_workers == 64
+    caller.close()
+    shared = ThreadPoolExecutor(max_workers=2)
+    caller = AsyncMonoCaller("token", executor=shared)
+    caller.close()
+    # A shared executor is left to its owner
+    assert shared.submit(int, "1").result() == 1
+    shared.shutdown()
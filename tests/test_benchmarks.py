@@ -0,0 +1,29 @@
+import json
+from benchmarks.engine import ACCOUNT, size_range
+from benchmarks.standin import StandIn
+from benchmarks.suite import BENCHMARKS, compare, run
+from minimono import Client
+from minimono.models import MAX_ROWS
+
+
+def test_suite_report_is_machine_readable():
+    report = json.loads(json.dumps(run(sizes=[50], repeat=1)))
+    names = {item["benchmark"] for item in report["results"]}
+    assert {"parse.trusted", "getStatement.cold", "getStatement.warm", "Statement.__add__",
+            "saveFile", "loadFile.fast", "http.getStatement.cold"} <= names
+    assert all(item["size"] == 50 and item["seconds"] > 0 for item in report["results"])
+    assert compare(report, report) == []
+    slower = {**report, "results": [{**item, "seconds": item["seconds"] * 2} for item in report["results"]]}
+    assert len(compare(slower, report)) == len(report["results"])
+    assert set(BENCHMARKS) == {"parse", "statement", "files", "http"}
+
+
+def test_standin_caps_pages_and_throttles():
+    fr, to = size_range(3 * MAX_ROWS)
+    with StandIn(throttle_every=2) as standin:
+        client = Client(
+            "bench", avoid_ratelimiting=False, engine_class=standin.caller_class(), backoff_factor=0,
+        )
+        statement = client.getStatement(client[ACCOUNT], from_time=fr, to_time=to)
+    assert len(statement) == 3 * MAX_ROWS
+    assert standin.throttled and standin.requests >= 2 * standin.throttled
@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timedelta, timezone
+from functools import partial
+import pytest
+from typer.testing import CliRunner
+import minimono
+from minimono import main
+from .fakes import FakeEngine
+
+until = (datetime.now(tz=timezone.utc) - timedelta(days=100)).strftime("%Y-%m-%d")
+
+
+class SharedEngine(FakeEngine):
+    """Keeps the requests of every client, across commands."""
+
+    sent: list = list()
+
+    def make_request(self, request_obj):
+        SharedEngine.sent.append(request_obj)
+        return super().make_request(request_obj)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    SharedEngine.sent.clear()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "token", "token")
+    monkeypatch.setattr(minimono, "Client", partial(minimono.Client, engine_class=SharedEngine))
+    return CliRunner()
+
+
+def statements():
+    return [req for req in SharedEngine.sent if req.__class__.__name__ == "StatementReq"]
+
+
+def test_bare_command_prints_the_help(runner):
+    result = runner.invoke(main.app, [])
+    assert result.exit_code == 0, result.output
+    assert "Usage:" in result.output and "sync" in result.output and "export" in result.output
+
+
+def test_sync_resumes_from_the_default_files(runner, tmp_path):
+    result = runner.invoke(main.app, ["sync", "--until", until])
+    assert result.exit_code == 0, result.output
+    fetched = len(statements())
+    assert fetched and (tmp_path / "fake.json").exists() and (tmp_path / "fake.sqlite").exists()
+
+    result = runner.invoke(main.app, ["sync", "--until", until])
+    assert result.exit_code == 0, result.output
+    assert "Synced 0 buckets into fake.sqlite." in result.output
+    assert len(statements()) == fetched
+
+
+def test_failed_sync_leaves_the_profile_alone(runner, tmp_path, monkeypatch):
+    def fail(self, **kwargs):
+        raise RuntimeError("network is down")
+
+    monkeypatch.setattr(minimono.Client.func, "sync", fail)
+    result = runner.invoke(main.app, ["sync", "--until", until])
+    assert isinstance(result.exception, RuntimeError)
+    assert not (tmp_path / "fake.json").exists()
+
+
+def test_export_includes_the_last_day(runner, tmp_path):
+    day = (datetime.now(tz=timezone.utc) - timedelta(days=40)).strftime("%Y-%m-%d")
+    result = runner.invoke(main.app, ["export", "black", "--from", day, "--to", day, "--output", "out.ndjson"])
+    assert result.exit_code == 0, result.output
+    times = [json.loads(line)["time"] for line in (tmp_path / "out.ndjson").read_text().splitlines()]
+    assert times == [f"{day}T{hour:02}:00:00+00:00" for hour in (0, 6, 12, 18)]
+    assert (tmp_path / "fake.json").exists()
+
+    # A failed export leaves the profile alone
+    (tmp_path / "fake.json").unlink()
+    result = runner.invoke(main.app, ["export", "--format", "xml"])
+    assert isinstance(result.exception, ValueError)
+    assert not (tmp_path / "fake.json").exists()
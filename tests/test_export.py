@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from minimono import Client, export
+from minimono.storage import SQLiteStore
+from .fakes import FakeEngine
+
+now = datetime.now(tz=timezone.utc)
+fr = now - timedelta(days=40)
+
+
+def test_ndjson_export_streams_reduced_rows_in_time_order(tmp_path):
+    client = Client("token", engine_class=FakeEngine, store=SQLiteStore(str(tmp_path / "cache.sqlite")))
+    out = io.StringIO()
+    written = client.export(out, fr, now)
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert written == len(lines) > 0
+    assert set(lines[0]) == {"account", *export.REDUCED}
+    accounts = [line["account"] for line in lines]
+    assert accounts == sorted(accounts, key=[provider.id for provider in client.providers].index)
+    for provider in client.providers:
+        times = [line["time"] for line in lines if line["account"] == provider.id]
+        assert times == sorted(times)
+        expected = list(provider.iterStatement(client.engine, fr, now, client.store))
+        assert [tx["id"] for tx in lines if tx["account"] == provider.id] == [tx.id for tx in expected]
+
+
+def test_csv_export_with_columns():
+    client = Client("token", engine_class=FakeEngine)
+    account = client.user.accounts[0]
+    out = io.StringIO()
+    written = client.export(out, fr, now, providers=[account], format="csv", columns=["id", "currencyCode", "hold"])
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert len(rows) == written
+    assert list(rows[0]) == ["account", "id", "currencyCode", "hold"]
+    assert {row["account"] for row in rows} == {account.id}
+    assert rows[0]["currencyCode"] == str(account.currencyCode.value)
+
+
+def test_export_rejects_bad_arguments_before_fetching():
+    client = Client("token", engine_class=FakeEngine)
+    sent = len(client.engine.requests)
+    with pytest.raises(ValueError):
+        client.export(io.StringIO(), fr, now, format="xml")
+    with pytest.raises(ValueError):
+        client.export(io.StringIO(), fr, now, columns=["nope"])
+    assert len(client.engine.requests) == sent
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from hypothesis import given, strategies as st
+from minimono import Client
+from minimono.models import Account, Jar, Statement, Transaction, TxBucket, User, fast
+from .fakes import FakeEngine, RATES, USER_INFO, fake_statement
+
+utc_datetimes = st.datetimes(
+    min_value=datetime(2017, 10, 1), max_value=datetime(2040, 1, 1), timezones=st.just(timezone.utc)
+)
+# orjson, like the API, only deals in 64-bit integers
+int64 = st.integers(min_value=-2 ** 63, max_value=2 ** 63 - 1)
+b_transaction = st.builds(
+    Transaction,
+    time=utc_datetimes,
+    mcc=int64,
+    amount=int64,
+    operationAmount=int64,
+    commissionRate=int64,
+    cashbackAmount=int64,
+    balance=int64,
+)
+b_bucket = st.builds(
+    TxBucket,
+    date=utc_datetimes,
+    transactions=st.lists(b_transaction, max_size=5),
+)
+b_cache = st.dictionaries(st.text(min_size=1, max_size=5), b_bucket, max_size=3)
+b_user = st.builds(
+    User,
+    accounts=st.lists(
+        st.builds(Account, cached_statement=b_cache, balance=int64, creditLimit=int64),
+        max_size=3,
+    ),
+    jars=st.lists(
+        st.builds(Jar, cached_statement=b_cache, balance=int64, goal=st.none() | int64),
+        max_size=2,
+    ),
+)
+
+
+@given(user=b_user, stdlib_json=st.booleans())
+def test_fast_decode_matches_validated(user, stdlib_json):
+    backend = fast.orjson
+    if stdlib_json:
+        fast.orjson = None
+    try:
+        jsonified = user.json()
+        assert fast.load_user(jsonified) == User.parse_raw(jsonified)
+
+        compact = fast.dump_user(user)
+        assert User.parse_raw(compact) == user
+        assert fast.load_user(compact) == user
+    finally:
+        fast.orjson = backend
+
+
+def test_fast_api_parsing_matches_validated():
+    rows = fake_statement("acc", datetime(2022, 1, 1, tzinfo=timezone.utc), datetime(2022, 2, 1, tzinfo=timezone.utc))
+    assert fast.statement(rows) == Statement(transactions=[Transaction.parse_obj(x) for x in rows])
+    assert fast.statement([]) == Statement(transactions=[])
+    assert fast.user(USER_INFO) == User.parse_obj(USER_INFO)
+    assert fast.currencies(RATES) == FakeEngine.corresponding_methods["CurrRateReq"](RATES)
+
+
+def test_trusted_file_roundtrip(tmp_path):
+    filename = str(tmp_path / "user.json")
+    client = Client("token", engine_class=FakeEngine)
+    client.getStatement(
+        client['black'],
+        from_time=datetime(2022, 1, 1, tzinfo=timezone.utc),
+        to_time=datetime(2022, 6, 1, tzinfo=timezone.utc),
+    )
+    client.saveFile(filename, fast=True)
+    assert Client("token", engine_class=FakeEngine, load_file=filename) == client
+    trusted = Client("token", engine_class=FakeEngine)
+    trusted.loadFile(filename, trusted=True)
+    assert trusted == client
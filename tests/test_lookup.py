@@ -0,0 +1,28 @@
+from pytest import raises
+from minimono import Client
+from .fakes import FakeEngine
+
+
+def test_account_and_jar_lookups():
+    client = Client("token", engine_class=FakeEngine)
+    black = client['black']
+    assert client.account('acc-black') is black
+    assert client.account('UA000000000000000000000000001') is black
+    assert client.account('537541******1234') is black
+    assert client['usd'].id == 'acc-usd'
+    assert client.accounts is client.accounts
+
+    jar = client.jar('Savings')
+    assert client.jar('jar-1') is jar is client.jar('jar-send')
+    with raises(KeyError):
+        client.jar('nope')
+    with raises(KeyError):
+        client.account('nope')
+
+
+def test_index_is_rebuilt_after_refresh():
+    client = Client("token", engine_class=FakeEngine)
+    before = client['black']
+    client.refreshUser()
+    assert client['black'] is not before
+    assert client['black'] is client.user.accounts[0]
@@ -0,0 +1,54 @@
+import logging
+from datetime import datetime, timedelta, timezone
+import requests
+from minimono import Client, models
+from minimono.API import api_call
+from minimono.metrics import LoggingInstrument, MultiInstrument, PrometheusInstrument
+from .fakes import FakeEngine, RATES, ScriptedSession, make_response
+
+
+def test_engine_reports_requests_waits_and_parsing(monkeypatch, caplog, capsys):
+    monkeypatch.setattr(api_call, "sleep", lambda seconds: None)
+    metrics = PrometheusInstrument()
+    session = ScriptedSession(
+        requests.ConnectionError("reset"),
+        make_response(429, {}, {"Retry-After": "0"}),
+        make_response(200, RATES),
+        make_response(200, RATES),
+    )
+    caller = api_call.MonoCaller(
+        "token", session=session, instrument=MultiInstrument(metrics, LoggingInstrument()),  # type: ignore[arg-type]
+    )
+    with caplog.at_level(logging.DEBUG, logger="minimono"):
+        caller.make_request(models.CurrRateReq())
+        caller.make_request(models.CurrRateReq())
+
+    text = metrics.prometheus()
+    assert 'minimono_request_seconds_count{endpoint="currency"} 4' in text
+    assert 'minimono_responses_total{endpoint="currency",status="200"} 2' in text
+    assert 'minimono_responses_total{endpoint="currency",status="429"} 1' in text
+    assert 'minimono_responses_total{endpoint="currency",status="error"} 1' in text
+    assert 'minimono_parse_seconds_count{endpoint="currency"} 2' in text
+    assert 'minimono_ratelimit_wait_seconds_bucket{endpoint="currency",le="+Inf"} 2' in text
+    assert metrics.waits["currency"].sum > 60
+    size = len(make_response(200, RATES).content)
+    assert f'minimono_received_bytes_total{{endpoint="currency"}} {2 * size + 2}' in text
+
+    events = [record.minimono["event"] for record in caplog.records]
+    assert events.count("request") == 4 and events.count("parse") == 2
+    assert events.count("ratelimit_wait") == 1
+    # Waits go to the instrument only
+    assert capsys.readouterr().out == ""
+
+
+def test_statements_report_bucket_hits_and_misses():
+    client = Client("token", engine_class=FakeEngine)
+    client.engine.instrument = metrics = PrometheusInstrument()
+    account = client['black']
+    end = datetime(2022, 6, 1, tzinfo=timezone.utc)
+    client.getStatement(account, from_time=end - timedelta(days=40), to_time=end)
+    assert (metrics.hits[account.id], metrics.misses[account.id]) == (0, 2)
+    # The newest bucket is covered, the middle one only partly
+    client.getStatement(account, from_time=end - timedelta(days=60), to_time=end)
+    assert (metrics.hits[account.id], metrics.misses[account.id]) == (1, 4)
+    assert f'minimono_bucket_hits_total{{provider="{account.id}"}} 1' in metrics.prometheus()
@@ -0,0 +1,60 @@
+import os
+from minimono import models
+from minimono.API import Budget, ClientPool, RateLimiter, SyncProgress
+from .fakes import FakeEngine, ScriptedSession, USER_INFO, make_response
+
+
+class CountingEngine(FakeEngine):
+    user_requests = 0
+
+    def make_request(self, request_obj):
+        if isinstance(request_obj, models.UserInfoReq):
+            CountingEngine.user_requests += 1
+        return super().make_request(request_obj)
+
+
+def test_pool_shares_connections_and_reschedules_limited_tokens():
+    session = ScriptedSession(*(make_response(200, USER_INFO) for _ in range(6)))
+    limiter = RateLimiter(budgets={"client-info": Budget(capacity=1, per=0.2)})
+    pool = ClientPool(session=session, limiter=limiter, max_workers=2)
+    keys = [pool.add(f"token-{n}") for n in range(3)]
+    assert len(pool) == 3 and not pool.active and session.calls == 0
+
+    # Fresh clients were just fetched, so nothing is refetched
+    assert pool.refreshUsers() == {key: None for key in keys}
+    assert session.calls == 3
+    client = pool.client(keys[0])
+    assert client.engine.session is session and client.engine.limiter is limiter
+    assert client.engine.ratelimit_mode == "eta"
+
+    # Each token waits for its own slot instead of failing or blocking a worker
+    assert pool.refreshUsers() == {key: None for key in keys}
+    assert session.calls == 6
+
+
+def test_idle_clients_are_evicted_and_reloaded_from_state(tmp_path):
+    state_dir = str(tmp_path / "state")
+    CountingEngine.user_requests = 0
+    pool = ClientPool(engine_class=CountingEngine, state_dir=state_dir, max_active=2, session=object())
+    keys = [pool.add(f"token-{n}") for n in range(3)]
+    assert pool.run(lambda client: client.user.clientId) == {key: "fake" for key in keys}
+    assert CountingEngine.user_requests == 3
+    assert len(pool.active) == 2 and os.path.exists(os.path.join(state_dir, f"{keys[0]}.json"))
+
+    pool.idle_timeout = 0
+    assert pool.evict_idle() == 2 and not pool.active
+    assert pool.client(keys[1]).user.clientId == "fake"
+    assert CountingEngine.user_requests == 3
+
+    pool.remove(keys[1])
+    assert len(pool) == 2 and keys[1] not in pool.active
+
+
+def test_sync_recent_for_every_token():
+    pool = ClientPool(engine_class=FakeEngine, session=object())
+    keys = [pool.add(f"token-{n}") for n in range(2)]
+    results = pool.syncRecent(days=2)
+    assert set(results) == set(keys)
+    assert all(isinstance(result, SyncProgress) and result.done == result.total > 0 for result in results.values())
+    errors = pool.run(lambda client: 1 / 0)
+    assert all(isinstance(error, ZeroDivisionError) for error in errors.values())
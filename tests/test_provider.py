@@ -0,0 +1,237 @@
+from datetime import datetime, timedelta, timezone
+from minimono import Client
+from minimono.models import (
+    MAX_ROWS, TIMEBLOCK, Aggregates, TxBucket, align_datetime, construct_bucket_list, fast, plan_windows,
+)
+from minimono.storage import BoundedStore, IndexedStore, MappedStore, SQLiteStore
+from minimono.storage.mapped import MappedRows
+from .fakes import CountingStore, FakeEngine, fake_statement
+
+fr = datetime(2021, 6, 3, 12, tzinfo=timezone.utc)
+to = datetime(2022, 6, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def test_iter_statement_matches_filtering_everything():
+    client = Client("token", engine_class=FakeEngine)
+    account = client['black']
+    rows = list(account.iterStatement(client.engine, fr, to))
+
+    everything = {
+        tx.id: tx for bucket in account.cached_statement.values() for tx in bucket
+    }
+    expected = sorted((tx for tx in everything.values() if fr <= tx.time <= to), key=lambda x: x.time)
+    assert rows == expected
+    assert client.getStatement(account, from_time=fr, to_time=to).transactions == expected
+
+    day = client.getStatement(account, from_time=to - timedelta(days=1), to_time=to)
+    assert len(day) == 4
+    assert day.timeframe == (day[0].time, day[-1].time)
+
+
+def test_bucket_slice_owns_half_open_range():
+    date = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    raw = fake_statement("acc", date, date + TIMEBLOCK + timedelta(hours=1))
+    bucket = TxBucket.parse_obj({"date": date, "transactions": raw})
+    assert bucket.times == sorted(bucket.times)
+    start = bucket.date
+    owned = bucket.slice(start - TIMEBLOCK, start + TIMEBLOCK * 2)
+    assert owned[0].time >= start and owned[-1].time < bucket.next
+    middle = bucket.slice(start + timedelta(days=2), start + timedelta(days=3))
+    assert [tx.time for tx in middle] == [
+        t for t in bucket.times if start + timedelta(days=2) <= t <= start + timedelta(days=3)
+    ]
+    assert fast.bucket({"date": bucket.date.isoformat(), "transactions": raw}).times == bucket.times
+
+
+class LiveEngine(FakeEngine):
+    """Knows nothing past the real now, and keeps the last two days on hold."""
+
+    settled = False
+
+    def make_request(self, request_obj):
+        self.requests.append(request_obj)
+        now = datetime.now(tz=timezone.utc)
+        rows = fake_statement(request_obj.account, request_obj.from_, min(request_obj.to_, now))
+        for row in rows:
+            row["hold"] = not self.settled and row["time"] > (now - timedelta(days=2)).timestamp()
+        return self.corresponding_methods["StatementReq"](rows)
+
+
+def test_open_bucket_is_topped_up_and_holds_reconciled():
+    client = Client("token", engine_class=FakeEngine)
+    client.engine = engine = LiveEngine("token")
+    account = client['black']
+    now = datetime.now(tz=timezone.utc)
+
+    first = client.getStatement(account, from_time=now - timedelta(days=3), to_time=now)
+    assert any(tx.hold for tx in first)
+    current = account.cached_statement[TxBucket(date=now, transactions=[]).date.isoformat()]
+    assert current.covered_until is not None and current.gaps(now - timedelta(days=3), now)
+
+    engine.settled = True
+    requests_made = len(engine.requests)
+    later = datetime.now(tz=timezone.utc)
+    second = client.getStatement(account, from_time=now - timedelta(days=3), to_time=later)
+    assert len(engine.requests) == requests_made + 1
+    refresh = engine.requests[-1]
+    assert refresh.from_ == min(tx.time for tx in first if tx.hold)
+    assert not any(tx.hold for tx in second)
+    assert [tx.id for tx in second] == [tx.id for tx in first]
+
+    # Already covered past :later:, and nothing left on hold
+    client.getStatement(account, from_time=now - timedelta(days=3), to_time=later)
+    account.getStatement(engine, now - timedelta(days=3), datetime.now(tz=timezone.utc), refresh=False)
+    assert len(engine.requests) == requests_made + 1
+
+
+def test_closed_and_legacy_buckets_are_not_refreshed():
+    date = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    legacy = TxBucket(date=date, transactions=fake_statement("acc", date, date + TIMEBLOCK))
+    assert legacy.covered_until is None and legacy.coverage == (legacy.date, legacy.next)
+    assert legacy.gaps(date - TIMEBLOCK, legacy.next + TIMEBLOCK) == []
+    closed = TxBucket(date=date, transactions=[], covered_until=legacy.next)
+    assert closed.gaps(date, closed.next) == []
+
+
+def test_holds_are_reconciled_in_closed_buckets_with_and_without_a_store():
+    date = align_datetime(datetime.now(tz=timezone.utc), TIMEBLOCK) - TIMEBLOCK
+    rows = fake_statement('acc-black', date, date + TIMEBLOCK)
+    rows[5]["hold"] = True
+    hold = datetime.fromtimestamp(rows[5]["time"], tz=timezone.utc)
+    bucket = TxBucket(date=date, transactions=rows, covered_until=date + TIMEBLOCK)
+    assert bucket.gaps(date, bucket.next) == [(hold, bucket.next)]
+    assert bucket.gaps(date, bucket.next, refresh=False) == []
+
+    for store in (None, SQLiteStore()):
+        account = Client("token", engine_class=FakeEngine)['black']
+        account._put_bucket(bucket, store)
+        assert account.pendingWindows(date, bucket.next, store) == [(hold, bucket.next)]
+        assert account.pendingWindows(date, hold - timedelta(hours=1), store) == []
+        assert account.pendingWindows(date, bucket.next, store, refresh=False) == []
+
+
+def test_stuck_holds_past_the_settle_horizon_are_not_refetched():
+    date = align_datetime(datetime(2022, 1, 1, tzinfo=timezone.utc), TIMEBLOCK)
+    rows = fake_statement('acc-black', date, date + TIMEBLOCK)
+    rows[5]["hold"] = True
+    bucket = TxBucket(date=date, transactions=rows, covered_until=date + TIMEBLOCK)
+    assert bucket.gaps(date, bucket.next) == []
+
+    for store in (None, SQLiteStore()):
+        client = Client("token", engine_class=FakeEngine)
+        account = client['black']
+        account._put_bucket(bucket, store)
+        assert account.pendingWindows(date, bucket.next, store) == []
+        client.engine.requests.clear()
+        account.getStatement(client.engine, fr=date, to=bucket.next, store=store)
+        assert client.engine.requests == []
+
+
+def test_planner_coalesces_windows_across_buckets():
+    client = Client("token", engine_class=FakeEngine)
+    account = client['black']
+    client.getStatement(account, from_time=fr, to_time=to)
+    windows = [(req.from_, req.to_) for req in client.engine.requests[1:]]
+    # One call per TIMEBLOCK of the range, not one per bucket it touches
+    assert len(windows) == -(-(to - fr) // TIMEBLOCK)
+    assert len(windows) < len(construct_bucket_list(fr=fr, to=to))
+    assert min(start for start, _ in windows) == fr and max(end for _, end in windows) == to
+    assert all(end - start <= TIMEBLOCK for start, end in windows)
+
+    # Only the uncovered edges of a wider range are requested
+    client.engine.requests.clear()
+    client.getStatement(account, from_time=fr - timedelta(days=2), to_time=to + timedelta(days=1))
+    assert [(req.from_, req.to_) for req in client.engine.requests] == [
+        (to, to + timedelta(days=1)), (fr - timedelta(days=2), fr),
+    ]
+    client.engine.requests.clear()
+    client.getStatement(account, from_time=fr, to_time=to)
+    assert client.engine.requests == []
+
+
+def test_planner_never_requests_the_future():
+    client = Client("token", engine_class=FakeEngine)
+    now = datetime.now(tz=timezone.utc)
+    client.getStatement(client['black'], from_time=now - timedelta(days=1), to_time=now + TIMEBLOCK)
+    assert all(req.to_ <= datetime.now(tz=timezone.utc) for req in client.engine.requests[1:])
+
+
+class CappedEngine(FakeEngine):
+    """Returns only the newest MAX_ROWS rows of a request, like the API."""
+
+    def make_request(self, request_obj):
+        self.requests.append(request_obj)
+        rows = fake_statement(request_obj.account, request_obj.from_, request_obj.to_, step=timedelta(minutes=10))
+        return self.corresponding_methods["StatementReq"](rows[:MAX_ROWS])
+
+
+def test_full_pages_are_split_until_the_window_is_complete():
+    client = Client("token", engine_class=FakeEngine)
+    client.engine = engine = CappedEngine("token")
+    account = client['black']
+    start, end = fr, fr + timedelta(days=10)
+    statement = client.getStatement(account, from_time=start, to_time=end)
+    expected = fake_statement(account.id, start, end, step=timedelta(minutes=10))
+    assert len(expected) > 2 * MAX_ROWS
+    assert sorted(tx.id for tx in statement) == sorted(row["id"] for row in expected)
+    # 1441 rows, both ends included: two full pages and the rest
+    assert len(expected) == 1441 and len(engine.requests) == 3
+
+
+def test_plan_windows():
+    day = timedelta(days=1)
+    gaps = [(fr, fr + day), (fr + 3 * day, fr + 4 * day), (fr + 40 * day, fr + 90 * day)]
+    assert plan_windows(gaps) == [
+        (fr + 71 * day, fr + 90 * day),
+        (fr + 40 * day, fr + 71 * day),
+        (fr, fr + 4 * day),
+    ]
+    assert plan_windows([(fr, fr + 20 * day), (fr + 20 * day, fr + 40 * day)]) == [
+        (fr + 31 * day, fr + 40 * day), (fr, fr + 31 * day),
+    ]
+
+
+def test_summaries_use_bucket_aggregates_and_scan_only_the_edges():
+    memory = Client("token", engine_class=FakeEngine)
+    counting = CountingStore()
+    stored = Client("token", engine_class=FakeEngine, store=counting)
+    expected = Aggregates.of(memory.getStatement(memory['black'], from_time=fr, to_time=to))
+    for client in (memory, stored):
+        account = client['black']
+        assert client.summarize(account, fr, to) == expected.total
+        assert client.summarize(account, fr, to, group_by="mcc") == expected.mcc
+        assert account.summarize(fr, to, client.store, group_by="currencyCode") == expected.currencyCode
+
+    counting.loaded = 0
+    stored['black'].summarize(fr, to, stored.store)
+    assert counting.loaded == 2
+    # Wrapped stores pass the stored aggregates through
+    counting.loaded = 0
+    assert stored['black'].summarize(fr, to, IndexedStore(counting)) == expected.total
+    assert counting.loaded == 2
+    assert len(construct_bucket_list(fr, to)) > 10
+
+
+def test_binary_buckets_keep_their_aggregates(tmp_path, monkeypatch):
+    memory = Client("token", engine_class=FakeEngine)
+    statement = memory.getStatement(memory['black'], from_time=fr, to_time=to)
+    expected = Aggregates.of(statement)
+    dates = construct_bucket_list(fr, to)
+    edge_rows = sum(1 for tx in statement if align_datetime(tx.time, TIMEBLOCK) in (dates[0], dates[-1]))
+
+    decoded = list()
+    row = MappedRows.row
+    monkeypatch.setattr(MappedRows, "row", lambda self, index: decoded.append(index) or row(self, index))
+    stores = (
+        lambda: MappedStore(str(tmp_path / "mapped")),
+        lambda: BoundedStore(budget=0, path=str(tmp_path / "bounded")),
+    )
+    for open_store in stores:
+        store = open_store()
+        client = Client("token", engine_class=FakeEngine, store=store)
+        client.getStatement(client['black'], from_time=fr, to_time=to)
+        store.close()
+        decoded.clear()
+        # Only the rows of the edge buckets are built, the rest is answered by the stored aggregates
+        assert memory['black'].summarize(fr, to, open_store()) == expected.total
+        assert len(decoded) == edge_rows
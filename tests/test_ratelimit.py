@@ -0,0 +1,72 @@
+import multiprocessing
+from pytest import raises
+from minimono import abstract, models
+from minimono.API import MonoCaller, RateLimiter, FileBackend
+from minimono.API.ratelimit import Budget, endpoint_of
+from minimono.metrics import PrometheusInstrument
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_endpoints_have_separate_budgets():
+    clock = Clock()
+    limiter = RateLimiter(clock=clock)
+    assert limiter.reserve("t", "statement") == 0
+    assert limiter.reserve("t", "currency") == 0
+    assert limiter.reserve("t", "client-info") == 0
+    assert limiter.reserve("t", "statement") == 62
+    assert limiter.reserve("other", "statement") == 0
+    # Currency is public and shared by every token on the host
+    assert limiter.eta("other", "currency") == 62
+
+    clock.now += 31
+    assert limiter.eta("t", "statement") == 93
+    clock.now += 93
+    assert limiter.eta("t", "statement") == 0
+
+
+def test_try_acquire_reports_eta_without_booking():
+    clock = Clock()
+    limiter = RateLimiter(budgets={"statement": Budget(capacity=2, per=10)}, clock=clock)
+    assert limiter.try_acquire("t", "statement") == 0
+    assert limiter.try_acquire("t", "statement") == 0
+    assert limiter.try_acquire("t", "statement") == 5
+    assert limiter.try_acquire("t", "statement") == 5
+    clock.now += 5
+    assert limiter.try_acquire("t", "statement") == 0
+
+
+def test_caller_eta_mode_raises():
+    metrics = PrometheusInstrument()
+    caller = MonoCaller("t", ratelimit_mode="eta", instrument=metrics)
+    caller.limiter.reserve("t", "client-info")
+    with raises(abstract.TooEarly) as info:
+        caller.make_request(models.UserInfoReq())
+    assert info.value.eta > 60
+    # Refused requests report the wait too
+    assert metrics.waits["client-info"].sum == info.value.eta
+    assert caller.eta(models.CurrRateReq()) == 0
+    assert endpoint_of(models.StatementReq(account="a").get_path_tail()) == "statement"
+
+
+def _reserve_in_child(path, queue):
+    queue.put(RateLimiter(FileBackend(path)).reserve("secret", "statement"))
+
+
+def test_file_backend_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "limits.json")
+    assert RateLimiter(FileBackend(path)).reserve("secret", "statement") == 0
+
+    queue = multiprocessing.Queue()
+    child = multiprocessing.Process(target=_reserve_in_child, args=(path, queue))
+    child.start()
+    child.join()
+    assert queue.get() > 60
+    # Tokens never reach the disk in clear
+    assert "secret" not in open(path).read()
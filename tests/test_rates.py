@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from minimono import AsyncClient, Client, models
+from minimono.models.enumerators import CurrencyCode
+from .fakes import AsyncFakeEngine, FakeEngine
+
+uah, eur, usd, pln = CurrencyCode.uah, CurrencyCode.eur, CurrencyCode.usd, 985
+
+
+def rate_requests(engine):
+    return [req for req in engine.requests if isinstance(req, models.CurrRateReq)]
+
+
+def test_rate_table_derives_pairs():
+    client = Client("token", engine_class=FakeEngine)
+    table = client.rates()
+    usd_uah = (36.65 + 37.44) / 2
+    eur_uah = (37.1 + 38.2) / 2
+    assert table.rate(usd, uah) == pytest.approx(usd_uah)
+    assert table.rate(uah, usd) == pytest.approx(1 / usd_uah)
+    assert table.rate(pln, uah) == pytest.approx(9.8)
+    assert table.rate(eur, usd) == pytest.approx(eur_uah / usd_uah)
+    assert table.rate(pln, eur) == pytest.approx(9.8 / eur_uah)
+    assert table.rate(usd, usd) == 1
+    with pytest.raises(KeyError):
+        table.rate(usd, 392)
+    assert table.last_update == datetime.fromtimestamp(1660000000, tz=timezone.utc)
+
+
+def test_rates_are_cached_for_their_ttl():
+    client = Client("token", engine_class=FakeEngine, rates_ttl=60)
+    assert client.rates() is client.rates()
+    assert len(rate_requests(client.engine)) == 1
+    client.rates().fetched -= timedelta(seconds=61)
+    client.rates()
+    assert len(rate_requests(client.engine)) == 2
+    assert isinstance(client.getRates(), models.Currencies)
+    assert len(rate_requests(client.engine)) == 3
+
+
+def test_quotes_expire_by_the_date_the_bank_set_them():
+    now = datetime.now(tz=timezone.utc)
+    quotes = [
+        models.CurrencyExchange(currencyCodeA=usd, currencyCodeB=uah, date=now - timedelta(hours=1), rateCross=37.0),
+        models.CurrencyExchange(currencyCodeA=pln, currencyCodeB=uah, date=now - timedelta(days=3), rateCross=9.8),
+    ]
+    table = models.RateTable(quotes, fetched=now, ttl=3600, max_age=2 * 3600)
+    with pytest.raises(KeyError):
+        table.rate(pln, uah)
+    assert table.rate(usd, uah) == 37.0
+    # The usd quote goes stale an hour from now, before the TTL is over
+    assert table.expires == now + timedelta(hours=1)
+    assert not table.expired(now + timedelta(minutes=59))
+    assert table.expired(now + timedelta(minutes=61))
+    # Remembered rates go stale with their quotes
+    with pytest.raises(KeyError):
+        table.rate(usd, uah, now + timedelta(minutes=61))
+    assert models.RateTable(quotes, fetched=now, ttl=60).rate(pln, usd) == pytest.approx(9.8 / 37.0)
+
+
+def test_convert_statement_and_table():
+    client = Client("token", engine_class=FakeEngine)
+    end = datetime(2022, 6, 1, tzinfo=timezone.utc)
+    statement = client.getStatement(client['black'], from_time=end - timedelta(days=3), to_time=end)
+    factor = client.rates().rate(uah, usd)
+    expected = [round(tx.operationAmount * factor) for tx in statement]
+    assert client.convert(statement) == expected
+    assert client.rates().convert(statement.transactions, uah) == [tx.operationAmount for tx in statement]
+    table = models.TransactionTable.from_statement(statement)
+    assert client.rates().convert(table, usd).tolist() == expected
+    assert len(rate_requests(client.engine)) == 1
+
+
+def test_async_rates():
+    async def run():
+        client = AsyncClient("token", engine_class=AsyncFakeEngine)
+        first = await client.rates()
+        return client, first, await client.rates()
+
+    client, first, second = asyncio.run(run())
+    assert first is second
+    assert len(rate_requests(client.engine)) == 1
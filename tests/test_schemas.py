@@ -1,7 +1,8 @@
 from pytest import raises
-from hypothesis import given, strategies as st
+from hypothesis import example, given, strategies as st
 from pydantic import BaseModel
 from typing import cast
+from datetime import datetime, timezone
 from minimono.models import (
     Account,
     Transaction,
@@ -10,7 +11,9 @@ from minimono.models import (
     CurrencyExchange,
     HeadersPrivate,
     StatementReq,
-    TxBucket
+    TxBucket,
+    TIMEBLOCK,
+    align_datetime,
 )
 from .strategies import b_any_model, b_non_empty_statement
 
@@ -53,4 +56,26 @@ def test_statements_methods(s1, s2):
     with raises(TypeError):
         s + 's' # type: ignore
     
-    
\ No newline at end of file
+    
+
+@given(st.lists(b_non_empty_statement, min_size=1, max_size=5))
+def test_merge_matches_sorted_concatenation(statements):
+    everything = [tx for s in statements for tx in s]
+    merged = Statement.merge(*statements)
+    assert merged.transactions == sorted(everything, key=lambda x: x.time)
+    assert list(Statement.iterMerge(*statements)) == merged.transactions
+
+    deduped = Statement.merge(*statements, *statements, dedupe=True)
+    assert [tx.id for tx in deduped] == list(dict.fromkeys(tx.id for tx in merged))
+    # Reverse-sorted sources, as sent by the API, are merged too
+    newest_first = [list(reversed(s.transactions)) for s in statements]
+    assert [tx.time for tx in Statement.merge(*newest_first)] == [tx.time for tx in merged]
+
+
+@given(st.datetimes(timezones=st.just(timezone.utc)))
+@example(datetime.min.replace(tzinfo=timezone.utc))
+def test_bucket_dates_stay_on_the_grid(moment):
+    date = align_datetime(moment, TIMEBLOCK)
+    assert date.timestamp() % TIMEBLOCK.total_seconds() == 0
+    # Only dates before the first bucket of year 1 are moved forward
+    assert date <= moment or date < datetime.min.replace(tzinfo=timezone.utc) + TIMEBLOCK
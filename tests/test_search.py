@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+import pytest
+from minimono import Client
+from minimono.models import Transaction
+from minimono.storage import IndexedStore, SQLiteStore
+from .fakes import FakeEngine
+
+fr = datetime(2022, 1, 10, tzinfo=timezone.utc)
+to = datetime(2022, 4, 20, tzinfo=timezone.utc)
+
+
+def test_search_matches_a_linear_scan():
+    client = Client("token", engine_class=FakeEngine, store=IndexedStore(SQLiteStore()))
+    statement = client.getStatement(client['black'], from_time=fr, to_time=to)
+
+    scanned = sorted(
+        (tx for tx in statement if tx.description.lower().startswith("shop 3")),
+        key=lambda tx: tx.time,
+    )
+    assert [tx for _, tx in client.search("SH 3")] == scanned
+    assert {account for account, _ in client.search("shop")} == {'acc-black'}
+    middle = scanned[len(scanned) // 2].time
+    assert [tx for _, tx in client.search("shop 3", from_time=middle)] == [
+        tx for tx in scanned if tx.time >= middle
+    ]
+    assert client.search("shop", providers=[client['usd']]) == []
+    assert client.search("nothing") == []
+
+
+def test_search_by_counterparty_and_persisted_index(tmp_path):
+    path = str(tmp_path / "user.index.json")
+    database = str(tmp_path / "cache.sqlite")
+    client = Client("token", engine_class=FakeEngine, store=IndexedStore(SQLiteStore(database), path))
+    pushed = Transaction(
+        id="pushed", time=datetime(2022, 2, 1, 12, tzinfo=timezone.utc), description="Transfer to Ivan",
+        mcc=4829, hold=False, amount=-100, operationAmount=-100, currencyCode=980, commissionRate=0,
+        cashbackAmount=0, balance=0, comment="for coffee", counterIban="UA0000000001",
+    )
+    client.ingest('acc-black', pushed)
+    assert client.search(counterIban="UA0000000001") == [('acc-black', pushed)]
+    assert client.search("coff", counterIban="UA0000000001") == [('acc-black', pushed)]
+    assert client.search("coff", counterIban="UA0000000002") == []
+    with pytest.raises(ValueError):
+        client.search(mcc="4829")
+    # The fetched month replaces the pushed row, and the index follows
+    client.getStatement(client['black'], from_time=fr, to_time=to)
+    assert client.search("ivan") == []
+    client.store.flush()
+
+    reopened = IndexedStore(SQLiteStore(database), path)
+    assert len(reopened.index) == len(client.store.index)
+    assert reopened.index_missing(['acc-black']) == 0
+
+    # Buckets stored before there was an index are indexed on the first search
+    unindexed = Client("token", engine_class=FakeEngine, store=IndexedStore(SQLiteStore(database)))
+    assert unindexed.search("shop 5") == client.search("shop 5") != []
+    with pytest.raises(ValueError):
+        Client("token", engine_class=FakeEngine).search("ivan")
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import pytest
+import minimono
+from minimono.main import EARLIEST_DATE, import_times
+
+HEAVY = ("pydantic", "requests", "numpy", "orjson", "devtools", "email.policy", "minimono.models")
+# Wall-clock timing is only checked on request, e.g. MINIMONO_STARTUP_BUDGET=0.25 (seconds)
+BUDGET = os.environ.get("MINIMONO_STARTUP_BUDGET")
+
+
+def loaded_after(statement: str):
+    probe = f"import sys; {statement}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_cli_starts_without_heavy_imports():
+    assert loaded_after("import minimono.main") == []
+    assert loaded_after("import minimono") == []
+    assert "pydantic" in loaded_after("from minimono import Client")
+
+
+@pytest.mark.skipif(not BUDGET, reason="MINIMONO_STARTUP_BUDGET is not set")
+def test_cli_import_time_budget():
+    times = dict(import_times("minimono.main"))
+    assert times["minimono.main"] < float(BUDGET), sorted(times.items(), key=lambda item: -item[1])[:10]
+
+
+def test_lazy_package_attributes():
+    from minimono.API import Client
+    from minimono import models
+    assert minimono.Client is Client and minimono.models is models
+    assert "AsyncClient" in dir(minimono)
+    assert EARLIEST_DATE == models.EARLIEST_DATE
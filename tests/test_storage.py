@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import pytest
+from datetime import datetime, timedelta, timezone
+from minimono import Client
+from minimono.models import TIMEBLOCK, Transaction, TxBucket, align_datetime
+from minimono.storage import BoundedStore, DirectoryStore, MappedStore, SQLiteStore
+from minimono.storage.mapped import MappedRows
+from .fakes import FakeEngine, fake_statement, fake_transaction
+
+fr = datetime(2022, 1, 10, tzinfo=timezone.utc)
+to = datetime(2022, 4, 20, tzinfo=timezone.utc)
+
+
+def test_sqlite_store_matches_memory_cache(tmp_path):
+    plain = Client("token", engine_class=FakeEngine)
+    expected = plain.getStatement(plain['black'], from_time=fr, to_time=to)
+
+    store = SQLiteStore(str(tmp_path / "cache.sqlite"))
+    stored = Client("token", engine_class=FakeEngine, store=store)
+    assert stored.getStatement(stored['black'], from_time=fr, to_time=to) == expected
+    assert not stored['black'].cached_statement
+
+    # Second call is answered from the index, without any API calls
+    requests_made = len(stored.engine.requests)
+    narrow = stored.getStatement(stored['black'], from_time=fr + TIMEBLOCK, to_time=fr + TIMEBLOCK * 2)
+    assert len(stored.engine.requests) == requests_made
+    assert narrow.transactions == [
+        tx for tx in expected if fr + TIMEBLOCK <= tx.time <= fr + TIMEBLOCK * 2
+    ]
+
+    some = expected[5]
+    assert store.by_id(some.id) == some
+    assert all(tx.mcc == some.mcc for tx in store.by_mcc('acc-black', some.mcc))
+    date = store.bucket_dates('acc-black')[0]
+    cached = plain['black'].cached_statement[date.isoformat()]
+    assert list(store.get_bucket('acc-black', date)) == sorted(cached, key=lambda x: x.time)
+
+
+
+def test_sqlite_store_keeps_boundary_rows_in_the_bucket_owning_them():
+    store = SQLiteStore()
+    date = align_datetime(fr, TIMEBLOCK)
+    inside = Transaction.parse_obj(fake_transaction('acc-black', fr))
+    boundary = Transaction.parse_obj(fake_transaction('acc-black', date + TIMEBLOCK))
+    # Caches written before buckets were half-open keep the boundary row in both
+    store.put_bucket('acc-black', TxBucket(date=date + TIMEBLOCK, transactions=[boundary]))
+    store.put_bucket('acc-black', TxBucket(date=date, transactions=[inside, boundary]))
+
+    assert list(store.get_bucket('acc-black', date)) == [inside]
+    assert list(store.get_bucket('acc-black', date + TIMEBLOCK)) == [boundary]
+    sizes = store.connection.execute("SELECT size FROM buckets ORDER BY date").fetchall()
+    assert sizes == [(1,), (1,)]
+    assert store.aggregates('acc-black', date).total.count == 1
+
+
+def test_sqlite_store_upgrades_databases_without_coverage(tmp_path):
+    database = str(tmp_path / "cache.sqlite")
+    store = SQLiteStore(database)
+    date = align_datetime(fr, TIMEBLOCK)
+    store.put_bucket('acc-black', TxBucket(date=date, transactions=fake_statement('acc-black', date, date + TIMEBLOCK)))
+    store.close()
+    # The buckets table as the first schema had it
+    connection = sqlite3.connect(database)
+    with connection:
+        connection.execute("CREATE TABLE old AS SELECT provider, date, size, stored_at FROM buckets")
+        connection.execute("DROP TABLE buckets")
+        connection.execute("ALTER TABLE old RENAME TO buckets")
+    connection.close()
+
+    upgraded = SQLiteStore(database)
+    assert upgraded.coverage('acc-black', date) == (date, date + TIMEBLOCK)
+    assert upgraded.aggregates('acc-black', date).total.count == len(upgraded.get_bucket('acc-black', date))
+    client = Client("token", engine_class=FakeEngine, store=upgraded)
+    client.getStatement(client['black'], from_time=date, to_time=date + TIMEBLOCK - timedelta(seconds=1))
+    assert [type(request).__name__ for request in client.engine.requests] == ["UserInfoReq"]
+
+def test_file_keeps_profile_only_and_migrates(tmp_path):
+    filename = str(tmp_path / "user.json")
+    plain = Client("token", engine_class=FakeEngine)
+    plain.getStatement(plain['black'], from_time=fr, to_time=to)
+    plain.saveFile(filename)
+
+    store = SQLiteStore(str(tmp_path / "cache.sqlite"))
+    migrated = Client("token", engine_class=FakeEngine, load_file=filename, store=store)
+    assert len(store.bucket_dates('acc-black')) == len(plain['black'].cached_statement)
+    migrated.saveFile(filename)
+    assert "cached_statement" not in open(filename).read()
+
+
+def test_directory_store_writes_only_dirty_buckets(tmp_path):
+    directory = str(tmp_path / "cache")
+    profile = str(tmp_path / "user.json")
+    client = Client("token", engine_class=FakeEngine, store=DirectoryStore(directory))
+    client.getStatement(client['black'], from_time=fr, to_time=to)
+    assert client.store.dirty
+    client.saveFile(profile)
+    written = len(client.store.bucket_dates('acc-black'))
+    assert written and not client.store.dirty
+    mtime = os.stat(profile).st_mtime_ns
+
+    # One request for the missing month, spread over the two buckets it touches
+    requests_made = len(client.engine.requests)
+    client.getStatement(client['black'], from_time=fr - TIMEBLOCK, to_time=to)
+    assert len(client.engine.requests) == requests_made + 1
+    assert len(client.store.dirty) == 2
+    assert client.store.flush() == 2
+    client.saveFile(profile)
+    assert os.stat(profile).st_mtime_ns == mtime
+
+    reopened = Client("token", engine_class=FakeEngine, load_file=profile, store=DirectoryStore(directory))
+    assert not reopened.store.loaded
+    requests_made = len(reopened.engine.requests)
+    assert reopened.getStatement(reopened['black'], from_time=fr, to_time=to) == \
+        client.getStatement(client['black'], from_time=fr, to_time=to)
+    assert len(reopened.engine.requests) == requests_made
+
+    # Empty buckets are buckets too, not misses
+    empty = TxBucket(date=fr - 2 * TIMEBLOCK, transactions=[])
+    reopened.store.put_bucket('acc-black', empty)
+    assert reopened.store.get_bucket('acc-black', empty.date) is empty
+
+
+def test_mapped_store_builds_only_the_rows_read(tmp_path):
+    directory = str(tmp_path / "cache")
+    client = Client("token", engine_class=FakeEngine, store=MappedStore(directory))
+    expected = client.getStatement(client['black'], from_time=fr, to_time=to)
+    client.store.flush()
+    assert os.listdir(os.path.join(directory, 'acc-black'))[0].endswith(".bin")
+    # Written buckets are dropped from memory and mapped again when read
+    assert not client.store.loaded
+    assert isinstance(client.store.get_bucket('acc-black', client.store.bucket_dates('acc-black')[0]).transactions, MappedRows)
+
+    store = MappedStore(directory)
+    reopened = Client("token", engine_class=FakeEngine, store=store)
+    requests_made = len(reopened.engine.requests)
+    date = store.bucket_dates('acc-black')[-1]
+    bucket = store.get_bucket('acc-black', date)
+    assert isinstance(bucket.transactions, MappedRows)
+    assert bucket.coverage == client.store.get_bucket('acc-black', date).coverage
+    assert reopened.getStatement(reopened['black'], from_time=fr, to_time=to) == expected
+    assert len(reopened.engine.requests) == requests_made
+
+    # Mappings hold file descriptors, only the most recently used stay open
+    bounded = MappedStore(directory, max_mapped=2)
+    dates = bounded.bucket_dates('acc-black')
+    buckets = [bounded.get_bucket('acc-black', date) for date in dates]
+    assert len(dates) > 2 and list(bounded.mapped) == [('acc-black', date) for date in dates[-2:]]
+    assert all(bucket.transactions.buffer.closed for bucket in buckets[:-2])
+    assert list(bounded.get_bucket('acc-black', dates[0])) == list(client.store.get_bucket('acc-black', dates[0]))
+    bounded.close()
+    assert not bounded.mapped and buckets[-1].transactions.buffer.closed
+
+
+def test_compressed_cache_files_roundtrip(tmp_path):
+    client = Client("token", engine_class=FakeEngine)
+    client.getStatement(client['black'], from_time=fr, to_time=to)
+    plain = str(tmp_path / "user.json")
+    client.saveFile(plain)
+    for extension in (".gz", ".bz2", ".xz"):
+        filename = str(tmp_path / f"user.json{extension}")
+        client.saveFile(filename, indent=None)
+        assert os.path.getsize(filename) * 3 < os.path.getsize(plain)
+        assert Client("token", engine_class=FakeEngine, load_file=filename) == client
+        trusted = Client("token", engine_class=FakeEngine)
+        trusted.loadFile(filename, trusted=True)
+        assert trusted == client
+
+    # Recognized by magic bytes whatever the name
+    os.replace(str(tmp_path / "user.json.gz"), plain)
+    assert Client("token", engine_class=FakeEngine, load_file=plain) == client
+    with pytest.raises(FileNotFoundError):
+        client.loadFile(str(tmp_path / "user.txt.gz"))
+
+
+def test_bounded_store_spills_and_reloads(tmp_path):
+    store = BoundedStore(budget=200_000, path=str(tmp_path / "spill"))
+    client = Client("token", engine_class=FakeEngine, store=store)
+    since = to - 6 * TIMEBLOCK
+    expected = client.getStatement(client['black'], from_time=since, to_time=to)
+    stats = store.stats()
+    assert stats["spilled"] and stats["bytes"] <= stats["budget"]
+    assert len(store.bucket_dates('acc-black')) > stats["buckets"]
+
+    requests_made = len(client.engine.requests)
+    assert client.getStatement(client['black'], from_time=since, to_time=to, refresh=False) == expected
+    assert len(client.engine.requests) == requests_made
+    assert store.stats()["misses"]
+
+    store.close()
+    reopened = Client("token", engine_class=FakeEngine, store=BoundedStore(path=str(tmp_path / "spill")))
+    requests_made = len(reopened.engine.requests)
+    assert reopened.getStatement(reopened['black'], from_time=since, to_time=to, refresh=False) == expected
+    assert len(reopened.engine.requests) == requests_made
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from minimono import AsyncClient, Client, abstract
+from minimono.storage import SQLiteStore
+from .fakes import AsyncFakeEngine, FakeEngine
+
+until = datetime.now(tz=timezone.utc) - timedelta(days=100)
+
+
+def statement_requests(engine):
+    return [req for req in engine.requests if req.__class__.__name__ == "StatementReq"]
+
+
+def test_sync_backfills_every_provider_newest_first_round_robin():
+    client = Client("token", engine_class=FakeEngine)
+    reports = list()
+    progress = client.sync(until=until, on_progress=reports.append)
+
+    assert progress.done == progress.total == len(reports) > len(client.providers)
+    assert [report.done for report in reports] == list(range(1, progress.total + 1))
+    assert reports[-1].eta == 0
+    now = datetime.now(tz=timezone.utc)
+    for provider in client.providers:
+        assert provider.pendingWindows(until, now, refresh=False) == []
+
+    requests = statement_requests(client.engine)
+    providers = [provider.id for provider in client.providers]
+    assert [req.account for req in requests[:len(providers)]] == providers
+    for provider_id in providers:
+        starts = [req.from_ for req in requests if req.account == provider_id]
+        assert starts == sorted(starts, reverse=True)
+
+    # Nothing is left to do
+    assert client.sync(until=until).total == 0
+    assert len(statement_requests(client.engine)) == len(requests)
+
+
+def test_interrupted_sync_resumes_from_saved_progress(tmp_path):
+    profile = str(tmp_path / "user.json")
+    database = str(tmp_path / "cache.sqlite")
+    client = Client("token", engine_class=FakeEngine, store=SQLiteStore(database))
+    total = client.sync(until=until, providers=[]).total
+
+    def interrupt(progress):
+        if progress.done == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        client.sync(until=until, filename=profile, on_progress=interrupt)
+    first_run = statement_requests(client.engine)
+    assert len(first_run) == 3
+
+    resumed = Client("token", engine_class=FakeEngine, load_file=profile, store=SQLiteStore(database))
+    progress = resumed.sync(until=until)
+    full = Client("token", engine_class=FakeEngine).sync(until=until)
+    assert total == 0 and progress.total == full.total - 3
+    fetched = {(req.account, req.from_) for req in statement_requests(resumed.engine)}
+    assert not fetched & {(req.account, req.from_) for req in first_run}
+
+
+class ShortHistoryEngine(FakeEngine):
+    """Refuses statements of acc-usd older than a month."""
+
+    def make_request(self, request_obj):
+        cutoff = datetime.now(tz=timezone.utc) - timedelta(days=30)
+        if request_obj.__class__.__name__ == "StatementReq":
+            if request_obj.account == "acc-usd" and request_obj.from_ < cutoff:
+                self.requests.append(request_obj)
+                raise abstract.BadRequest("Too old")
+        return super().make_request(request_obj)
+
+
+def test_sync_drops_providers_whose_history_ends():
+    client = Client("token", engine_class=ShortHistoryEngine)
+    progress = client.sync(until=until)
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=30)
+    refused = [
+        req for req in statement_requests(client.engine)
+        if req.account == "acc-usd" and req.from_ < cutoff
+    ]
+    assert len(refused) == 1
+    assert progress.done == progress.total < Client("token", engine_class=FakeEngine).sync(until=until).total
+
+
+def test_async_sync():
+    async def run():
+        client = AsyncClient("token", engine_class=AsyncFakeEngine, load_file=None)
+        await client.refreshUser()
+        return client, await client.sync(until=until)
+
+    client, progress = asyncio.run(run())
+    assert progress.done == progress.total > 0
+    now = datetime.now(tz=timezone.utc)
+    assert all(not p.pendingWindows(until, now, refresh=False) for p in client.providers)
+
+
+def test_saving_progress_needs_a_store(tmp_path):
+    client = Client("token", engine_class=FakeEngine)
+    with pytest.raises(ValueError):
+        client.sync(until=until, filename=str(tmp_path / "user.json"))
+    assert not statement_requests(client.engine)
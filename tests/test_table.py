@@ -0,0 +1,58 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from hypothesis import given, strategies as st
+from pytest import importorskip
+from minimono import Client
+from minimono.models import Statement, Transaction, TransactionTable
+from .fakes import FakeEngine
+
+np = importorskip("numpy")
+
+
+money = st.integers(min_value=-2 ** 62, max_value=2 ** 62)
+b_transaction = st.builds(
+    Transaction,
+    time=st.datetimes(timezones=st.just(timezone.utc)),
+    mcc=st.integers(min_value=0, max_value=9999),
+    amount=money,
+    operationAmount=money,
+    commissionRate=money,
+    cashbackAmount=money,
+    balance=money,
+)
+
+
+@given(st.lists(b_transaction, max_size=20))
+def test_table_roundtrip(transactions):
+    table = TransactionTable.from_transactions(transactions)
+    assert len(table) == len(transactions)
+    assert table.to_transactions() == transactions
+
+
+def test_vectorized_aggregates_match_loops():
+    client = Client("token", engine_class=FakeEngine)
+    fr = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    to = datetime(2022, 6, 1, tzinfo=timezone.utc)
+    statement = client.getStatement(client['black'], from_time=fr, to_time=to)
+    table = TransactionTable.from_buckets(client['black'].cached_statement.values())
+    assert table.filter(fr=fr, to=to).to_statement() == Statement(transactions=statement.transactions)
+
+    per_mcc = defaultdict(int)
+    per_description = defaultdict(int)
+    per_day = defaultdict(int)
+    for tx in statement:
+        per_mcc[tx.mcc] += tx.amount
+        per_description[tx.description] += tx.cashbackAmount
+        per_day[tx.time.date()] += tx.amount
+
+    table = TransactionTable.from_statement(statement)
+    assert table.groupby_sum("mcc") == per_mcc
+    assert table.groupby_sum("description", value="cashbackAmount") == per_description
+    days, sums = table.resample("D")
+    assert dict(zip(days.astype(object), sums.tolist())) == per_day
+
+    shop = table.filter(table["amount"] < -500, description="Shop 3")
+    assert shop.to_transactions() == [
+        tx for tx in statement if tx.amount < -500 and tx.description == "Shop 3"
+    ]
+    assert len(table.filter(description="nowhere")) == 0
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta, timezone
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import pytest
+from minimono import Client
+from minimono.API import WebhookReceiver
+from minimono.storage import SQLiteStore
+from .fakes import FakeEngine, fake_transaction
+
+
+def push(receiver, payload, path="/"):
+    """Stand-in for the API sending a webhook."""
+
+    host, port = receiver.address
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    request = Request(f"http://{host}:{port}{path}", data=body, method="POST")
+    with urlopen(request, timeout=5) as response:
+        return response.status
+
+
+def event(account, moment):
+    return {"type": "StatementItem", "data": {"account": account, "statementItem": fake_transaction(account, moment)}}
+
+
+def test_pushed_transactions_are_cached_once():
+    client = Client("token", engine_class=FakeEngine)
+    moment = datetime.now(tz=timezone.utc).replace(microsecond=0) - timedelta(minutes=5)
+    with WebhookReceiver(client, port=0) as receiver:
+        host, port = receiver.address
+        with urlopen(f"http://{host}:{port}/", timeout=5) as response:
+            assert response.status == 200
+        assert push(receiver, event("acc-black", moment)) == 200
+        assert push(receiver, event("acc-black", moment)) == 200
+        assert push(receiver, event("jar-1", moment)) == 200
+        assert push(receiver, event("unknown", moment)) == 200
+        with pytest.raises(HTTPError) as error:
+            push(receiver, b"not json")
+        assert error.value.code == 400
+        assert receiver.received == 3
+
+    rows = [tx for bucket in client['black'].cached_statement.values() for tx in bucket]
+    assert [tx.time for tx in rows] == [moment]
+    assert len(client.jar("jar-1").cached_statement) == 1
+    # A pushed row alone doesn't make its range covered
+    requests_made = len(client.engine.requests)
+    statement = client.getStatement(client['black'], from_time=moment - timedelta(days=1), to_time=moment)
+    assert len(client.engine.requests) == requests_made + 1
+    assert len({tx.id for tx in statement}) == len(statement)
+
+
+def test_complete_receiver_keeps_buckets_covered(tmp_path):
+    client = Client("token", engine_class=FakeEngine, store=SQLiteStore(str(tmp_path / "cache.sqlite")))
+    account = client['black']
+    start = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    client.getStatement(account, from_time=start, to_time=datetime.now(tz=timezone.utc))
+    requests_made = len(client.engine.requests)
+
+    with WebhookReceiver(client, port=0, path="/hook", complete=True) as receiver:
+        moment = datetime.now(tz=timezone.utc).replace(microsecond=0) + timedelta(seconds=1)
+        with pytest.raises(HTTPError):
+            push(receiver, event("acc-black", moment))
+        assert push(receiver, event("acc-black", moment), path="/hook") == 200
+
+    assert account.pendingWindows(start, moment, client.store, refresh=False) == []
+    cached = client.getStatement(account, from_time=start, to_time=moment, refresh=False)
+    assert cached[-1].time == moment
+    assert len(client.engine.requests) == requests_made